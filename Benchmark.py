@@ -0,0 +1,468 @@
+import argparse
+import collections
+import contextlib
+import gc
+import io
+import json
+import random
+import statistics
+import sys
+import time
+
+import Board
+import Corpus
+import Disk
+import Drop7
+import Heuristics
+import Validation
+
+# Benchmarks time the hot paths of the game on seeded workloads.
+#  - Execute this program to print the results of all benchmarks.
+#  - All workloads are generated from a fixed seed, such that results can be
+#    compared between runs.
+#  - The microbenchmarks of the hot paths (see hot_path_workloads) report
+#    operations per second over several samples, with their standard
+#    deviation. Their results can be saved as JSON, and compared with the
+#    results of a previous run: a workload that got slower than its baseline
+#    by more than a threshold is a regression, and fails the run.
+
+DEFAULT_SEED = 7
+DEFAULT_NB_SAMPLES = 7
+DEFAULT_NB_BOARDS = 50
+DEFAULT_THRESHOLD = 0.10
+
+Measurement = collections.namedtuple("Measurement", [
+    "ops_per_second",
+    "stdev",
+    "nb_samples"
+])
+
+Regression = collections.namedtuple("Regression", [
+    "name",
+    "baseline",
+    "current",
+    "change"
+])
+
+
+def random_disk(dimension, rng, possible_states=(Disk.VISIBLE, Disk.WRAPPED)):
+    """
+        Return a random disk for a board with the given dimension, drawn from
+        the given random generator.
+    """
+
+    return Disk.init_disk(rng.choice(possible_states), rng.randint(1, dimension))
+
+
+def random_board(dimension, nb_drops, rng):
+    """
+        Return a playable board with the given dimension obtained from dropping
+        at most the given number of random disks in random columns.
+        - Dropping stops as soon as the board can no longer accept a disk.
+    """
+
+    board = Board.init_board(dimension)
+
+    for drop in range(nb_drops):
+        if not Board.can_accept_disk(board):
+            break
+        columns = [column for column in range(1, dimension + 1)
+                   if not Board.is_full_column(board, column)]
+        Drop7.drop_disk_at(board, random_disk(dimension, rng), rng.choice(columns))
+
+    return board
+
+
+def time_call(function, args=(), repeat=5):
+    """
+        Return the best wall time in seconds of the given number of calls of
+        the given function with the given arguments.
+    """
+
+    best = None
+
+    for run in range(repeat):
+        start = time.perf_counter()
+        function(*args)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+
+    return best
+
+
+def benchmark_heuristics(nb_boards=1000, dimension=7, seed=DEFAULT_SEED, repeat=5):
+    """
+        Return a dictionary mapping the name of each heuristic feature, and
+        of the complete evaluation, to its time in microseconds per board.
+        - The encoding of the boards in a batch is timed separately.
+    """
+
+    rng = random.Random(seed)
+    boards = [random_board(dimension, rng.randint(0, 3 * dimension * dimension), rng)
+              for index in range(nb_boards)]
+    batch = Heuristics.encode_boards(boards)
+    scale = 1e6 / nb_boards
+
+    result = {"encode": time_call(Heuristics.encode_boards, (boards,), repeat) * scale}
+    for name, feature in zip(Heuristics.FEATURES, Heuristics.FEATURE_FUNCTIONS):
+        result[name] = time_call(feature, (batch,), repeat) * scale
+    result["evaluate"] = time_call(Heuristics.evaluate_boards, (batch,), repeat) * scale
+
+    return result
+
+
+def benchmark_validation(nb_boards=20, dimension=30, seed=DEFAULT_SEED, repeat=5):
+    """
+        Return a dictionary mapping the checks of proper and playable boards,
+        and a single drop, to their time in microseconds per board.
+        - The drop is timed on copies of the boards, such that the check of
+          a board can be compared with the turn it would guard.
+    """
+
+    rng = random.Random(seed)
+    boards = [random_board(dimension, rng.randint(0, dimension * dimension), rng)
+              for index in range(nb_boards)]
+    drops = [(random_disk(dimension, rng), rng.choice(
+        [column for column in range(1, dimension + 1) if not Board.is_full_column(board, column)]))
+             for board in boards]
+    scale = 1e6 / nb_boards
+
+    def drop_all(boards):
+        for board, (disk, column) in zip(boards, drops):
+            Drop7.drop_disk_at(board, Disk.get_disk_copy(disk), column)
+
+    return {
+        "is_proper_board": time_call(
+            lambda: [Board.is_proper_board(board) for board in boards], (), repeat) * scale,
+        "is_playable_board": time_call(
+            lambda: [Board.is_playable_board(board) for board in boards], (), repeat) * scale,
+        "drop_disk_at": min(time_call(drop_all, ([Board.get_board_copy(board) for board in boards],), 1)
+                            for run in range(repeat)) * scale
+    }
+
+
+def benchmark_board(nb_boards=200, dimension=7, seed=DEFAULT_SEED, repeat=5):
+    """
+        Return a dictionary mapping the hot functions of Board and Drop7 to
+        their time in microseconds per board.
+        - Reading all cells is timed with the checked accessor get_disk_at and
+          with the unchecked accessor unchecked_get_disk_at.
+        - Drops are timed on copies of the boards.
+    """
+
+    rng = random.Random(seed)
+    boards = [random_board(dimension, rng.randint(0, dimension * dimension), rng)
+              for index in range(nb_boards)]
+    drops = [(random_disk(dimension, rng), rng.choice(
+        [column for column in range(1, dimension + 1) if not Board.is_full_column(board, column)]))
+             for board in boards]
+    positions = [(column, row) for column in range(1, dimension + 1) for row in range(1, dimension + 2)]
+    scale = 1e6 / nb_boards
+
+    def read_checked():
+        for board in boards:
+            for position in positions:
+                Board.get_disk_at(board, position)
+
+    def read_unchecked():
+        get = Board.unchecked_get_disk_at
+        for board in boards:
+            for column in range(dimension):
+                for row in range(dimension + 1):
+                    get(board, column, row)
+
+    def drop_all(boards):
+        for board, (disk, column) in zip(boards, drops):
+            Drop7.drop_disk_at(board, Disk.get_disk_copy(disk), column)
+
+    return {
+        "get_disk_at": time_call(read_checked, (), repeat) * scale,
+        "unchecked_get_disk_at": time_call(read_unchecked, (), repeat) * scale,
+        "can_accept_disk": time_call(
+            lambda: [Board.can_accept_disk(board) for board in boards], (), repeat) * scale,
+        "positions_to_explode": time_call(
+            lambda: [Board.get_all_positions_to_explode(board) for board in boards], (), repeat) * scale,
+        "drop_disk_at": min(time_call(drop_all, ([Board.get_board_copy(board) for board in boards],), 1)
+                            for run in range(repeat)) * scale
+    }
+
+
+def benchmark_rendering(nb_boards=1000, dimension=7, seed=DEFAULT_SEED, repeat=5):
+    """
+        Return a dictionary mapping the ways to render boards as text to their
+        time in microseconds per board.
+        - Printing is timed with the standard output redirected to a buffer.
+    """
+
+    rng = random.Random(seed)
+    boards = [random_board(dimension, rng.randint(0, dimension * dimension), rng)
+              for index in range(nb_boards)]
+    scale = 1e6 / nb_boards
+
+    def print_all():
+        with contextlib.redirect_stdout(io.StringIO()):
+            for board in boards:
+                Board.print_board(board)
+
+    def write_all():
+        buffer = io.StringIO()
+        for board in boards:
+            Board.write_board(board, buffer)
+
+    return {
+        "print_board": time_call(print_all, (), repeat) * scale,
+        "write_board": time_call(write_all, (), repeat) * scale,
+        "render_boards": time_call(Board.render_boards, (boards, 10), repeat) * scale
+    }
+
+
+def measure(setup, operation, nb_samples=DEFAULT_NB_SAMPLES):
+    """
+        Return the measurement of the given operation over the given number of
+        samples.
+        - For each sample, the given setup function is called first, outside of
+          the timing. It returns a list of tuples of arguments, and the given
+          operation is called once with each of them. Operations that change
+          their arguments must therefore get fresh copies from the setup.
+        - The rate of a sample is the number of calls divided by the time of
+          all calls of that sample. An additional first sample warms up the
+          caches and is discarded. As in the module timeit, the garbage
+          collector is disabled while timing.
+    """
+
+    rates = []
+
+    for sample in range(nb_samples + 1):
+        calls = setup()
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            for args in calls:
+                operation(*args)
+            elapsed = time.perf_counter() - start
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+        if sample > 0:
+            rates.append(len(calls) / elapsed)
+
+    return Measurement(statistics.mean(rates),
+                       statistics.stdev(rates) if len(rates) > 1 else 0.0,
+                       len(rates))
+
+
+def hot_path_workloads(seed=DEFAULT_SEED, dimensions=(5, 7, 9), depths=(1, 2, 3), nb_boards=DEFAULT_NB_BOARDS,
+                       corpus_boards=None):
+    """
+        Return a dictionary mapping the name of each microbenchmark of the hot
+        paths of Board and Drop7 to a tuple of its setup function and its
+        operation. (see measure)
+        - Each dimension gets its own random generator derived from the given
+          seed, such that the workload of a dimension does not depend on the
+          other dimensions.
+        - Drops are selected to explode if possible, such that drop_disk_at
+          times cascades rather than disks landing on the board.
+        - highest_score is timed for each given depth, i.e. number of disks to
+          drop, on fewer boards as the depth increases.
+        - The boards of a dimension are taken from the given list of boards
+          sampled from real games (see Corpus) if the dimension of those
+          boards matches, and are random boards (see random_board) otherwise.
+          Boards are taken at a fixed stride over the whole list.
+    """
+
+    workloads = {}
+
+    for dimension in dimensions:
+        rng = random.Random(seed * 1000 + dimension)
+        if corpus_boards and Board.dimension(corpus_boards[0]) == dimension:
+            source_boards = corpus_boards[::max(1, len(corpus_boards) // nb_boards)][:nb_boards]
+        else:
+            source_boards = [random_board(dimension, rng.randint(0, dimension * dimension), rng)
+                             for index in range(nb_boards)]
+        boards = [board for board in source_boards if Board.can_accept_disk(board)]
+        drops = [_exploding_drop(board, rng) for board in boards]
+        removals = [rng.sample(_occupied_positions(board), min(3, len(_occupied_positions(board))))
+                    for board in boards]
+        disk_sequences = [[random_disk(dimension, rng) for index in range(max(depths))]
+                          for board in boards]
+
+        def drop_calls(boards=boards, drops=drops):
+            return [(Board.get_board_copy(board), Disk.get_disk_copy(disk), column)
+                    for board, (disk, column) in zip(boards, drops)]
+
+        def remove_calls(boards=boards, removals=removals):
+            return [(Board.get_board_copy(board), positions) for board, positions in zip(boards, removals)]
+
+        def best_drop_calls(boards=boards, disk_sequences=disk_sequences):
+            return [(Board.get_board_copy(board), Disk.get_disk_copy(disks[0]))
+                    for board, disks in zip(boards, disk_sequences)]
+
+        def greedy_calls(boards=boards, disk_sequences=disk_sequences):
+            return [(Board.get_board_copy(board), [Disk.get_disk_copy(disk) for disk in disks])
+                    for board, disks in zip(boards, disk_sequences)]
+
+        def search_calls(depth, boards=boards, disk_sequences=disk_sequences):
+            nb_searched = max(2, len(boards) // dimension ** (depth - 1))
+            return lambda: [(board, disks[:depth]) for board, disks in
+                            zip(boards[:nb_searched], disk_sequences)]
+
+        suffix = "/d%d" % dimension
+        workloads["get_all_positions_to_explode" + suffix] = (
+            lambda boards=boards: [(board,) for board in boards], Board.get_all_positions_to_explode)
+        workloads["drop_disk_at" + suffix] = (drop_calls, Drop7.drop_disk_at)
+        workloads["remove_all_disks_at" + suffix] = (remove_calls, Board.remove_all_disks_at)
+        workloads["best_drop_for_disk" + suffix] = (best_drop_calls, Drop7.best_drop_for_disk)
+        workloads["highest_greedy_score" + suffix] = (greedy_calls, Drop7.highest_greedy_score)
+        for depth in depths:
+            workloads["highest_score" + suffix + "/depth%d" % depth] = (search_calls(depth), Drop7.highest_score)
+
+    return workloads
+
+
+def run_microbenchmarks(workloads, nb_samples=DEFAULT_NB_SAMPLES, name_filter=None):
+    """
+        Return a dictionary mapping the name of each of the given workloads
+        whose name contains the given filter, if any, to its measurement.
+    """
+
+    return {name: measure(setup, operation, nb_samples)
+            for name, (setup, operation) in workloads.items()
+            if name_filter is None or name_filter in name}
+
+
+def save_results(path, results, seed=DEFAULT_SEED):
+    """
+        Save the given dictionary of measurements as JSON at the given path,
+        together with the seed of the workloads and the version of Python.
+    """
+
+    with open(path, "w") as file:
+        json.dump({"seed": seed,
+                   "python": sys.version.split()[0],
+                   "results": {name: measurement._asdict() for name, measurement in results.items()}},
+                  file, indent=2, sort_keys=True)
+
+
+def load_results(path):
+    """
+        Return the dictionary of measurements saved at the given path.
+        (see save_results)
+    """
+
+    with open(path) as file:
+        return {name: Measurement(**fields) for name, fields in json.load(file)["results"].items()}
+
+
+def compare_results(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+        Return a list of the regressions of the given measurements with
+        respect to the given baseline measurements, sorted by name.
+        - A workload regresses if its rate dropped by more than the given
+          fraction of its baseline rate. The change of a regression is the
+          relative change of its rate, a negative number.
+        - Workloads that are missing from either dictionary are ignored.
+    """
+
+    regressions = []
+
+    for name in sorted(results.keys() & baseline.keys()):
+        change = results[name].ops_per_second / baseline[name].ops_per_second - 1
+        if change < -threshold:
+            regressions.append(Regression(name, baseline[name], results[name], change))
+
+    return regressions
+
+
+def print_results(title, results, unit):
+    """
+        Print the given dictionary of benchmark results under the given title.
+    """
+
+    print(title)
+    for name, value in results.items():
+        print("    %-20s %12.3f %s" % (name, value, unit))
+    print()
+
+
+def print_measurements(title, results):
+    """
+        Print the given dictionary of measurements under the given title.
+    """
+
+    print(title)
+    for name, measurement in results.items():
+        print("    %-36s %14.1f ops/s +- %5.1f%%" %
+              (name, measurement.ops_per_second, 100 * measurement.stdev / measurement.ops_per_second))
+    print()
+
+
+### BENCHMARK HELPER FUNCTIONS ###
+
+def _exploding_drop(board, rng, nb_tries=20):
+    """
+        Return a tuple of a random disk and a column of the given board in
+        which that disk explodes, or of the last disk and column tried if no
+        such drop is found in the given number of tries.
+    """
+
+    dimension = Board.dimension(board)
+    columns = [column for column in range(1, dimension + 1) if not Board.is_full_column(board, column)]
+
+    for attempt in range(nb_tries):
+        disk, column = random_disk(dimension, rng), rng.choice(columns)
+        if Drop7.drop_disk_at(Board.get_board_copy(board), Disk.get_disk_copy(disk), column) > 0:
+            break
+
+    return disk, column
+
+
+def _occupied_positions(board):
+    """
+        Return a list of the positions of all disks on the given board.
+    """
+
+    return [(column, row) for column in range(1, Board.dimension(board) + 1)
+            for row in range(1, Board.dimension(board) + 2)
+            if Board.get_disk_at(board, (column, row)) is not None]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Time the hot paths of the game.")
+    parser.add_argument("--micro-only", action="store_true", help="only run the microbenchmarks")
+    parser.add_argument("--filter", default=None, help="only run microbenchmarks whose name contains this")
+    parser.add_argument("--samples", type=int, default=DEFAULT_NB_SAMPLES)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--corpus", default=None, help="take the boards from a corpus (see Corpus)")
+    parser.add_argument("--save", default=None, help="save the microbenchmark results as JSON")
+    parser.add_argument("--baseline", default=None, help="compare with results saved before")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="largest tolerated relative slowdown with respect to the baseline")
+    parser.add_argument("--validation", choices=sorted(Validation.LEVELS), default="off",
+                        help="validation level of the game (see Validation)")
+    arguments = parser.parse_args()
+    Validation.set_level(arguments.validation)
+
+    if not arguments.micro_only:
+        print_results("Heuristics (per board)", benchmark_heuristics(), "us")
+        print_results("Validation of 30x30 boards (per board)", benchmark_validation(), "us")
+        print_results("Board and drops (per board)", benchmark_board(), "us")
+        print_results("Rendering (per board)", benchmark_rendering(), "us")
+
+    corpus_boards = None if arguments.corpus is None else \
+        Corpus.select_boards(arguments.corpus, DEFAULT_NB_BOARDS, arguments.seed)
+    results = run_microbenchmarks(hot_path_workloads(arguments.seed, corpus_boards=corpus_boards),
+                                  arguments.samples, arguments.filter)
+    print_measurements("Hot paths", results)
+
+    if arguments.save is not None:
+        save_results(arguments.save, results, arguments.seed)
+
+    if arguments.baseline is not None:
+        regressions = compare_results(results, load_results(arguments.baseline), arguments.threshold)
+        for regression in regressions:
+            print("Regression: %s %.1f -> %.1f ops/s (%+.1f%%)" %
+                  (regression.name, regression.baseline.ops_per_second,
+                   regression.current.ops_per_second, 100 * regression.change))
+        sys.exit(1 if regressions else 0)
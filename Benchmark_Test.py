@@ -0,0 +1,73 @@
+import os
+import tempfile
+
+import Benchmark
+
+
+
+def test_Measure__Samples_And_Setup(score, max_score):
+    """Function measure: the setup provides the calls of each sample, outside of the timing."""
+    max_score.value += 2
+    try:
+        calls = []
+        measurement = Benchmark.measure(lambda: [(index,) for index in range(10)], calls.append, 3)
+        assert measurement.nb_samples == 3
+        assert measurement.ops_per_second > 0 and measurement.stdev >= 0
+        assert calls == list(range(10)) * 4
+        score.value += 2
+    except:
+        pass
+
+def test_Compare_Results__Regressions(score, max_score):
+    """Function compare_results: only slowdowns beyond the threshold are regressions."""
+    max_score.value += 2
+    try:
+        baseline = {"a": Benchmark.Measurement(100.0, 1.0, 5), "b": Benchmark.Measurement(100.0, 1.0, 5),
+                    "c": Benchmark.Measurement(100.0, 1.0, 5)}
+        results = {"a": Benchmark.Measurement(95.0, 1.0, 5), "b": Benchmark.Measurement(80.0, 1.0, 5),
+                   "d": Benchmark.Measurement(1.0, 1.0, 5)}
+        regressions = Benchmark.compare_results(results, baseline, 0.10)
+        assert [regression.name for regression in regressions] == ["b"]
+        assert abs(regressions[0].change + 0.2) < 1e-9
+        score.value += 2
+    except:
+        pass
+
+def test_Save_Results__Round_Trip(score, max_score):
+    """Function save_results/load_results: measurements are restored from JSON."""
+    max_score.value += 1
+    try:
+        results = {"drop_disk_at/d5": Benchmark.Measurement(1234.5, 12.5, 7)}
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "baseline.json")
+            Benchmark.save_results(path, results)
+            assert Benchmark.load_results(path) == results
+        score.value += 1
+    except:
+        pass
+
+def test_Hot_Path_Workloads__Deterministic(score, max_score):
+    """Function hot_path_workloads: the same seed yields the same workloads."""
+    max_score.value += 2
+    try:
+        first = Benchmark.hot_path_workloads(3, dimensions=(4,), depths=(1, 2), nb_boards=6)
+        second = Benchmark.hot_path_workloads(3, dimensions=(4,), depths=(1, 2), nb_boards=6)
+        assert set(first) == {"get_all_positions_to_explode/d4", "drop_disk_at/d4",
+                              "remove_all_disks_at/d4", "best_drop_for_disk/d4",
+                              "highest_greedy_score/d4", "highest_score/d4/depth1",
+                              "highest_score/d4/depth2"}
+        for name in first:
+            assert first[name][0]() == second[name][0]()
+        score.value += 2
+    except:
+        pass
+
+
+
+benchmark_test_functions = \
+    {
+        test_Measure__Samples_And_Setup,
+        test_Compare_Results__Regressions,
+        test_Save_Results__Round_Trip,
+        test_Hot_Path_Workloads__Deterministic
+    }
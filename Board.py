@@ -1,10 +1,14 @@
 import Disk
 import Position
+import Validation
 import copy
 
 # Boards are square areas of N rows and N columns.=
 #     - Rows and columns in boards are numbered starting from 1.
 
+# Version of the binary format of boards. (see to_bytes)
+FORMAT_VERSION = 1
+
 
 def is_proper_board(board):
     """
@@ -19,21 +23,7 @@ def is_proper_board(board):
         - None
     """
 
-    dimension_board = dimension(board)
-
-    if not dimension_board:
-        return False
-
-    for column in range(len(board)):
-
-        for row in range(len(board)+1):
-
-            disk = get_disk_at(board,(column+1,row+1))
-
-            if disk is not None and not Disk.is_proper_disk(dimension_board,disk):
-                return False
-
-    return True
+    return _is_valid_board(board, False)
 
 
 def is_playable_board(board):
@@ -45,31 +35,13 @@ def is_playable_board(board):
           a disk (i.e. there are no gaps in columns).
         - The same disk is not stored at several positions on the given board.
         - Boards are represented as lists. (see init_board)
-        - The function uses the helper function disk_on_several_positions.(see BOARD HELPER FUNCTIONS below)
+        - All conditions are checked in a single pass over the cells of the
+          given board, such that the check can be done after every turn.
         ASSUMPTIONS
         - None
     """
 
-    if not is_proper_board(board):
-        return False
-
-    for column in range(len(board)):
-
-        gap = False
-
-        for row in range(len(board)+1):
-            disk = get_disk_at(board,(column + 1, row + 1))
-
-            if disk is not None and gap:
-                return False
-
-            if disk is None:
-                gap = True
-
-            elif disk_on_several_positions(disk,board):
-                return False
-
-    return True
+    return _is_valid_board(board, True)
 
 
 def init_board(dimension, given_disks=()):
@@ -209,9 +181,9 @@ def is_full_column(board, column):
           for that board.
     """
 
-    for row in range(dimension(board)):
+    for row in range(unchecked_dimension(board)):
 
-        if get_disk_at(board, (column, row+1)) is None:
+        if unchecked_get_disk_at(board, column-1, row) is None:
             return False
 
     return True
@@ -248,9 +220,11 @@ def can_accept_disk(board):
     if is_full(board):
         return False
 
+    overflow_row = unchecked_dimension(board)
+
     for column in range(len(board)):
 
-        if board[column][dimension(board)] is not None:     # Checks whether the overflow row doesn't contain a disk.
+        if unchecked_get_disk_at(board, column, overflow_row) is not None:     # Checks whether the overflow row doesn't contain a disk.
             return False
 
     return True
@@ -267,13 +241,13 @@ def add_disk_on_column(board, disk, column):
         ASSUMPTIONS
         - The given board is a proper board, the given column is a proper column
           for the given board, and the given disk is a proper disk for the given board.
+        - These assumptions are checked unless validation is off. (see Validation)
     """
 
-    for row in range(dimension(board)+1):
+    if Validation.level:
+        _check_column_and_disk(board, column, disk)
 
-        if get_disk_at(board, (column, row+1)) is None:
-            set_disk_at(board,(column,row+1),disk)
-            return
+    unchecked_add_disk_on_column(board, disk, column-1)
 
 
 
@@ -287,11 +261,16 @@ def inject_disk_in_column(board, disk, column):
         - The given board is a proper board, the given column is a proper column
           for that board whose overflow cell is free, and the given disk is a
           proper disk for the given board.
+        - These assumptions are checked unless validation is off. (see Validation)
     """
 
+    if Validation.level:
+        _check_column_and_disk(board, column, disk)
+        assert board[column-1][-1] is None
+
     new_column = [None] + board[column-1][:-1]      # Creates a new column with a free space at the bottom.
     board[column-1] = new_column
-    set_disk_at(board,(column,1),disk)
+    unchecked_set_disk_at(board, column-1, 0, disk)
 
 
 def inject_bottom_row_wrapped_disks(board):
@@ -306,8 +285,8 @@ def inject_bottom_row_wrapped_disks(board):
 
     for column in range(len(board)):
 
-        disk = Disk.get_random_disk(dimension(board),(Disk.WRAPPED,))
-        inject_disk_in_column(board, disk, column)
+        disk = Disk.get_random_disk(unchecked_dimension(board),(Disk.WRAPPED,))
+        inject_disk_in_column(board, disk, column+1)
 
 
 def remove_disk_at(board, position):
@@ -324,17 +303,18 @@ def remove_disk_at(board, position):
         - This function must be implemented in a RECURSIVE way.
     """
 
-    disk = get_disk_at(board,position)
+    column, row = position[0]-1, position[1]-1
 
-    if disk is None:
+    if unchecked_get_disk_at(board, column, row) is None:
         return
 
-    if position[1] == dimension(board)+1:
-        board[position[0] - 1][position[1] - 1] = None
+    if row == unchecked_dimension(board):
+        unchecked_set_disk_at(board, column, row, None)
 
         return
 
-    board[position[0]-1][position[1]-1] = board[position[0]-1][position[1]]     # The disk above the removed disk drops.
+    unchecked_set_disk_at(board, column, row,
+                          unchecked_get_disk_at(board, column, row+1))     # The disk above the removed disk drops.
 
     return remove_disk_at(board,(position[0], position[1]+1))
 
@@ -356,10 +336,10 @@ def get_length_vertical_chain(board, position,start_row = None):
     if start_row is None:
         start_row = 0
 
-    if get_disk_at(board, position) is None:
+    if unchecked_get_disk_at(board, position[0]-1, position[1]-1) is None:
         return 0
 
-    if start_row > dimension(board) or not get_disk_at(board,(position[0], start_row+1)):
+    if start_row > unchecked_dimension(board) or not unchecked_get_disk_at(board, position[0]-1, start_row):
         return 0
 
     start_row += 1
@@ -377,7 +357,7 @@ def get_length_horizontal_chain(board, position):
         - The function uses the helper functions chain_left and chain_right.(see BOARD HELPER FUNCTIONS below)
     """
 
-    if get_disk_at(board, position) is None:
+    if unchecked_get_disk_at(board, position[0]-1, position[1]-1) is None:
         return 0
 
     return 1+ chain_left(board, position,position[0]-2) + chain_right(board, position,position[0])
@@ -394,7 +374,7 @@ def is_to_explode(board, position):
         - The given board is a proper board and the given position is a
           proper position for the given board.
     """
-    disk = get_disk_at(board, position)
+    disk = unchecked_get_disk_at(board, position[0]-1, position[1]-1)
 
     if Disk.get_state(disk) != Disk.VISIBLE:
         return False
@@ -429,15 +409,11 @@ def get_all_positions_to_explode(board,start_pos=(1,1)):
     if start_pos is None:
         return frozenset ()
 
-    if is_to_explode(board, start_pos):
-        result = frozenset(((start_pos),)) | \
-        get_all_positions_to_explode(board, (Position.next(dimension(board),start_pos)))
+    dimension_board = unchecked_dimension(board)
+    start_index = Position.get_flat_index_table(dimension_board)[start_pos]
 
-
-    else:
-        result = get_all_positions_to_explode(board, (Position.next(dimension(board),start_pos)))
-
-    return result
+    return frozenset(position for position in Position.get_traversal(dimension_board)[start_index:]
+                     if is_to_explode(board, position))
 
 
 def crack_disks_at(board, positions):
@@ -453,7 +429,7 @@ def crack_disks_at(board, positions):
     """
     for position in positions:
 
-        disk = get_disk_at(board,position)
+        disk = unchecked_get_disk_at(board, position[0]-1, position[1]-1)
 
         if Disk.get_state(disk) == Disk.CRACKED:
             Disk.set_state(disk, Disk.VISIBLE)
@@ -473,7 +449,7 @@ def remove_all_disks_at(board, positions):
           is a proper position for the given board.
     """
 
-    for current_row in range(dimension(board)+1,0,-1):      # The positions higher in the board must be removed first.
+    for current_row in range(unchecked_dimension(board)+1,0,-1):      # The positions higher in the board must be removed first.
 
         for position_to_remove in positions:
 
@@ -481,8 +457,334 @@ def remove_all_disks_at(board, positions):
                 remove_disk_at(board, position_to_remove)
 
 
+def to_bytes(board):
+    """
+        Return the compact binary representation of the given board.
+        - The representation starts with the version of the format and the
+          dimension of the board, each in a single byte.
+        - They are followed by the codes of all cells, column after column and
+          from row 1 up to and including the overflow row. Each code takes the
+          number of bits returned by bits_per_cell. The code of an empty cell
+          is 0. The code of a disk combines its state in the 2 highest bits
+          with its value in the lowest bits.
+        - The codes are packed in little-endian order, starting with the code
+          of the first cell in the lowest bits of the first byte. The last
+          byte is padded with zero bits.
+        ASSUMPTIONS
+        - The given board is a proper board with a dimension below 256.
+    """
+
+    dimension_board = dimension(board)
+    bits = bits_per_cell(dimension_board)
+    packed = 0
+    shift = 0
+
+    for column in board:
+        for disk in column:
+            if disk is not None:
+                packed |= (_STATE_CODES[disk[0]] << (bits - 2) | disk[1]) << shift
+            shift += bits
+
+    return bytes((FORMAT_VERSION, dimension_board)) + \
+        packed.to_bytes(encoded_size(dimension_board) - 2, "little")
+
+
+def from_bytes(data, offset=0):
+    """
+        Return a new board from its binary representation (see to_bytes)
+        starting at the given offset in the given data.
+        - The given data may be any bytes-like object, including a memoryview.
+          The cells are decoded from it without copying the data first.
+        ASSUMPTIONS
+        - The given data stores a board in the current version of the format
+          at the given offset.
+    """
+
+    view = memoryview(data)
+    assert view[offset] == FORMAT_VERSION
+    dimension_board = view[offset + 1]
+    size = encoded_size(dimension_board)
+    packed = int.from_bytes(view[offset + 2:offset + size], "little")
+    bits = bits_per_cell(dimension_board)
+    mask = (1 << bits) - 1
+    value_mask = (1 << (bits - 2)) - 1
+    column_length = dimension_board + 1
+    column_bits = bits * column_length
+    column_mask = (1 << column_bits) - 1
+    board = []
+
+    for column in range(dimension_board):
+        codes = packed & column_mask
+        packed >>= column_bits
+        disks = [None] * column_length
+        row = 0
+        while codes:        # The remaining cells of the column are empty.
+            code = codes & mask
+            if code:
+                disks[row] = [_CODE_STATES[code >> (bits - 2)], code & value_mask]
+            codes >>= bits
+            row += 1
+        board.append(disks)
+
+    return board
+
+
+def disks_to_bytes(disks, dimension):
+    """
+        Return the compact binary representation of the given sequence of
+        disks, for a board with the given dimension.
+        - The code of each disk is the code of a cell storing that disk (see
+          to_bytes), and the codes are packed in the same way, without version
+          or dimension. As no disk has code 0, different sequences of disks
+          always have different representations.
+        ASSUMPTIONS
+        - Each given disk is a proper disk for a board with the given dimension.
+    """
+
+    bits = bits_per_cell(dimension)
+    packed = 0
+    shift = 0
+
+    for disk in disks:
+        packed |= (_STATE_CODES[disk[0]] << (bits - 2) | disk[1]) << shift
+        shift += bits
+
+    return packed.to_bytes((shift + 7) // 8, "little")
+
+
+def boards_to_bytes(boards):
+    """
+        Return the binary representations of all the given boards, one after
+        the other, in a single bytes object.
+        ASSUMPTIONS
+        - All given boards satisfy the assumptions of to_bytes.
+    """
+
+    return b"".join(map(to_bytes, boards))
+
+
+def boards_from_bytes(data):
+    """
+        Return a generator of new boards, one for each binary representation
+        stored one after the other in the given data (see boards_to_bytes).
+        - The given data may be any bytes-like object, including a memoryview
+          on a mapped file. Boards are decoded while the generator proceeds,
+          without copying the data.
+    """
+
+    view = memoryview(data)
+    offset = 0
+
+    while offset < len(view):
+        yield from_bytes(view, offset)
+        offset += encoded_size(view[offset + 1])
+
+
+def bits_per_cell(dimension):
+    """
+        Return the number of bits used for each cell of a board with the given
+        dimension in its binary representation.
+        - Two bits store the state of a disk, the remaining bits store its value.
+    """
+
+    return 2 + dimension.bit_length()
+
+
+def encoded_size(dimension):
+    """
+        Return the number of bytes in the binary representation of any board
+        with the given dimension, including its version and dimension.
+    """
+
+    return 2 + (dimension * (dimension + 1) * bits_per_cell(dimension) + 7) // 8
+
+
+def render_board(board):
+    """
+        Return a string showing the given board, one line per row from the
+        overflow row down to row 1, each line ending in a newline.
+        - Empty cells are blank, visible disks show their value, wrapped
+          disks show a filled circle and cracked disks an empty circle.
+        - The overflow row is separated from the other rows by a line.
+        ASSUMPTIONS
+        - The given board must be a proper board.
+    """
+
+    return "".join(line + "\n" for line in _board_lines(board))
+
+
+def write_board(board, buffer):
+    """
+        Write the string showing the given board (see render_board) to the
+        given text buffer, e.g. an io.StringIO or an open text file.
+        ASSUMPTIONS
+        - The given board must be a proper board.
+    """
+
+    buffer.writelines(line + "\n" for line in _board_lines(board))
+
+
+def render_boards(boards, boards_per_line=None, separator="  "):
+    """
+        Return a string showing the given boards side by side, with the given
+        separator between adjacent boards. (see render_board)
+        - If a number of boards per line is given, the boards are laid out in
+          bands of at most that many boards, separated by empty lines.
+        ASSUMPTIONS
+        - All given boards must be proper boards with the same dimension.
+        - The given number of boards per line, if any, is a natural number.
+    """
+
+    boards = list(boards)
+    if boards_per_line is None:
+        boards_per_line = max(1, len(boards))
+
+    bands = []
+    for start in range(0, len(boards), boards_per_line):
+        board_lines = [_board_lines(board) for board in boards[start:start + boards_per_line]]
+        bands.append("".join(separator.join(lines) + "\n" for lines in zip(*board_lines)))
+    return "\n".join(bands)
+
+
 ### BOARD HELPER FUNCTIONS ###
 
+_STATE_CODES = {Disk.VISIBLE: 1, Disk.CRACKED: 2, Disk.WRAPPED: 3}
+_CODE_STATES = {code: state for state, code in _STATE_CODES.items()}
+
+
+# The unchecked accessors below are used by the algorithms of this module and
+# of the module Drop7 in their inner loops.
+#  - Columns and rows are numbered starting from 0, and index the lists of
+#    the board directly.
+#  - Nothing is checked: the board must be a proper board and the column and
+#    row must be within its boundaries, the overflow row included.
+
+def unchecked_dimension(board):
+    """
+        Return the dimension of the given proper board.
+    """
+
+    return len(board)
+
+
+def unchecked_get_disk_at(board, column, row):
+    """
+        Return the disk at the given zero-based column and row of the given
+        board, or None if that cell is empty.
+    """
+
+    return board[column][row]
+
+
+def unchecked_set_disk_at(board, column, row, disk):
+    """
+        Fill the cell at the given zero-based column and row of the given
+        board with the given disk, which may be None.
+    """
+
+    board[column][row] = disk
+
+
+def unchecked_add_disk_on_column(board, disk, column):
+    """
+        Add the given disk on top of the given zero-based column of the given
+        board. (see add_disk_on_column)
+    """
+
+    for row in range(unchecked_dimension(board)+1):
+
+        if unchecked_get_disk_at(board, column, row) is None:
+            unchecked_set_disk_at(board, column, row, disk)
+            return
+
+
+# The text of a cell, including the separator on its right, for each state
+# of a disk other than visible.
+_CELL_TEXTS = {None: "    |", Disk.WRAPPED: "%2s |" % "\u2B24", Disk.CRACKED: "%4s |" % "\u20DD"}
+
+
+def _board_lines(board):
+    """
+        Return a list of the lines showing the given board, without newlines.
+        (see render_board)
+    """
+
+    if Validation.level:
+        assert is_proper_board(board)
+
+    cell_texts = _CELL_TEXTS
+    lines = []
+
+    for row in range(unchecked_dimension(board), -1, -1):
+        cells = ["|"]
+        for column in board:
+            disk = column[row]
+            if disk is None or disk[0] != Disk.VISIBLE:
+                cells.append(cell_texts[None if disk is None else disk[0]])
+            else:
+                cells.append("%3s |" % disk[1])
+        lines.append("".join(cells))
+        if row == unchecked_dimension(board):
+            lines.append("|" + "----|" * unchecked_dimension(board))
+
+    return lines
+
+
+def _is_valid_board(board, playable):
+    """
+        Check whether the given board is a proper board, and if playable is
+        true, whether it is a playable board. (see is_proper_board and
+        is_playable_board)
+        - Disks stored at several positions are detected with a set of the
+          identities of the disks seen so far. All disks stay on the board
+          during the check, so no identity can be reused.
+    """
+
+    dimension_board = dimension(board)
+
+    if not dimension_board:
+        return False
+
+    seen = set()
+
+    for column in board:
+
+        if not isinstance(column, list) or len(column) != dimension_board + 1:
+            return False
+
+        gap = False
+
+        for disk in column:
+
+            if disk is None:
+                gap = True
+
+            elif not Disk.is_proper_disk(dimension_board, disk):
+                return False
+
+            elif playable:
+                if gap or id(disk) in seen:
+                    return False
+                seen.add(id(disk))
+
+    return True
+
+
+def _check_column_and_disk(board, column, disk):
+    """
+        Check that the given board is a proper board, that the given column is a
+        proper column for it and that the given disk is a proper disk for it.
+        - The whole board is only checked at the paranoid validation level.
+    """
+
+    dimension_board = dimension(board)
+    assert dimension_board and isinstance(column, int) and 1 <= column <= dimension_board
+    assert disk is not None and Disk.is_proper_disk(dimension_board, disk)
+
+    if Validation.level >= Validation.PARANOID:
+        assert is_proper_board(board)
+
+
 def disk_on_several_positions(disk,board):
     """
         Check whether the given disk is stored at several positions on the given board.
@@ -518,7 +820,7 @@ def chain_left(board, position, start_column):
         Returns the length of the chain left of the disk in the given position on the given board.
     """
 
-    if start_column < 0 or get_disk_at(board, (start_column + 1, position[1])) is None:
+    if start_column < 0 or unchecked_get_disk_at(board, start_column, position[1]-1) is None:
         return 0
 
     start_column -= 1
@@ -531,7 +833,7 @@ def chain_right(board, position, start_column):
             Returns the length of the chain right of the disk in the given position on the given board.
     """
 
-    if start_column == dimension(board) or get_disk_at(board, (start_column + 1, position[1])) is None:
+    if start_column == unchecked_dimension(board) or unchecked_get_disk_at(board, start_column, position[1]-1) is None:
         return 0
 
     start_column += 1
@@ -541,27 +843,8 @@ def chain_right(board, position, start_column):
 
 def print_board(board):
     """
-        Print the given board.
+        Print the given board. (see render_board)
         ASSUMPTIONS
         - The given board must be a proper board.
     """
-    assert is_proper_board(board)
-    # Formatting could be used to improve the layout.
-    for row in range(dimension(board)+1, 0, -1):
-        print(end="|")
-        for col in range(1, dimension(board) + 1):
-            disk = get_disk_at(board, (col, row))
-            if disk == None:
-                print('   ', end=" |", )
-            else:
-                status, value = disk
-                if status == Disk.WRAPPED:
-                    print('%2s' % '\u2B24', end=" |")
-                elif status == Disk.CRACKED:
-                    print('%4s' % '\u20DD', end=" |")
-                else:  # numbered disk
-                    print('%3s' % value, end=" |", )
-        print()
-        if row == dimension(board)+1:
-            print("|"+"----|"*dimension(board))
-    print()
+    print(render_board(board))
@@ -1,3 +1,5 @@
+import io
+
 import Board
 import Disk
 
@@ -150,6 +152,22 @@ def test_Is_Proper_Board__Same_Disk_At_Several_Positions(score, max_score):
     except:
         pass
 
+def test_Is_Proper_Board__Improper_Column(score, max_score):
+    """Function is_proper_board: column with an improper disk or an improper length."""
+    max_score.value += 3
+    try:
+        set_up()
+        board = Board.init_board(2, ((visible_disk_value_2,),))
+        assert Board.is_proper_board(board)
+        board[1][0] = Disk.init_disk(Disk.VISIBLE, 3)
+        assert not Board.is_proper_board(board)
+        assert not Board.is_playable_board(board)
+        board[1] = [None, None]
+        assert not Board.is_proper_board(board)
+        score.value += 3
+    except:
+        pass
+
 
 
 def test_Init_Board__No_Disks(score, max_score):
@@ -934,6 +952,80 @@ def test_Remove_All_Disks_At__SeveralPositionsInSameColumn(score,max_score):
     except:
         pass
 
+def test_To_Bytes_From_Bytes__Round_Trip(score, max_score):
+    """Function to_bytes/from_bytes: boards are restored with equal disks."""
+    max_score.value += 4
+    try:
+        set_up()
+        Board.set_disk_at(test_board_6, (1, 7), Disk.init_disk(Disk.CRACKED, 6))
+        data = Board.to_bytes(test_board_6)
+        assert data[0] == Board.FORMAT_VERSION
+        assert data[1] == 6
+        assert len(data) == Board.encoded_size(6) == 2 + (6 * 7 * 5 + 7) // 8
+        copy = Board.from_bytes(data)
+        assert copy == test_board_6
+        assert Board.get_disk_at(copy, (3, 1)) is not visible_disk_value_6
+        assert Board.from_bytes(Board.to_bytes(Board.init_board(2))) == Board.init_board(2)
+        score.value += 4
+    except:
+        pass
+
+def test_Boards_From_Bytes__Several_Boards(score, max_score):
+    """Function boards_to_bytes/boards_from_bytes: several boards from a memoryview."""
+    max_score.value += 2
+    try:
+        set_up()
+        boards = [test_board_4, test_board_6, Board.init_board(3)]
+        data = memoryview(bytearray(Board.boards_to_bytes(boards)))
+        assert list(Board.boards_from_bytes(data)) == boards
+        assert Board.from_bytes(data, len(Board.to_bytes(test_board_4))) == test_board_6
+        score.value += 2
+    except:
+        pass
+
+def test_Unchecked_Accessors__Zero_Based(score, max_score):
+    """Function unchecked_get_disk_at/unchecked_set_disk_at: zero-based columns and rows."""
+    max_score.value += 2
+    try:
+        set_up()
+        assert Board.unchecked_dimension(test_board_6) == 6
+        for column in range(1, 7):
+            for row in range(1, 8):
+                assert Board.unchecked_get_disk_at(test_board_6, column - 1, row - 1) is \
+                       Board.get_disk_at(test_board_6, (column, row))
+        Board.unchecked_set_disk_at(test_board_6, 5, 6, visible_disk_value_1)
+        assert Board.get_disk_at(test_board_6, (6, 7)) is visible_disk_value_1
+        score.value += 2
+    except:
+        pass
+
+def test_Render_Board__All_States(score, max_score):
+    """Function render_board/write_board: glyphs of all states, overflow row on top."""
+    max_score.value += 2
+    try:
+        board = Board.init_board(2, ((Disk.init_disk(Disk.VISIBLE, 2), Disk.init_disk(Disk.WRAPPED, 1)),
+                                     (Disk.init_disk(Disk.CRACKED, 2),)))
+        text = Board.render_board(board)
+        assert text == "|    |    |\n|----|----|\n| \u2B24 |    |\n|  2 |   \u20DD |\n"
+        buffer = io.StringIO()
+        Board.write_board(board, buffer)
+        assert buffer.getvalue() == text
+        score.value += 2
+    except:
+        pass
+
+def test_Render_Boards__Side_By_Side(score, max_score):
+    """Function render_boards: boards side by side, in bands of a given number of boards."""
+    max_score.value += 2
+    try:
+        boards = [Board.init_board(1, ((Disk.init_disk(Disk.VISIBLE, 1),),)), Board.init_board(1)]
+        assert Board.render_boards(boards) == "|    |  |    |\n|----|  |----|\n|  1 |  |    |\n"
+        assert Board.render_boards(boards * 3, 4, " ").count("\n") == 3 + 1 + 3
+        assert Board.render_boards(boards, 1) == Board.render_board(boards[0]) + "\n" + \
+               Board.render_board(boards[1])
+        score.value += 2
+    except:
+        pass
 
 
 board_test_functions = \
@@ -944,6 +1036,7 @@ board_test_functions = \
         test_Is_Proper_Board__Same_Disk_At_Several_Positions,
         test_Is_Playable_Board__Legal_Board,
         test_Is_Playable_Board__Non_Empty_Overflow_Row,
+        test_Is_Proper_Board__Improper_Column,
         test_Init_Board__No_Disks,
         test_Init_Board__All_Disks,
         test_Init_Board__Partial_Fill,
@@ -997,4 +1090,9 @@ board_test_functions = \
         test_Remove_All_Disks_At__PositionsInDifferentColumns,
         test_Remove_All_Disks_At__FreePositions,
         test_Remove_All_Disks_At__SeveralPositionsInSameColumn,
+        test_To_Bytes_From_Bytes__Round_Trip,
+        test_Boards_From_Bytes__Several_Boards,
+        test_Unchecked_Accessors__Zero_Based,
+        test_Render_Board__All_States,
+        test_Render_Boards__Side_By_Side,
     }
@@ -0,0 +1,251 @@
+import argparse
+import collections
+import multiprocessing
+import random
+import struct
+
+import Board
+import Disk
+import Drop7
+import GameLog
+import Heuristics
+import Tuner
+import Validation
+
+# A corpus stores boards sampled from simulated games, as realistic inputs for
+# the benchmarks (see Benchmark) and for tests of the solvers.
+#  - Games are played on an empty board following the rules of Drop7.play,
+#    with several strategies: random columns, the column with the highest
+#    score for the drop (see GameLog.greedy_column), and the column selected
+#    by the heuristics with their default weights (see Tuner.greedy_column).
+#    All strategies play the same seeds, i.e. get the same disks as long as
+#    they survive.
+#  - Each game is split in three phases of equal length (early, mid and late
+#    game), and a fixed number of boards is sampled from each phase.
+#  - Samples are bucketed by fill level (the fraction of the cells below the
+#    overflow row that store a disk) and by density (the fraction of the
+#    disks that are wrapped or cracked), each in FILL_BUCKETS and
+#    DENSITY_BUCKETS buckets of equal width.
+#  - A corpus is a single binary file: a header storing the version of the
+#    format, the dimension of the boards and the seed of the corpus, followed
+#    by one record per sample. A record stores the strategy, the phase, the
+#    buckets, the turn and the seed of the game, followed by the board (see
+#    Board.to_bytes).
+#  - The corpus only depends on its seed and parameters, not on the machine
+#    or on the number of processes generating it.
+
+MAGIC = b"D7CRP\0"
+VERSION = 1
+HEADER = struct.Struct("<6sBBQ")       # magic, version, dimension, seed
+SAMPLE = struct.Struct("<BBBBHQ")      # strategy, phase, fill bucket, density bucket, turn, game seed
+
+STRATEGIES = ("random", "greedy", "heuristic")
+PHASES = ("early", "mid", "late")
+
+FILL_BUCKETS = 4
+DENSITY_BUCKETS = 4
+
+DEFAULT_SAMPLES_PER_PHASE = 2
+
+Sample = collections.namedtuple("Sample", [
+    "strategy",
+    "phase",
+    "fill_bucket",
+    "density_bucket",
+    "turn",
+    "seed",
+    "board"
+])
+
+
+def generate_corpus(path, nb_games, dimension=7, seed=0, strategies=STRATEGIES,
+                    samples_per_phase=DEFAULT_SAMPLES_PER_PHASE,
+                    max_turns=Tuner.DEFAULT_MAX_TURNS, processes=None):
+    """
+        Generate a corpus at the given path from the given number of games per
+        strategy, and return a dictionary mapping each bucket, a tuple of a
+        fill bucket and a density bucket, to its number of samples.
+        - Game I is played with the seed obtained from adding I to the given
+          seed, once for each of the given strategies.
+        - Games are played on the given number of processes. If that number is
+          1, all games are played in the current process. Samples are written
+          in the order of the games, whatever the number of processes.
+    """
+
+    tasks = [(strategy, seed + game, dimension, samples_per_phase, max_turns)
+             for game in range(nb_games) for strategy in strategies]
+    counts = collections.Counter()
+    pool = None if processes == 1 else multiprocessing.Pool(processes, Validation.set_level, (Validation.level,))
+
+    try:
+        results = map(_sample_game, tasks) if pool is None else pool.imap(_sample_game, tasks, 4)
+        with open(path, "wb") as file:
+            file.write(HEADER.pack(MAGIC, VERSION, dimension, seed))
+            for samples in results:
+                for sample in samples:
+                    file.write(SAMPLE.pack(STRATEGIES.index(sample.strategy), PHASES.index(sample.phase),
+                                           sample.fill_bucket, sample.density_bucket, sample.turn,
+                                           sample.seed) +
+                               Board.to_bytes(sample.board))
+                    counts[(sample.fill_bucket, sample.density_bucket)] += 1
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    return dict(counts)
+
+
+def iter_samples(path):
+    """
+        Return a generator of all samples of the corpus at the given path, in
+        the order in which they were written.
+    """
+
+    with open(path, "rb") as file:
+        data = file.read()
+
+    magic, version, dimension, seed = HEADER.unpack_from(data)
+    assert magic == MAGIC and version == VERSION
+    record_size = SAMPLE.size + Board.encoded_size(dimension)
+
+    for offset in range(HEADER.size, len(data), record_size):
+        strategy, phase, fill_bucket, density_bucket, turn, game_seed = SAMPLE.unpack_from(data, offset)
+        yield Sample(STRATEGIES[strategy], PHASES[phase], fill_bucket, density_bucket, turn, game_seed,
+                     Board.from_bytes(data, offset + SAMPLE.size))
+
+
+def load_boards(path, phase=None, fill_bucket=None, density_bucket=None, strategy=None):
+    """
+        Return a list of the boards of all samples of the corpus at the given
+        path that match the given phase, buckets and strategy. Criteria that
+        are None match all samples.
+    """
+
+    return [sample.board for sample in iter_samples(path)
+            if (phase is None or sample.phase == phase) and
+            (fill_bucket is None or sample.fill_bucket == fill_bucket) and
+            (density_bucket is None or sample.density_bucket == density_bucket) and
+            (strategy is None or sample.strategy == strategy)]
+
+
+def select_boards(path, nb_boards, seed=0):
+    """
+        Return a list of at most the given number of boards of the corpus at
+        the given path, spread over all phases and buckets.
+        - Samples are grouped by phase, fill bucket and density bucket. Boards
+          are taken from the groups in turn, and at random within each group,
+          using a random generator seeded with the given seed.
+    """
+
+    groups = collections.defaultdict(list)
+    for sample in iter_samples(path):
+        groups[(PHASES.index(sample.phase), sample.fill_bucket, sample.density_bucket)].append(sample.board)
+
+    rng = random.Random("select %d" % seed)
+    groups = [groups[key] for key in sorted(groups)]
+    for group in groups:
+        rng.shuffle(group)
+
+    boards = []
+    for index in range(max(map(len, groups), default=0)):
+        boards.extend(group[index] for group in groups if index < len(group))
+    return boards[:nb_boards]
+
+
+def get_fill_bucket(board):
+    """
+        Return the fill bucket of the given board. (see FILL_BUCKETS)
+        ASSUMPTIONS
+        - The given board is a proper board.
+    """
+
+    dimension = Board.dimension(board)
+    nb_disks = sum(disk is not None for column in board for disk in column[:dimension])
+    return min(FILL_BUCKETS - 1, nb_disks * FILL_BUCKETS // (dimension * dimension))
+
+
+def get_density_bucket(board):
+    """
+        Return the density bucket of the given board, i.e. the bucket of the
+        fraction of its disks that are wrapped or cracked. A board without
+        disks is in bucket 0. (see DENSITY_BUCKETS)
+        ASSUMPTIONS
+        - The given board is a proper board.
+    """
+
+    states = [Disk.get_state(disk) for column in board for disk in column if disk is not None]
+    if not states:
+        return 0
+    nb_dense = sum(state != Disk.VISIBLE for state in states)
+    return min(DENSITY_BUCKETS - 1, nb_dense * DENSITY_BUCKETS // len(states))
+
+
+### CORPUS HELPER FUNCTIONS ###
+
+def _choose_column(strategy, board, disk, rng):
+    """
+        Return the column in which the given strategy drops the given disk on
+        the given board. Random columns are drawn from the given generator.
+    """
+
+    if strategy == "random":
+        return rng.choice([column for column in range(1, Board.dimension(board) + 1)
+                           if not Board.is_full_column(board, column)])
+    if strategy == "greedy":
+        return GameLog.greedy_column(board, disk)
+    return Tuner.greedy_column(board, disk, Heuristics.DEFAULT_WEIGHTS)
+
+
+def _sample_game(task):
+    """
+        Play the game described by the given task, a tuple of a strategy, a
+        seed, a dimension, a number of samples per phase and a maximum number
+        of turns, and return a list of its samples ordered by turn.
+        - The disks of the game, the random columns and the sampled turns are
+          drawn from three generators derived from the seed of the game.
+    """
+
+    strategy, seed, dimension, samples_per_phase, max_turns = task
+    state = Drop7.GameState(Board.init_board(dimension), rng=random.Random(seed))
+    column_rng = random.Random("columns %d" % seed)
+    boards = [Board.get_board_copy(state.board)]
+
+    while state.turn < max_turns and not state.is_over():
+        state.step(_choose_column(strategy, state.board, state.next_disk, column_rng))
+        boards.append(Board.get_board_copy(state.board))
+
+    sample_rng = random.Random("samples %d" % seed)
+    samples = []
+
+    for phase in range(len(PHASES)):
+        turns = range(len(boards) * phase // len(PHASES), len(boards) * (phase + 1) // len(PHASES))
+        for turn in sorted(sample_rng.sample(turns, min(samples_per_phase, len(turns)))):
+            board = boards[turn]
+            samples.append(Sample(strategy, PHASES[phase], get_fill_bucket(board), get_density_bucket(board),
+                                  turn, seed, board))
+
+    return samples
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Generate a corpus of boards from simulated games.")
+    parser.add_argument("path")
+    parser.add_argument("--games", type=int, default=100, help="games per strategy")
+    parser.add_argument("--dimension", type=int, default=7)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--samples-per-phase", type=int, default=DEFAULT_SAMPLES_PER_PHASE)
+    parser.add_argument("--max-turns", type=int, default=Tuner.DEFAULT_MAX_TURNS)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--validation", choices=sorted(Validation.LEVELS), default="off",
+                        help="validation level of the game (see Validation)")
+    arguments = parser.parse_args()
+    Validation.set_level(arguments.validation)
+
+    counts = generate_corpus(arguments.path, arguments.games, arguments.dimension, arguments.seed,
+                             samples_per_phase=arguments.samples_per_phase,
+                             max_turns=arguments.max_turns, processes=arguments.processes)
+
+    print("Samples per bucket (fill, density):")
+    for bucket in sorted(counts):
+        print("    %s: %d" % (bucket, counts[bucket]))
@@ -0,0 +1,87 @@
+import os
+import tempfile
+
+import Board
+import Corpus
+import Disk
+
+
+
+def test_Generate_Corpus__Deterministic(score, max_score):
+    """Function generate_corpus: the corpus does not depend on the number of processes."""
+    max_score.value += 3
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            paths = [os.path.join(directory, name) for name in ("serial", "parallel")]
+            counts = Corpus.generate_corpus(paths[0], 3, dimension=4, seed=5, max_turns=40, processes=1)
+            assert Corpus.generate_corpus(paths[1], 3, dimension=4, seed=5, max_turns=40, processes=2) == counts
+            with open(paths[0], "rb") as serial, open(paths[1], "rb") as parallel:
+                assert serial.read() == parallel.read()
+            assert sum(counts.values()) == 3 * len(Corpus.STRATEGIES) * len(Corpus.PHASES) * 2
+        score.value += 3
+    except:
+        pass
+
+def test_Iter_Samples__Round_Trip(score, max_score):
+    """Function iter_samples/load_boards: samples are restored with their buckets and boards."""
+    max_score.value += 3
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "corpus")
+            Corpus.generate_corpus(path, 2, dimension=4, seed=1, max_turns=40, processes=1)
+            samples = list(Corpus.iter_samples(path))
+            assert len(samples) == 2 * len(Corpus.STRATEGIES) * len(Corpus.PHASES) * 2
+            for sample in samples:
+                assert Board.is_proper_board(sample.board)
+                assert sample.fill_bucket == Corpus.get_fill_bucket(sample.board)
+                assert sample.density_bucket == Corpus.get_density_bucket(sample.board)
+            late = [sample for sample in samples if sample.phase == "late" and sample.strategy == "greedy"]
+            assert Corpus.load_boards(path, phase="late", strategy="greedy") == [sample.board for sample in late]
+            assert [sample.turn for sample in samples[:6]] == sorted(sample.turn for sample in samples[:6])
+        score.value += 3
+    except:
+        pass
+
+def test_Buckets__Fill_And_Density(score, max_score):
+    """Function get_fill_bucket/get_density_bucket: buckets of equal width."""
+    max_score.value += 2
+    try:
+        wrapped = Disk.init_disk(Disk.WRAPPED, 1)
+        visible = Disk.init_disk(Disk.VISIBLE, 1)
+        board = Board.init_board(2, ((wrapped, Disk.init_disk(Disk.CRACKED, 1)), (visible,)))
+        assert Corpus.get_fill_bucket(board) == 3 * Corpus.FILL_BUCKETS // 4
+        assert Corpus.get_density_bucket(board) == 2 * Corpus.DENSITY_BUCKETS // 3
+        assert Corpus.get_fill_bucket(Board.init_board(3)) == 0
+        assert Corpus.get_density_bucket(Board.init_board(3)) == 0
+        score.value += 2
+    except:
+        pass
+
+def test_Select_Boards__All_Phases_And_Buckets(score, max_score):
+    """Function select_boards: the selected boards cover all phases and buckets of the corpus."""
+    max_score.value += 2
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "corpus")
+            Corpus.generate_corpus(path, 4, dimension=4, seed=2, max_turns=40, processes=1)
+            samples = list(Corpus.iter_samples(path))
+            groups = {(sample.phase, sample.fill_bucket, sample.density_bucket) for sample in samples}
+            boards = Corpus.select_boards(path, len(groups), seed=3)
+            assert len(boards) == len(groups)
+            assert {(sample.phase, sample.fill_bucket, sample.density_bucket) for sample in samples
+                    if sample.board in boards} == groups
+            assert Corpus.select_boards(path, len(groups), seed=3) == boards
+            assert len(Corpus.select_boards(path, 1000)) == len(samples)
+        score.value += 2
+    except:
+        pass
+
+
+
+corpus_test_functions = \
+    {
+        test_Generate_Corpus__Deterministic,
+        test_Iter_Samples__Round_Trip,
+        test_Buckets__Fill_And_Density,
+        test_Select_Boards__All_Phases_And_Buckets
+    }
@@ -1,5 +1,7 @@
 import random
 
+import Validation
+
 # Disks can be stored on the game board. They have a state
 # and a number.
 #  - Disks are mutable things. More in particular, it must be
@@ -57,8 +59,13 @@ def get_random_disk(dimension, possible_states):
        - The given dimension is positive.
        - The given collection of possible states is not empty and contains
          only elements VISIBLE, WRAPPED and/or CRACKED
+       - These assumptions are checked unless validation is off. (see Validation)
     """
 
+    if Validation.level:
+        assert isinstance(dimension, int) and dimension > 0
+        assert len(possible_states) > 0 and all(state in All_states for state in possible_states)
+
     value = random.randint(1, dimension)
     state = random.choice(tuple(possible_states))
 
@@ -71,8 +78,13 @@ def set_state(disk, state):
         ASSUMPTIONS
         - The given disk is a proper disk for any board with a dimension at
           least equal to the value of the given disk.
+        - The given state is one of the states in All_states.
+        - The given state is checked unless validation is off. (see Validation)
     """
 
+    if Validation.level:
+        assert state in All_states
+
     disk[0] = state
 
     return disk
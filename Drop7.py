@@ -1,11 +1,30 @@
 import Disk
 import Board
 import Position
+import Validation
 import copy
+import array
+import collections
+import random
+import sys
 score_step_1 = 2
-
-
-def drop_disk_at(board, disk=None, column=None):
+turns_per_level_1 = 20
+min_turns_per_level = 10
+
+# A single step in a cascade of explosions: the number of the step, the frozen
+# set of positions of the exploding disks, the frozen set of positions of the
+# disks that have been cracked, the score of a single exploding disk in the
+# step and the score of the step.
+ExplosionStep = collections.namedtuple("ExplosionStep", [
+    "step",
+    "exploding",
+    "cracked",
+    "multiplier",
+    "score"
+])
+
+
+def drop_disk_at(board, disk=None, column=None, on_step=None):
     """
         Drop the given disk on top of the given column in the given board.
         - All disks on the given board that are to explode after having
@@ -23,6 +42,9 @@ def drop_disk_at(board, disk=None, column=None):
         - If the given disk and/or the given column is None, no disk is
           dropped on the given board. However, disks on the given board
           explode and crack as described above.
+        - If a function is given for on_step, it is called with each step of
+          explosions as an ExplosionStep, after that step has been done on the
+          given board.
         - The function uses the helper function do_explosions. (see BOARD HELPER FUNCTIONS)
         ASSUMPTIONS
         - The given board is a playable board
@@ -31,15 +53,60 @@ def drop_disk_at(board, disk=None, column=None):
         - The given disk is either None or it is a proper disk for the given
           board and it is not cracked.
         - The given column is not completely filled with disks.
+        - These assumptions are checked unless validation is off. At the
+          paranoid level, the board is also checked to be playable after the
+          drop and after each step of explosions. (see Validation)
     """
 
+    if Validation.level:
+        _check_drop(board, disk, column)
+
     if column is not None and disk is not None:
         Board.add_disk_on_column(board, disk, column)
 
-    return do_explosions(board)
+    return do_explosions(board, on_step=on_step)
+
 
+def unchecked_drop_disk_at(board, disk=None, column=None, on_step=None):
+    """
+        Drop the given disk on top of the given column in the given board, as
+        drop_disk_at does, without checking anything at any validation level.
+        Used by the searches and simulators for the drops they try.
+        ASSUMPTIONS
+        - The assumptions of drop_disk_at.
+    """
 
-def best_drop_for_disk(board, disk):
+    if column is not None and disk is not None:
+        Board.unchecked_add_disk_on_column(board, disk, column-1)
+
+    return do_explosions(board, on_step=on_step)
+
+
+def explosion_steps(board, disk=None, column=None):
+    """
+        Return a generator dropping the given disk on top of the given column
+        in the given board, and yielding each step of the resulting cascade of
+        explosions as an ExplosionStep. (see drop_disk_at)
+        - Each step is done on the given board just before it is yielded, such
+          that the board can be inspected (or drawn) after each step.
+        - The disk is only dropped when the first step is requested.
+        ASSUMPTIONS
+        - The assumptions of drop_disk_at.
+    """
+
+    if Validation.level:
+        _check_drop(board, disk, column)
+
+    if column is not None and disk is not None:
+        Board.add_disk_on_column(board, disk, column)
+
+    step = _explosion_step(board, 1, True)
+    while step is not None:
+        yield step
+        step = _explosion_step(board, step.step + 1, True)
+
+
+def best_drop_for_disk(board, disk, stats=None):
     """
        Drop the given disk on the given board in the best possible column.
        - Dropping the disk in any other column of the given board yields a score
@@ -52,32 +119,29 @@ def best_drop_for_disk(board, disk):
          function drops the disk in the rightmost of these columns.
        - If the given disk can't be dropped in the given board, the function
          returns (None,0)
+       - The given search statistics, if any, are updated with the drops
+         that have been tried. (see SearchStats)
         ASSUMPTIONS
         - The given board is a playable board that can accept a disk, and the
           given disk is not cracked and it is a proper disk for the given board.
+        - The disk is checked unless validation is off, once for the search
+          rather than for each drop it tries. (see Validation)
     """
 
-    best_column_so_far = None
-    highest_score_so_far = 0
-
-    for column in range(1, Board.dimension(board) + 1):
-
-        if Board.is_full_column(board, column):
-            pass
+    if Validation.level:
+        _check_search(board, [disk])
 
-        else:
-            score_current_column = drop_disk_at(Board.get_board_copy(board), Disk.get_disk_copy(disk), column)
+    if stats is None:
+        return _best_drop_for_disk(board, disk, 0, None)
 
-            if score_current_column >= highest_score_so_far:
-                best_column_so_far = column
-                highest_score_so_far = score_current_column
-
-    drop_disk_at(board, disk, best_column_so_far)
+    stats.start()
+    try:
+        return _best_drop_for_disk(board, disk, 0, stats)
+    finally:
+        stats.finish()
 
-    return best_column_so_far, highest_score_so_far
 
-
-def highest_greedy_score(board, disks, result=None):
+def highest_greedy_score(board, disks, result=None, stats=None):
     """
        Compute the highest possible score that can be obtained by dropping each
        of the given disks on the given board in a greedy way.
@@ -95,13 +159,28 @@ def highest_greedy_score(board, disks, result=None):
        - The function will not take into account possible raises of level while
          dropping disks, i.e. the resulting score only reflects scores obtained
          from dropping disks as computed by the function drop_disk_at.
+       - The given search statistics, if any, are updated with the drops
+         that have been tried. The depth of a drop is the number of disks
+         dropped before it. (see SearchStats)
        - This function must be implemented in a RECURSIVE way.
         ASSUMPTIONS
         - The given board is a playable board, and each of the given disks is a
           proper disk for the given board.
         - None of the given disks is cracked.
+        - The disks are checked unless validation is off, once for the search
+          rather than for each drop it tries. (see Validation)
     """
 
+    if result is None and Validation.level:
+        _check_search(board, disks)
+
+    if result is None and stats is not None:
+        stats.start()
+        try:
+            return highest_greedy_score(board, disks, [0, ()], stats)
+        finally:
+            stats.finish()
+
     if result is None:
         result = [0, ()]
 
@@ -109,7 +188,7 @@ def highest_greedy_score(board, disks, result=None):
         return tuple(result)
 
     else:
-        drop_current_disk = best_drop_for_disk(board, disks[0])
+        drop_current_disk = _best_drop_for_disk(board, disks[0], len(result[1]), stats)
 
         if drop_current_disk[0] is None:        # drop_current_disk is (None,0) if the current disk can't be dropped.
             return tuple(result)
@@ -118,10 +197,10 @@ def highest_greedy_score(board, disks, result=None):
         result[1] += (drop_current_disk[0],)
         del disks[0]
 
-        return highest_greedy_score(board, disks, result)
+        return highest_greedy_score(board, disks, result, stats)
 
 
-def highest_score(board, disks):
+def highest_score(board, disks, stats=None, cache=None):
     """
        Compute the highest possible score that can be obtained by dropping each
        of the given disks on the given board.
@@ -140,37 +219,40 @@ def highest_score(board, disks):
        - The function will not take into account possible raises of level while
          dropping disks, i.e. the resulting score only reflects scores obtained
          from dropping disks as computed by the function drop_disk_at.
+       - The given search statistics, if any, are updated with the search,
+         and get each improvement of the best solution as a new principal
+         variation. (see SearchStats)
+       - Solutions of subproblems are kept in the given transposition cache, if
+         any, within its memory budget. (see TranspositionCache) The memory of
+         the boards on the path of the search is reserved in that budget first,
+         and released when the search ends.
         ASSUMPTIONS
         - The given board is a playable board, and each of the given disks is a
           proper disk for the given board.
         - None of the given disks is cracked.
+        - The disks are checked unless validation is off, once for the search
+          rather than for each drop it tries. (see Validation)
     """
 
-    best_solution_so_far = (None, None)
-
-    if disks == []:
-        return (0, [])
-
-    for column in range(len(board)):
-        score_so_far = 0
-        columns_to_drop = []
-        copy_board = Board.get_board_copy(board)
-
-        if not Board.is_full_column(copy_board, column+1):
-
-            score_so_far += drop_disk_at(copy_board, Disk.get_disk_copy(disks[0]), column + 1)
-            columns_to_drop += [column + 1]
-            remaining_score, remaining_columns = highest_score(copy_board, disks[1:])
-
-            if remaining_score is not None:
+    if Validation.level:
+        _check_search(board, disks)
 
-                score_so_far += remaining_score
-                columns_to_drop += remaining_columns
+    if stats is not None:
+        stats.start()
 
-                if best_solution_so_far[0] is None or score_so_far > best_solution_so_far[0]:
-                    best_solution_so_far = (score_so_far, columns_to_drop)
+    reserved = 0 if cache is None else len(disks) * _board_memory(board)
+    if cache is not None:
+        nb_evicted = cache.reserve(reserved)
+        if stats is not None:
+            stats.evictions += nb_evicted
 
-    return best_solution_so_far
+    try:
+        return _highest_score(board, disks, 0, stats, cache)
+    finally:
+        if cache is not None:
+            cache.release(reserved)
+        if stats is not None:
+            stats.finish()
 
 
 def play(board,disks_to_drop=[],columns=[],wrapped_disks_to_insert=()):
@@ -191,21 +273,11 @@ def play(board,disks_to_drop=[],columns=[],wrapped_disks_to_insert=()):
       The number of disks in the sequence is a multiple of the dimension of the
       given board.
     - Each of the given columns is a proper column for the given board.
+    - These assumptions are checked unless validation is off. (see Validation)
     """
-    assert Board.is_proper_board(board) and Board.can_accept_disk(board)
-    assert all(map(lambda disk:
-        Disk.is_proper_disk(Board.dimension(board),disk),disks_to_drop))
-    assert all(map(lambda disk:
-        Disk.get_state(disk) in {Disk.VISIBLE,Disk.WRAPPED},disks_to_drop))
-    assert all(map(lambda disk:
-        Disk.is_proper_disk(Board.dimension(board),disk),wrapped_disks_to_insert))
-    assert all(map(lambda disk:
-        Disk.get_state(disk) == Disk.WRAPPED,wrapped_disks_to_insert))
-    assert len(wrapped_disks_to_insert) % Board.dimension(board) == 0
-    assert all(map(lambda col: 1<= col <= Board.dimension(board),columns))
-    turns_per_level = 20
-    total_score = 0
-    current_nb_turns = 0
+    if Validation.level:
+        _check_play(board, disks_to_drop, columns, wrapped_disks_to_insert)
+    state = GameState(board, disks=disks_to_drop)
     columns_to_use = list(columns)
     while (len(disks_to_drop) > 0) and Board.can_accept_disk(board):
         if len(columns_to_use) == 0:
@@ -214,20 +286,295 @@ def play(board,disks_to_drop=[],columns=[],wrapped_disks_to_insert=()):
             selected_column = list.pop(columns_to_use,0)
         if Board.is_full_column(board,selected_column):
             return None
-        disk_to_drop = list.pop(disks_to_drop,0)
-        total_score += drop_disk_at(board,disk_to_drop,selected_column)
-        current_nb_turns += 1
-        if current_nb_turns == turns_per_level and Board.can_accept_disk(board):
-            total_score += 1000 // turns_per_level
-            Board.inject_bottom_row_wrapped_disks(board)
-            current_nb_turns = 0
-            turns_per_level = max(turns_per_level-1,10)
-    return total_score
+        state.step(selected_column)
+    return state.score
+
+
+class GameState:
+    """
+        The state of a game in progress.
+        - The disk to drop next is taken from the given list of disks to drop,
+          if any. Disks are then removed from that list as they are dropped, and
+          there is no next disk once the list is exhausted. Without a list of
+          disks, the next disk is a random disk, drawn after each turn.
+        - Random disks, including the wrapped disks injected when the next
+          level is reached, are drawn from the given random generator. The
+          module random is used if no generator is given.
+        - After each turn, the score of the drop, the bonus for reaching the
+          next level and the wrapped disks injected in the board (an empty
+          tuple if the next level was not reached) are available as last_score,
+          last_bonus and last_wrapped_disks.
+        ASSUMPTIONS
+        - The given board is a playable board.
+    """
+
+    __slots__ = ("board", "disks", "rng", "next_disk", "score", "turn",
+                 "current_nb_turns", "turns_per_level",
+                 "last_score", "last_bonus", "last_wrapped_disks")
+
+    def __init__(self, board, disks=None, rng=None, score=0, turn=0,
+                 current_nb_turns=0, turns_per_level=turns_per_level_1):
+        self.board = board
+        self.disks = disks
+        self.rng = random if rng is None else rng
+        self.score = score
+        self.turn = turn
+        self.current_nb_turns = current_nb_turns
+        self.turns_per_level = turns_per_level
+        self.last_score = 0
+        self.last_bonus = 0
+        self.last_wrapped_disks = ()
+        self.next_disk = None
+        self._deal()
+
+    def is_over(self):
+        """
+            Check whether the game is over, i.e. whether its board can no
+            longer accept a disk or there is no next disk.
+        """
+
+        return self.next_disk is None or not Board.can_accept_disk(self.board)
+
+    def deal(self, disk):
+        """
+            Add the given disk at the end of the list of disks to drop.
+            ASSUMPTIONS
+            - This game was started with a list of disks to drop.
+        """
+
+        self.disks.append(disk)
+        if self.next_disk is None:
+            self.next_disk = self.disks[0]
+
+    def step(self, column, wrapped_disks=None, on_step=None):
+        """
+            Play a single turn by dropping the next disk in the given column,
+            and return the score of that turn.
+            - The next level is reached after the number of turns per level,
+              if the board can still accept a disk. The game then gets a bonus,
+              a row of wrapped disks is injected at the bottom of the board,
+              and the number of turns per level decreases by 1, down to a
+              minimum of 10.
+            - The given wrapped disks, if any, are injected instead of random
+              ones, the first one in column 1.
+            - The given function on_step, if any, is called with each step of
+              explosions of the drop. (see drop_disk_at)
+            ASSUMPTIONS
+            - The game is not over, and the given column is not full.
+        """
+
+        disk = self.next_disk
+        if self.disks is not None:
+            list.pop(self.disks, 0)
+
+        self.last_score, self.last_bonus, self.last_wrapped_disks, \
+            self.current_nb_turns, self.turns_per_level = \
+            _play_turn(self.board, disk, column, self.current_nb_turns,
+                       self.turns_per_level, self.rng, wrapped_disks, on_step)
+        self.turn += 1
+        self.score += self.last_score + self.last_bonus
+        self._deal()
+
+        return self.last_score + self.last_bonus
+
+    def draw_disk(self):
+        """
+            Return a new random disk, visible or wrapped, for the board of
+            this game.
+        """
+
+        return Disk.init_disk(self.rng.choice((Disk.VISIBLE, Disk.WRAPPED)),
+                              self.rng.randint(1, Board.unchecked_dimension(self.board)))
+
+    def _deal(self):
+        """
+            Set the next disk of this game.
+        """
+
+        if self.disks is None:
+            self.next_disk = self.draw_disk()
+        elif len(self.disks) > 0:
+            self.next_disk = self.disks[0]
+        else:
+            self.next_disk = None
+
+
+class TranspositionCache:
+    """
+        A cache of the solutions of subproblems of highest_score, whose
+        accounted memory never exceeds the given memory budget in bytes.
+        - A subproblem is a board and a sequence of disks still to drop on it.
+          Only subproblems with at least MIN_CACHED_DISKS disks are cached:
+          smaller ones are cheaper to solve again than to keep.
+        - The memory of an entry is the size of its key and its solution as
+          reported by sys.getsizeof, plus ENTRY_OVERHEAD bytes for the slot of
+          the entry in the cache. Memory reserved by the search itself (see
+          reserve) counts towards the budget as well.
+        - When a new entry would exceed the budget, the least recently used
+          entries are evicted first. If the reserved memory alone exceeds the
+          budget, nothing is cached and the search proceeds without cache.
+        - A cache may be shared by several searches, also nested ones. Their
+          reservations add up.
+    """
+
+    ENTRY_OVERHEAD = 80
+    MIN_CACHED_DISKS = 2
+
+    __slots__ = ("memory_budget", "memory", "reserved", "entries", "nb_evictions")
+
+    def __init__(self, memory_budget):
+        self.memory_budget = memory_budget
+        self.memory = 0
+        self.reserved = 0
+        self.entries = collections.OrderedDict()
+        self.nb_evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def lookup(self, key):
+        """
+            Return the solution stored for the given key, or None if there is
+            no such solution.
+        """
+
+        solution = self.entries.get(key)
+        if solution is not None:
+            self.entries.move_to_end(key)
+        return solution
+
+    def store(self, key, solution):
+        """
+            Store the given solution for the given key, and return the number
+            of entries evicted to stay within the memory budget.
+            - A solution already stored for the given key is replaced, and its
+              memory is released first.
+        """
+
+        old_solution = self.entries.pop(key, None)
+        if old_solution is not None:
+            self.memory -= _entry_memory(key, old_solution)
+        size = _entry_memory(key, solution)
+        if size + self.reserved > self.memory_budget:
+            return 0
+        self.entries[key] = solution
+        self.memory += size
+        return self._shed()
+
+    def reserve(self, memory):
+        """
+            Reserve the given memory in the budget for a search, on top of the
+            memory already reserved, and return the number of entries evicted
+            to stay within the budget.
+        """
+
+        self.reserved += memory
+        return self._shed()
+
+    def release(self, memory):
+        """
+            Release the given memory reserved before for a search.
+            ASSUMPTIONS
+            - The given memory was reserved before, and is not released yet.
+        """
+
+        self.reserved -= memory
+
+    def _shed(self):
+        """
+            Evict the least recently used entries until the accounted memory is
+            within the budget, and return the number of evicted entries.
+        """
+
+        nb_evicted = 0
+        while self.entries and self.memory + self.reserved > self.memory_budget:
+            key, solution = self.entries.popitem(last=False)
+            self.memory -= _entry_memory(key, solution)
+            nb_evicted += 1
+        self.nb_evictions += nb_evicted
+        return nb_evicted
+
+
+class BatchGameState:
+    """
+        The states of many games in progress, stored as parallel sequences.
+        - The game at index I has the board, the next disk, the score, ... at
+          index I of each sequence. Each game has its own random generator,
+          used in the same way as in GameState.
+        - Counters are stored in arrays of integers, such that stepping all
+          games does not go through an object per game.
+        ASSUMPTIONS
+        - The given boards are playable boards.
+    """
+
+    __slots__ = ("boards", "rngs", "next_disks", "scores", "turns",
+                 "current_nb_turns", "turns_per_level", "last_scores")
+
+    def __init__(self, boards, rngs=None):
+        self.boards = list(boards)
+        self.rngs = [random] * len(self.boards) if rngs is None else list(rngs)
+        self.scores = array.array("q", [0]) * len(self.boards)
+        self.turns = array.array("l", [0]) * len(self.boards)
+        self.current_nb_turns = array.array("l", [0]) * len(self.boards)
+        self.turns_per_level = array.array("l", [turns_per_level_1]) * len(self.boards)
+        self.last_scores = array.array("q", [0]) * len(self.boards)
+        self.next_disks = [Disk.init_disk(rng.choice((Disk.VISIBLE, Disk.WRAPPED)),
+                                          rng.randint(1, Board.unchecked_dimension(board)))
+                           for board, rng in zip(self.boards, self.rngs)]
+
+    def __len__(self):
+        return len(self.boards)
+
+    def active(self):
+        """
+            Return a list of the indices of all games whose board can still
+            accept a disk.
+        """
+
+        return [index for index, board in enumerate(self.boards) if Board.can_accept_disk(board)]
+
+    def step(self, columns):
+        """
+            Play a single turn in each game for which the given sequence of
+            columns holds a column, and return the array of the scores of
+            that turn for all games.
+            - The column at index I is the column in which the next disk of the
+              game at index I is dropped. Games with None as column are skipped
+              and get a score of 0.
+            - Each turn follows the rules of GameState.step.
+            ASSUMPTIONS
+            - None of the games to step is over, and none of the given columns
+              is full.
+        """
+
+        last_scores = self.last_scores
+        scores = self.scores
+        turns = self.turns
+        current_nb_turns = self.current_nb_turns
+        turns_per_level = self.turns_per_level
+
+        for index, column in enumerate(columns):
+            if column is None:
+                last_scores[index] = 0
+                continue
+
+            board = self.boards[index]
+            rng = self.rngs[index]
+            drop_score, bonus, wrapped_disks, current_nb_turns[index], turns_per_level[index] = \
+                _play_turn(board, self.next_disks[index], column, current_nb_turns[index],
+                           turns_per_level[index], rng, None, None)
+            last_scores[index] = drop_score + bonus
+            scores[index] += drop_score + bonus
+            turns[index] += 1
+            self.next_disks[index] = Disk.init_disk(rng.choice((Disk.VISIBLE, Disk.WRAPPED)),
+                                                    rng.randint(1, Board.unchecked_dimension(board)))
+
+        return last_scores
 
 
 ### DROP7 HELPER FUNCTIONS ###
 
-def do_explosions(board, current_step=None):
+def do_explosions(board, current_step=None, on_step=None):
     """
     Removes all disks that satisfy the condition to explode at the
     moment the function is invoked and activates all adjactant positions.
@@ -236,19 +583,256 @@ def do_explosions(board, current_step=None):
     repeating this until there are no more disks that satisfy the condition
     to explode.
     - The function returns the score obtained from all explosions that occured.
+    - The given function on_step, if any, is called with each step of
+      explosions. The cracked positions of a step are only collected if
+      such a function is given.
+    - At the paranoid validation level, the board is checked to be playable
+      before each step of explosions. (see Validation)
     """
 
     if not current_step:
         current_step = 1
 
-    all_positions_to_explode = Board.get_all_positions_to_explode(board)
-    score_current_step = len(all_positions_to_explode) * score_step_1 ** current_step
+    step = _explosion_step(board, current_step, on_step is not None)
 
-    if all_positions_to_explode == frozenset():
+    if step is None:
         return 0
 
-    all_positions_to_activate = Position.get_all_adjacent_positions(Board.dimension(board), all_positions_to_explode)
+    if on_step is not None:
+        on_step(step)
+
+    return step.score + do_explosions(board, current_step + 1, on_step)
+
+
+def _explosion_step(board, current_step, collect_cracked):
+    """
+    Do the given step of explosions on the given board, and return it as an
+    ExplosionStep, or None if no disk is to explode.
+    - The cracked positions of the step are None unless collect_cracked is true.
+    """
+
+    if Validation.level >= Validation.PARANOID:
+        assert Board.is_playable_board(board)
+
+    all_positions_to_explode = Board.get_all_positions_to_explode(board)
+
+    if all_positions_to_explode == frozenset():
+        return None
+
+    multiplier = score_step_1 ** current_step
+    all_positions_to_activate = Position.get_all_adjacent_positions(Board.unchecked_dimension(board), all_positions_to_explode)
+    cracked_positions = None
+    if collect_cracked:
+        cracked_positions = frozenset(
+            position for position in all_positions_to_activate
+            if Disk.get_state(Board.unchecked_get_disk_at(board, position[0]-1, position[1]-1))
+            in (Disk.WRAPPED, Disk.CRACKED))
     Board.crack_disks_at(board, all_positions_to_activate)
     Board.remove_all_disks_at(board, all_positions_to_explode)
 
-    return score_current_step + do_explosions(board, current_step + 1)
\ No newline at end of file
+    return ExplosionStep(current_step, all_positions_to_explode, cracked_positions,
+                         multiplier, len(all_positions_to_explode) * multiplier)
+
+
+def _best_drop_for_disk(board, disk, depth, stats):
+    """
+        Drop the given disk on the given board in the best possible column,
+        at the given depth of a search with the given statistics, if any.
+        (see best_drop_for_disk)
+    """
+
+    best_column_so_far = None
+    highest_score_so_far = 0
+    on_step = None if stats is None else stats.count_step
+
+    if stats is not None:
+        stats.expand(depth)
+
+    for column in range(1, Board.unchecked_dimension(board) + 1):
+
+        if Board.is_full_column(board, column):
+            if stats is not None:
+                stats.prunes += 1
+
+        else:
+            score_current_column = unchecked_drop_disk_at(Board.get_board_copy(board), Disk.get_disk_copy(disk),
+                                                          column, on_step)
+
+            if score_current_column >= highest_score_so_far:
+                best_column_so_far = column
+                highest_score_so_far = score_current_column
+
+    unchecked_drop_disk_at(board, disk, best_column_so_far, on_step)
+
+    return best_column_so_far, highest_score_so_far
+
+
+def _highest_score(board, disks, depth, stats, cache):
+    """
+        Compute the highest possible score for dropping the given disks on the
+        given board, at the given depth of a search with the given statistics
+        and transposition cache, if any. (see highest_score)
+    """
+
+    best_solution_so_far = (None, None)
+
+    if disks == []:
+        return (0, [])
+
+    key = None
+    if cache is not None and len(disks) >= TranspositionCache.MIN_CACHED_DISKS:
+        key = _transposition_key(board, disks)
+        solution = cache.lookup(key)
+        if stats is not None:
+            if solution is None:
+                stats.cache_misses += 1
+            else:
+                stats.cache_hits += 1
+        if solution is not None:
+            score, columns = solution
+            return (score, None if columns is None else list(columns))
+
+    on_step = None if stats is None else stats.count_step
+    if stats is not None:
+        stats.expand(depth)
+
+    for column in range(len(board)):
+        score_so_far = 0
+        columns_to_drop = []
+        copy_board = Board.get_board_copy(board)
+
+        if not Board.is_full_column(copy_board, column+1):
+
+            score_so_far += unchecked_drop_disk_at(copy_board, Disk.get_disk_copy(disks[0]), column + 1, on_step)
+            columns_to_drop += [column + 1]
+            remaining_score, remaining_columns = _highest_score(copy_board, disks[1:], depth + 1, stats, cache)
+
+            if remaining_score is not None:
+
+                score_so_far += remaining_score
+                columns_to_drop += remaining_columns
+
+                if best_solution_so_far[0] is None or score_so_far > best_solution_so_far[0]:
+                    best_solution_so_far = (score_so_far, columns_to_drop)
+                    if stats is not None and depth == 0:
+                        stats.record_variation(score_so_far, columns_to_drop)
+
+            elif stats is not None:
+                stats.prunes += 1
+
+        elif stats is not None:
+            stats.prunes += 1
+
+    if key is not None:
+        score, columns = best_solution_so_far
+        nb_evicted = cache.store(key, (score, None if columns is None else tuple(columns)))
+        if stats is not None:
+            stats.evictions += nb_evicted
+
+    return best_solution_so_far
+
+
+def _transposition_key(board, disks):
+    """
+        Return the key of the given board and disks in a transposition cache.
+    """
+
+    return Board.to_bytes(board) + Board.disks_to_bytes(disks, Board.unchecked_dimension(board))
+
+
+def _entry_memory(key, solution):
+    """
+        Return the accounted memory of an entry of a transposition cache with
+        the given key and solution. (see TranspositionCache)
+    """
+
+    score, columns = solution
+    return TranspositionCache.ENTRY_OVERHEAD + sys.getsizeof(key) + sys.getsizeof(solution) + \
+        (0 if score is None or -5 <= score <= 256 else sys.getsizeof(score)) + \
+        (0 if columns is None else sys.getsizeof(columns))
+
+
+def _board_memory(board):
+    """
+        Return the memory of the given board, its columns and its disks, as
+        reported by sys.getsizeof.
+    """
+
+    return sys.getsizeof(board) + sum(sys.getsizeof(column) + sum(sys.getsizeof(disk) for disk in column
+                                                                   if disk is not None)
+                                      for column in board)
+
+
+def _check_play(board, disks_to_drop, columns, wrapped_disks_to_insert):
+    """
+    Check the assumptions of the function play on the given arguments.
+    """
+
+    assert Board.is_proper_board(board) and Board.can_accept_disk(board)
+    assert all(map(lambda disk:
+        Disk.is_proper_disk(Board.dimension(board),disk),disks_to_drop))
+    assert all(map(lambda disk:
+        Disk.get_state(disk) in {Disk.VISIBLE,Disk.WRAPPED},disks_to_drop))
+    assert all(map(lambda disk:
+        Disk.is_proper_disk(Board.dimension(board),disk),wrapped_disks_to_insert))
+    assert all(map(lambda disk:
+        Disk.get_state(disk) == Disk.WRAPPED,wrapped_disks_to_insert))
+    assert len(wrapped_disks_to_insert) % Board.dimension(board) == 0
+    assert all(map(lambda col: 1<= col <= Board.dimension(board),columns))
+
+    if Validation.level >= Validation.PARANOID:
+        assert Board.is_playable_board(board)
+
+
+def _check_drop(board, disk, column):
+    """
+    Check the assumptions of the function drop_disk_at on the given arguments.
+    - The board is only checked to be playable at the paranoid level.
+    """
+
+    if Validation.level >= Validation.PARANOID:
+        assert Board.is_playable_board(board)
+
+    if column is not None and disk is not None:
+        assert Disk.get_state(disk) != Disk.CRACKED
+        assert not Board.is_full_column(board, column)
+
+
+def _check_search(board, disks):
+    """
+    Check the assumptions of the searches on the given disks.
+    - The board is only checked to be playable at the paranoid level.
+    """
+
+    if Validation.level >= Validation.PARANOID:
+        assert Board.is_playable_board(board)
+
+    assert all(Disk.is_proper_disk(Board.dimension(board), disk) and Disk.get_state(disk) != Disk.CRACKED
+               for disk in disks)
+
+
+def _play_turn(board, disk, column, current_nb_turns, turns_per_level, rng, wrapped_disks, on_step):
+    """
+    Drop the given disk in the given column of the given board, and raise the
+    level if needed. (see GameState.step)
+    - The function returns a tuple of the score of the drop, the bonus for
+      reaching the next level, the tuple of injected wrapped disks, the new
+      number of turns in the current level and the new number of turns per
+      level.
+    """
+
+    drop_score = drop_disk_at(board, disk, column, on_step)
+    current_nb_turns += 1
+
+    if current_nb_turns != turns_per_level or not Board.can_accept_disk(board):
+        return drop_score, 0, (), current_nb_turns, turns_per_level
+
+    bonus = 1000 // turns_per_level
+    if wrapped_disks is None:
+        dimension = Board.unchecked_dimension(board)
+        wrapped_disks = [Disk.init_disk(Disk.WRAPPED, rng.randint(1, dimension))
+                         for column in range(dimension)]
+    for column, wrapped_disk in enumerate(wrapped_disks):
+        Board.inject_disk_in_column(board, wrapped_disk, column + 1)
+
+    return drop_score, bonus, tuple(wrapped_disks), 0, max(turns_per_level - 1, min_turns_per_level)
\ No newline at end of file
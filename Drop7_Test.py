@@ -2,6 +2,9 @@ import Position
 import Disk
 import Board
 import Drop7
+import gc
+import random
+import tracemalloc
 
 wrapped_disk_value_1 = None
 wrapped_disk_value_1_B = None
@@ -418,6 +421,36 @@ def test_Drop_Disk_At__SuccessiveExposions(score, max_score):
     except:
         pass
 
+def test_Drop_Disk_At__Explosion_Steps(score, max_score):
+    """Function drop_disk_at/explosion_steps: each step of successive explosions is reported."""
+    max_score.value += 6
+    try:
+        set_up()
+        board = Board.init_board \
+            (dimension=6, given_disks= \
+                ((wrapped_disk_value_3,),
+                 (wrapped_disk_value_5, cracked_disk_value_4, cracked_disk_value_1, wrapped_disk_value_4),
+                 (cracked_disk_value_4_B, cracked_disk_value_3),
+                 (cracked_disk_value_4_C, visible_disk_value_5, visible_disk_value_3, cracked_disk_value_5),
+                 (),
+                 (wrapped_disk_value_3_B, visible_disk_value_3_B)))
+        board_copy = Board.get_board_copy(board)
+        steps = []
+        assert Drop7.drop_disk_at(board, Disk.init_disk(Disk.VISIBLE, 4), 4, on_step=steps.append) == 50
+        assert [step.step for step in steps] == [1, 2, 3, 4]
+        assert [(step.multiplier, step.score) for step in steps] == [(2, 2), (4, 16), (8, 16), (16, 16)]
+        assert steps[0].exploding == {(4, 2)}
+        assert steps[0].cracked == {(3, 2), (4, 1)}
+        generator = Drop7.explosion_steps(board_copy, Disk.init_disk(Disk.VISIBLE, 4), 4)
+        assert next(generator) == steps[0]
+        assert Board.get_disk_at(board_copy, (4, 2)) == visible_disk_value_3
+        assert Board.get_disk_at(board_copy, (4, 1)) == [Disk.VISIBLE, 4]
+        assert [steps[0]] + list(generator) == steps
+        assert are_equal_boards(board, board_copy)
+        score.value += 6
+    except:
+        pass
+
 def test_Drop_Disk_At_NoDisk(score, max_score):
     """Function drop_disk_at: No disk."""
     max_score.value += 20
@@ -828,6 +861,155 @@ def test_Highest_Score__Several_Disks_Case_2(score, max_score):
 
 
 
+def leftmost_free_column(board):
+    """
+        Return the leftmost column of the given board that is not full.
+    """
+    return next(column for column in range(1, Board.dimension(board) + 1)
+                if not Board.is_full_column(board, column))
+
+def test_Game_State__Step_Reaching_Next_Level(score, max_score):
+    """Class GameState: a step reaching the next level injects the given wrapped disks."""
+    max_score.value += 6
+    try:
+        set_up()
+        test_board = Board.init_board(4, ((wrapped_disk_value_3,),))
+        wrapped_disks = [wrapped_disk_value_1, wrapped_disk_value_2,
+                         wrapped_disk_value_3_B, wrapped_disk_value_4]
+        disks_to_drop = [visible_disk_value_4]
+        game_state = Drop7.GameState(test_board, disks=disks_to_drop,
+                                     current_nb_turns=1, turns_per_level=2)
+        assert game_state.next_disk is visible_disk_value_4
+        assert game_state.step(1, wrapped_disks) == 500
+        assert disks_to_drop == []
+        assert (game_state.score, game_state.turn) == (500, 1)
+        assert (game_state.last_score, game_state.last_bonus) == (0, 500)
+        assert game_state.last_wrapped_disks == tuple(wrapped_disks)
+        assert (game_state.current_nb_turns, game_state.turns_per_level) == (0, 10)
+        assert Board.get_disk_at(test_board, (1, 3)) is visible_disk_value_4
+        assert Board.get_disk_at(test_board, (4, 1)) is wrapped_disk_value_4
+        assert game_state.is_over()
+        score.value += 6
+    except:
+        pass
+
+def test_Game_State__Seeded_Games(score, max_score):
+    """Class GameState: games with random generators with the same seed are identical."""
+    max_score.value += 3
+    try:
+        games = [Drop7.GameState(Board.init_board(4), rng=random.Random(5)) for index in range(2)]
+        for turn in range(40):
+            for game in games:
+                if not game.is_over():
+                    game.step(leftmost_free_column(game.board))
+        assert games[0].score == games[1].score
+        assert games[0].turn == games[1].turn
+        assert games[0].board == games[1].board
+        score.value += 3
+    except:
+        pass
+
+def test_Batch_Game_State__Matches_Game_States(score, max_score):
+    """Class BatchGameState: stepping all games matches stepping each game on its own."""
+    max_score.value += 4
+    try:
+        seeds = (1, 2, 3)
+        games = [Drop7.GameState(Board.init_board(4), rng=random.Random(seed)) for seed in seeds]
+        batch = Drop7.BatchGameState([Board.init_board(4) for seed in seeds],
+                                     [random.Random(seed) for seed in seeds])
+        for turn in range(40):
+            active = set(batch.active())
+            assert active == {index for index, game in enumerate(games) if not game.is_over()}
+            for index in active:
+                games[index].step(leftmost_free_column(games[index].board))
+            batch.step([leftmost_free_column(board) if index in active else None
+                        for index, board in enumerate(batch.boards)])
+        for index, game in enumerate(games):
+            assert batch.boards[index] == game.board
+            assert batch.scores[index] == game.score
+            assert batch.turns[index] == game.turn
+            assert batch.turns_per_level[index] == game.turns_per_level
+        score.value += 4
+    except:
+        pass
+
+def test_Highest_Score__Transposition_Cache(score, max_score):
+    """Function highest_score: the same solutions with a transposition cache, within its memory budget."""
+    max_score.value += 4
+    try:
+        rng = random.Random(5)
+        game = Drop7.GameState(Board.init_board(5), rng=rng)
+        for turn in range(10):
+            game.step(rng.choice([column for column in range(1, 6) if not Board.is_full_column(game.board, column)]))
+        disks = [game.draw_disk() for index in range(4)]
+        solution = Drop7.highest_score(game.board, disks)
+        for budget in (10 ** 9, 9000, 100):
+            cache = Drop7.TranspositionCache(budget)
+            assert Drop7.highest_score(game.board, disks, cache=cache) == solution
+            assert cache.memory <= budget or len(cache) == 0
+            assert cache.reserved == 0
+        assert len(cache) == 0
+        cache = Drop7.TranspositionCache(10 ** 9)
+        Drop7.highest_score(game.board, disks, cache=cache)
+        assert len(cache) > 0
+        assert Drop7.highest_score(game.board, disks, cache=cache) == solution
+        score.value += 4
+    except:
+        pass
+
+def test_Transposition_Cache__Least_Recently_Used(score, max_score):
+    """Class TranspositionCache: the least recently used entries are evicted first."""
+    max_score.value += 2
+    try:
+        probe = Drop7.TranspositionCache(10 ** 6)
+        probe.store(b"a", (1, (1,)))
+        size = probe.memory
+        assert probe.store(b"a", (2, (1,))) == 0
+        assert probe.memory == size and probe.lookup(b"a") == (2, (1,))
+        cache = Drop7.TranspositionCache(3 * size)
+        for key in (b"a", b"b", b"c"):
+            assert cache.store(key, (1, (1,))) == 0
+        assert cache.lookup(b"a") == (1, (1,))
+        assert cache.store(b"d", (1, (1,))) == 1
+        assert cache.lookup(b"b") is None and cache.lookup(b"a") is not None
+        assert cache.reserve(size) == 1
+        assert cache.memory == 2 * size
+        assert cache.reserve(size) == 1 and cache.reserved == 2 * size
+        cache.release(size)
+        cache.release(size)
+        assert cache.reserved == 0
+        score.value += 2
+    except:
+        pass
+
+def test_Transposition_Cache__Traced_Memory(score, max_score):
+    """Class TranspositionCache: the accounted memory matches the memory traced by tracemalloc."""
+    max_score.value += 2
+    try:
+        rng = random.Random(2)
+        game = Drop7.GameState(Board.init_board(5), rng=rng)
+        for turn in range(8):
+            game.step(rng.choice([column for column in range(1, 6) if not Board.is_full_column(game.board, column)]))
+        disks = [game.draw_disk() for index in range(4)]
+        Drop7.highest_score(game.board, disks)
+        gc.collect()
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            cache = Drop7.TranspositionCache(10 ** 9)
+            Drop7.highest_score(game.board, disks, cache=cache)
+            gc.collect()
+            traced = tracemalloc.get_traced_memory()[0] - before
+        finally:
+            tracemalloc.stop()
+        assert len(cache) > 10
+        assert abs(traced - cache.memory) <= 0.25 * cache.memory
+        score.value += 2
+    except:
+        pass
+
+
+
 
 
 
@@ -842,6 +1024,7 @@ Drop7_test_functions = \
         test_Drop_Disk_At__SeveralExplodingDisks_DifferentColumns_NotCausingOtherExplosions,
         test_Drop_Disk_At__SeveralExplodingDisks_WrappedDiskAdjacentSeveralExplodingDisks,
         test_Drop_Disk_At__SuccessiveExposions,
+        test_Drop_Disk_At__Explosion_Steps,
         test_Drop_Disk_At_NoDisk,
 
         test_Best_Column_For_Disk_EmptyBoard,
@@ -861,5 +1044,12 @@ Drop7_test_functions = \
         test_Highest_Score__Two_Disks_Exploding_At_Last_Drop,
         test_Highest_Score__Too_Many_Disks,
         test_Highest_Score__Several_Disks_Case_1,
-        test_Highest_Score__Several_Disks_Case_2
+        test_Highest_Score__Several_Disks_Case_2,
+
+        test_Game_State__Step_Reaching_Next_Level,
+        test_Game_State__Seeded_Games,
+        test_Batch_Game_State__Matches_Game_States,
+        test_Highest_Score__Transposition_Cache,
+        test_Transposition_Cache__Least_Recently_Used,
+        test_Transposition_Cache__Traced_Memory
      }
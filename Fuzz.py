@@ -0,0 +1,392 @@
+import argparse
+import collections
+import multiprocessing
+import os
+import random
+import time
+
+import Board
+import Disk
+import Drop7
+import Validation
+
+# The differential fuzzer checks that the engines of the game implement exactly
+# the same rules as a reference implementation.
+#  - The reference implementation (see reference_drop) is self-contained: it
+#    only depends on the representation of boards and disks, and implements
+#    the rules as documented in Board and Drop7, quirks included. In
+#    particular, the vertical chain of a disk is the contiguous stack of disks
+#    starting at row 1 of its column (see Board.get_length_vertical_chain).
+#  - An engine is a function that drops a disk in a column of a board, as
+#    Drop7.drop_disk_at does: it changes the board and returns the score of
+#    the drop. Engines are registered by name in ENGINES.
+#  - A case is a random playable board and a sequence of drops. Boards may
+#    contain disks that are to explode before the first drop. A drop may have
+#    no disk, in which case only explosions are done.
+#  - A mismatch is a drop after which an engine returns another score or
+#    leaves another board than the reference, or raises an exception. Each
+#    mismatch is shrunk to a single drop on a board with as few and as simple
+#    disks as possible that still shows a mismatch for the same engine.
+#  - Cases are generated from seeded random generators, one per worker, and
+#    workers run on all cores until the time budget is spent.
+
+DEFAULT_TIME_BUDGET = 60
+DEFAULT_MAX_DIMENSION = 7
+DEFAULT_MAX_DROPS = 8
+
+
+def engine_drop_disk_at(board, disk, column):
+    """
+        Drop the given disk with Drop7.drop_disk_at.
+    """
+
+    return Drop7.drop_disk_at(board, disk, column)
+
+
+def engine_unchecked_drop_disk_at(board, disk, column):
+    """
+        Drop the given disk with Drop7.unchecked_drop_disk_at.
+    """
+
+    return Drop7.unchecked_drop_disk_at(board, disk, column)
+
+
+def engine_explosion_steps(board, disk, column):
+    """
+        Drop the given disk with Drop7.explosion_steps, summing the scores of
+        all steps.
+    """
+
+    return sum(step.score for step in Drop7.explosion_steps(board, disk, column))
+
+
+ENGINES = {
+    "drop_disk_at": engine_drop_disk_at,
+    "unchecked_drop_disk_at": engine_unchecked_drop_disk_at,
+    "explosion_steps": engine_explosion_steps,
+}
+
+Mismatch = collections.namedtuple("Mismatch", [
+    "engine",
+    "board",
+    "drops",
+    "expected",
+    "actual"
+])
+
+Summary = collections.namedtuple("Summary", [
+    "nb_cases",
+    "nb_drops",
+    "mismatches",
+    "elapsed"
+])
+
+
+def reference_drop(board, disk, column):
+    """
+        Drop the given disk on top of the given column of the given board
+        following the rules of the game, do all explosions, and return the
+        score of the drop. (see Drop7.drop_disk_at)
+        - Nothing is dropped if the given disk or column is None.
+        ASSUMPTIONS
+        - The given board is a playable board, and the given column, if any,
+          is not full.
+    """
+
+    dimension = len(board)
+
+    if disk is not None and column is not None:
+        board[column - 1][board[column - 1].index(None)] = disk
+
+    score = 0
+    step = 1
+
+    while True:
+        exploding = set()
+        for column_index in range(dimension):
+            stack = 0
+            while stack <= dimension and board[column_index][stack] is not None:
+                stack += 1
+            for row_index in range(dimension + 1):
+                disk_at = board[column_index][row_index]
+                if disk_at is not None and disk_at[0] == Disk.VISIBLE and \
+                        disk_at[1] in (stack, _row_run(board, column_index, row_index)):
+                    exploding.add((column_index, row_index))
+
+        if not exploding:
+            return score
+
+        score += len(exploding) * 2 ** step
+
+        neighbours = set()
+        for column_index, row_index in exploding:
+            for neighbour_column, neighbour_row in ((column_index - 1, row_index), (column_index + 1, row_index),
+                                                    (column_index, row_index - 1), (column_index, row_index + 1)):
+                if 0 <= neighbour_column < dimension and 0 <= neighbour_row <= dimension:
+                    neighbours.add((neighbour_column, neighbour_row))
+        for column_index, row_index in neighbours:
+            neighbour = board[column_index][row_index]
+            if neighbour is not None and neighbour[0] == Disk.CRACKED:
+                neighbour[0] = Disk.VISIBLE
+            elif neighbour is not None and neighbour[0] == Disk.WRAPPED:
+                neighbour[0] = Disk.CRACKED
+
+        for column_index in range(dimension):
+            remaining = [disk_at for row_index, disk_at in enumerate(board[column_index])
+                         if disk_at is not None and (column_index, row_index) not in exploding]
+            board[column_index][:] = remaining + [None] * (dimension + 1 - len(remaining))
+
+        step += 1
+
+
+def random_case(rng, max_dimension=DEFAULT_MAX_DIMENSION, max_drops=DEFAULT_MAX_DROPS):
+    """
+        Return a tuple of a random playable board and a list of drops, each a
+        tuple of a disk and a column, drawn from the given random generator.
+        - Drops are only generated as long as the board, as changed by the
+          reference implementation, can accept a disk. About one drop in ten
+          has no disk.
+    """
+
+    dimension = rng.randint(1, max_dimension)
+    board = [[None] * (dimension + 1) for column in range(dimension)]
+    for column in board:
+        for row in range(rng.randint(0, dimension)):
+            column[row] = [rng.choice((Disk.VISIBLE, Disk.WRAPPED, Disk.CRACKED)), rng.randint(1, dimension)]
+
+    start = Board.get_board_copy(board)
+    drops = []
+    for drop in range(rng.randint(1, max_drops)):
+        free_columns = [column for column in range(1, dimension + 1) if board[column - 1][dimension - 1] is None]
+        if not free_columns or any(column[dimension] is not None for column in board):
+            break
+        if rng.random() < 0.1:
+            disk, column = None, None
+        else:
+            disk = [rng.choice((Disk.VISIBLE, Disk.WRAPPED)), rng.randint(1, dimension)]
+            column = rng.choice(free_columns)
+        drops.append((disk, column))
+        reference_drop(board, Disk.get_disk_copy(disk), column)
+
+    return start, drops
+
+
+def check_case(board, drops, engines):
+    """
+        Run the given drops on copies of the given board with the reference
+        implementation and with each of the given engines, a dictionary
+        mapping names to engines, and return a list of the mismatches.
+        - A mismatch stores the board and the drops up to and including the
+          first diverging drop, and the expected and actual results of that
+          drop, each a tuple of a score and a board, or the repr of an
+          exception for the actual result.
+    """
+
+    mismatches = []
+
+    for name, engine in engines.items():
+        expected_board = Board.get_board_copy(board)
+        actual_board = Board.get_board_copy(board)
+        for index, (disk, column) in enumerate(drops):
+            expected = (reference_drop(expected_board, Disk.get_disk_copy(disk), column), expected_board)
+            try:
+                actual = (engine(actual_board, Disk.get_disk_copy(disk), column), actual_board)
+            except Exception as exception:
+                actual = repr(exception)
+            if actual != expected:
+                mismatches.append(Mismatch(name, board, drops[:index + 1],
+                                           (expected[0], Board.get_board_copy(expected_board)),
+                                           actual if isinstance(actual, str) else
+                                           (actual[0], Board.get_board_copy(actual_board))))
+                break
+
+    return mismatches
+
+
+def shrink(mismatch, engines):
+    """
+        Return a mismatch for the same engine as the given mismatch with a
+        single drop, on a board that is as small and as simple as possible.
+        - The board is replaced by the board just before the diverging drop.
+          Then, as long as the mismatch remains, disks are removed from the
+          top of their column, the last column is removed, wrapped and cracked
+          disks are made visible and values are lowered.
+    """
+
+    board = Board.get_board_copy(mismatch.board)
+    for disk, column in mismatch.drops[:-1]:
+        reference_drop(board, Disk.get_disk_copy(disk), column)
+    engine = {mismatch.engine: engines[mismatch.engine]}
+    best = check_case(board, mismatch.drops[-1:], engine)
+    if not best:
+        return mismatch
+    best = best[0]
+
+    changed = True
+    while changed:
+        changed = False
+        for board, drops in _simplifications(best.board, best.drops):
+            result = check_case(board, drops, engine)
+            if result:
+                best = result[0]
+                changed = True
+                break
+
+    return best
+
+
+def fuzz(time_budget=DEFAULT_TIME_BUDGET, seed=0, processes=None, engine_names=None,
+         max_dimension=DEFAULT_MAX_DIMENSION, max_drops=DEFAULT_MAX_DROPS):
+    """
+        Fuzz the engines with the given names (all engines by default) on the
+        given number of processes (all cores by default) for the given time
+        budget in seconds, and return a summary with all shrunk mismatches.
+        - Worker I draws its cases from a generator seeded with the given seed
+          and I. If the number of processes is 1, a single worker runs in the
+          current process.
+    """
+
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if engine_names is None:
+        engine_names = tuple(ENGINES)
+
+    tasks = [(seed, worker, time_budget, tuple(engine_names), max_dimension, max_drops, Validation.level)
+             for worker in range(processes)]
+    start = time.perf_counter()
+
+    if processes == 1:
+        results = list(map(_fuzz_worker, tasks))
+    else:
+        with multiprocessing.Pool(processes) as pool:
+            results = pool.map(_fuzz_worker, tasks)
+
+    return Summary(sum(result[0] for result in results), sum(result[1] for result in results),
+                   [mismatch for result in results for mismatch in result[2]],
+                   time.perf_counter() - start)
+
+
+def format_mismatch(mismatch):
+    """
+        Return a readable description of the given mismatch.
+    """
+
+    lines = ["Engine %s diverges on this board:" % mismatch.engine, Board.render_board(mismatch.board)]
+    for disk, column in mismatch.drops:
+        lines.append("after dropping %s in column %s" % (disk, column))
+    lines.append("expected score %d and board:" % mismatch.expected[0])
+    lines.append(Board.render_board(mismatch.expected[1]))
+    if isinstance(mismatch.actual, str):
+        lines.append("actual: " + mismatch.actual)
+    else:
+        lines.append("actual score %d and board:" % mismatch.actual[0])
+        lines.append(Board.render_board(mismatch.actual[1]))
+    return "\n".join(lines)
+
+
+### FUZZ HELPER FUNCTIONS ###
+
+def _row_run(board, column_index, row_index):
+    """
+        Return the length of the contiguous run of disks through the given
+        zero-based column and row of the given board.
+    """
+
+    left = column_index
+    while left > 0 and board[left - 1][row_index] is not None:
+        left -= 1
+    right = column_index
+    while right < len(board) - 1 and board[right + 1][row_index] is not None:
+        right += 1
+    return right - left + 1
+
+
+def _simplifications(board, drops):
+    """
+        Return a generator of simpler versions of the given board and single
+        drop, from the most to the least drastic simplification.
+    """
+
+    dimension = len(board)
+    (disk, column), = drops
+
+    if dimension > 1 and column != dimension and \
+            all(disk_at is None or disk_at[1] < dimension for board_column in board[:-1]
+                for disk_at in board_column) and (disk is None or disk[1] < dimension):
+        yield [board_column[:dimension] for board_column in board[:-1]], drops
+
+    for column_index in range(dimension):
+        heights = [row for row in range(dimension + 1) if board[column_index][row] is not None]
+        if heights:
+            simpler = Board.get_board_copy(board)
+            simpler[column_index][heights[-1]] = None
+            yield simpler, drops
+
+    for column_index in range(dimension):
+        for row in range(dimension + 1):
+            disk_at = board[column_index][row]
+            if disk_at is not None and disk_at[0] != Disk.VISIBLE:
+                simpler = Board.get_board_copy(board)
+                simpler[column_index][row][0] = Disk.VISIBLE
+                yield simpler, drops
+            if disk_at is not None and disk_at[1] > 1:
+                simpler = Board.get_board_copy(board)
+                simpler[column_index][row][1] -= 1
+                yield simpler, drops
+
+    if disk is not None and disk[1] > 1:
+        yield board, [([disk[0], disk[1] - 1], column)]
+
+
+def _fuzz_worker(task):
+    """
+        Check random cases until the time budget of the given task is spent,
+        and return a tuple of the number of cases, the number of drops and
+        the list of shrunk mismatches.
+        - Only the first mismatch of each engine is shrunk and kept, as later
+          ones are most likely the same bug.
+    """
+
+    seed, worker, time_budget, engine_names, max_dimension, max_drops, validation_level = task
+    Validation.set_level(validation_level)
+    engines = {name: ENGINES[name] for name in engine_names}
+    rng = random.Random("fuzz %d %d" % (seed, worker))
+    deadline = time.perf_counter() + time_budget
+    nb_cases = nb_drops = 0
+    mismatches = {}
+
+    while time.perf_counter() < deadline:
+        board, drops = random_case(rng, max_dimension, max_drops)
+        nb_cases += 1
+        nb_drops += len(drops)
+        for mismatch in check_case(board, drops, engines):
+            if mismatch.engine not in mismatches:
+                mismatches[mismatch.engine] = shrink(mismatch, engines)
+                del engines[mismatch.engine]
+        if not engines:
+            break
+
+    return nb_cases, nb_drops, list(mismatches.values())
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Differential fuzzing of the engines against a reference.")
+    parser.add_argument("--time", type=float, default=DEFAULT_TIME_BUDGET, help="time budget in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--engines", nargs="+", choices=sorted(ENGINES), default=None)
+    parser.add_argument("--max-dimension", type=int, default=DEFAULT_MAX_DIMENSION)
+    parser.add_argument("--max-drops", type=int, default=DEFAULT_MAX_DROPS)
+    parser.add_argument("--validation", choices=sorted(Validation.LEVELS), default="entry",
+                        help="validation level of the engines (see Validation)")
+    arguments = parser.parse_args()
+    Validation.set_level(arguments.validation)
+
+    summary = fuzz(arguments.time, arguments.seed, arguments.processes, arguments.engines,
+                   arguments.max_dimension, arguments.max_drops)
+
+    for mismatch in summary.mismatches:
+        print(format_mismatch(mismatch))
+    print("%d cases, %d drops in %.1f s, %d mismatches" %
+          (summary.nb_cases, summary.nb_drops, summary.elapsed, len(summary.mismatches)))
+    raise SystemExit(1 if summary.mismatches else 0)
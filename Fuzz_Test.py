@@ -0,0 +1,71 @@
+import random
+
+import Board
+import Disk
+import Drop7
+import Fuzz
+
+
+def _drop_without_cracking(board, disk, column):
+    """
+        A broken engine: cracked disks are made visible before each drop.
+    """
+
+    board[:] = [[None if disk_at is None else [Disk.VISIBLE if disk_at[0] == Disk.CRACKED else disk_at[0],
+                                              disk_at[1]] for disk_at in board_column] for board_column in board]
+    return Drop7.drop_disk_at(board, disk, column)
+
+
+
+def test_Reference_Drop__Stack_And_Cracking(score, max_score):
+    """Function reference_drop: the vertical chain is the stack from row 1, and neighbours are cracked."""
+    max_score.value += 2
+    try:
+        wrapped = Disk.init_disk(Disk.WRAPPED, 1)
+        board = Board.init_board(3, ((wrapped, Disk.init_disk(Disk.VISIBLE, 3)),))
+        assert Fuzz.reference_drop(board, Disk.init_disk(Disk.VISIBLE, 3), 1) == 2 * 2
+        assert board == Board.init_board(3, ((Disk.init_disk(Disk.CRACKED, 1),),))
+        score.value += 2
+    except:
+        pass
+
+def test_Check_Case__Engines_Agree(score, max_score):
+    """Function check_case: the engines agree with the reference on seeded random cases."""
+    max_score.value += 3
+    try:
+        rng = random.Random(7)
+        for case in range(200):
+            board, drops = Fuzz.random_case(rng, 5, 4)
+            assert Fuzz.check_case(board, drops, Fuzz.ENGINES) == []
+        summary = Fuzz.fuzz(0.2, 3, processes=1)
+        assert summary.nb_cases > 0 and summary.mismatches == []
+        score.value += 3
+    except:
+        pass
+
+def test_Shrink__Broken_Engine(score, max_score):
+    """Function shrink: a mismatch of a broken engine is shrunk to a single drop on a small board."""
+    max_score.value += 3
+    try:
+        engines = {"broken": _drop_without_cracking}
+        rng = random.Random(3)
+        mismatches = []
+        while not mismatches:
+            board, drops = Fuzz.random_case(rng, 6, 6)
+            mismatches = Fuzz.check_case(board, drops, engines)
+        shrunk = Fuzz.shrink(mismatches[0], engines)
+        assert shrunk.engine == "broken" and len(shrunk.drops) == 1
+        assert Fuzz.check_case(shrunk.board, shrunk.drops, engines) == [shrunk]
+        assert sum(disk is not None for column in shrunk.board for disk in column) <= 2
+        score.value += 3
+    except:
+        pass
+
+
+
+fuzz_test_functions = \
+    {
+        test_Reference_Drop__Stack_And_Cracking,
+        test_Check_Case__Engines_Agree,
+        test_Shrink__Broken_Engine
+    }
@@ -0,0 +1,285 @@
+import collections
+import random
+import struct
+
+import Board
+import Disk
+import Drop7
+
+# Game logs record complete games in a compact, append-only binary file.
+#  - A log starts with a header storing the version of the format, the
+#    dimension of the board, the interval between keyframes and the seed of
+#    the random generator the game was played with.
+#  - The header is followed by records, each starting with a single byte for
+#    its kind:
+#       - A turn record stores the dropped disk, the column it was dropped in
+#         and the score of the drop.
+#       - A level record stores the bonus for reaching the next level and the
+#         wrapped disks injected at the bottom of the board, from column 1 on.
+#       - A keyframe record stores the complete state of the game after some
+#         turn: the number of that turn, the total score, the number of turns
+#         in the current level, the number of turns per level and the board
+#         (see Board.to_bytes).
+#  - A keyframe is recorded before the first turn, and after every turn whose
+#    number is a multiple of the keyframe interval.
+#  - To reconstruct the state after some turn, a replay starts from the last
+#    keyframe at or before that turn and drops the recorded disks from there.
+
+MAGIC = b"D7LOG\0"
+VERSION = 1
+HEADER = struct.Struct("<6sBBHQ")       # magic, version, dimension, keyframe interval, seed
+TURN = struct.Struct("<BBBi")           # state, value, column, score
+LEVEL = struct.Struct("<H")             # bonus, followed by a state and a value per column
+KEYFRAME = struct.Struct("<IqBB")       # turn, total score, turns in level, turns per level
+
+TURN_RECORD = 1
+LEVEL_RECORD = 2
+KEYFRAME_RECORD = 3
+
+DEFAULT_KEYFRAME_INTERVAL = 32
+
+GameStep = collections.namedtuple("GameStep", [
+    "turn",
+    "disk",
+    "column",
+    "score",
+    "level_bonus",
+    "wrapped_disks"
+])
+
+class GameLogWriter:
+    """
+        A game log open for appending records.
+    """
+
+    __slots__ = ("file", "dimension", "keyframe_interval", "turn")
+
+    def __init__(self, path, dimension, seed, keyframe_interval=DEFAULT_KEYFRAME_INTERVAL):
+        self.file = open(path, "wb")
+        self.dimension = dimension
+        self.keyframe_interval = keyframe_interval
+        self.turn = 0
+        self.file.write(HEADER.pack(MAGIC, VERSION, dimension, keyframe_interval, seed))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+    def close(self):
+        """
+            Close this game log.
+        """
+
+        self.file.close()
+
+    def record_turn(self, disk, column, score):
+        """
+            Record that the given disk has been dropped in the given column,
+            with the given score.
+        """
+
+        self.turn += 1
+        self.file.write(bytes((TURN_RECORD,)) +
+                        TURN.pack(Disk.get_state(disk), Disk.get_value(disk), column, score))
+
+    def record_level(self, bonus, wrapped_disks):
+        """
+            Record that the next level has been reached with the given bonus,
+            and that the given wrapped disks have been injected, the first one
+            in column 1.
+        """
+
+        self.file.write(bytes((LEVEL_RECORD,)) + LEVEL.pack(bonus) +
+                        bytes(code for disk in wrapped_disks
+                              for code in (Disk.get_state(disk), Disk.get_value(disk))))
+
+    def record_keyframe(self, board, score, current_nb_turns, turns_per_level):
+        """
+            Record the given state of the game after the current turn.
+        """
+
+        self.file.write(bytes((KEYFRAME_RECORD,)) +
+                        KEYFRAME.pack(self.turn, score, current_nb_turns, turns_per_level) +
+                        Board.to_bytes(board))
+
+    def end_turn(self, board, score, current_nb_turns, turns_per_level):
+        """
+            Record a keyframe with the given state of the game if the current
+            turn is a multiple of the keyframe interval, and flush the log.
+        """
+
+        if self.turn % self.keyframe_interval == 0:
+            self.record_keyframe(board, score, current_nb_turns, turns_per_level)
+        self.file.flush()
+
+
+class GameLog:
+    """
+        A game log open for reading and replaying.
+        - Opening a log indexes the offsets of its records without decoding
+          any board.
+    """
+
+    __slots__ = ("data", "dimension", "keyframe_interval", "seed",
+                 "turn_offsets", "level_offsets", "keyframe_offsets")
+
+    def __init__(self, path):
+        with open(path, "rb") as file:
+            self.data = file.read()
+
+        magic, version, self.dimension, self.keyframe_interval, self.seed = \
+            HEADER.unpack_from(self.data)
+        assert magic == MAGIC and version == VERSION
+
+        self.turn_offsets = []
+        self.level_offsets = {}
+        self.keyframe_offsets = []
+        level_size = LEVEL.size + 2 * self.dimension
+        keyframe_size = KEYFRAME.size + Board.encoded_size(self.dimension)
+        offset = HEADER.size
+
+        while offset < len(self.data):
+            kind = self.data[offset]
+            offset += 1
+            if kind == TURN_RECORD:
+                self.turn_offsets.append(offset)
+                offset += TURN.size
+            elif kind == LEVEL_RECORD:
+                self.level_offsets[len(self.turn_offsets)] = offset
+                offset += level_size
+            else:
+                assert kind == KEYFRAME_RECORD
+                self.keyframe_offsets.append(offset)
+                offset += keyframe_size
+
+    def __len__(self):
+        return len(self.turn_offsets)
+
+    def step(self, turn):
+        """
+            Return the recorded step of the given turn.
+            - The level bonus is 0 and the tuple of wrapped disks is empty if
+              the given turn did not reach the next level.
+            ASSUMPTIONS
+            - The given turn is between 1 and the number of turns in this log.
+        """
+
+        state, value, column, score = TURN.unpack_from(self.data, self.turn_offsets[turn - 1])
+        bonus = 0
+        wrapped_disks = ()
+
+        if turn in self.level_offsets:
+            offset = self.level_offsets[turn]
+            bonus = LEVEL.unpack_from(self.data, offset)[0]
+            codes = self.data[offset + LEVEL.size:offset + LEVEL.size + 2 * self.dimension]
+            wrapped_disks = tuple(Disk.init_disk(codes[index], codes[index + 1])
+                                  for index in range(0, len(codes), 2))
+
+        return GameStep(turn, Disk.init_disk(state, value), column, score, bonus, wrapped_disks)
+
+    def keyframe(self, index):
+        """
+            Return the state of the game stored in the keyframe with the given
+            index, as a game state without disks to drop (see Drop7.GameState).
+        """
+
+        offset = self.keyframe_offsets[index]
+        turn, score, current_nb_turns, turns_per_level = KEYFRAME.unpack_from(self.data, offset)
+        board = Board.from_bytes(self.data, offset + KEYFRAME.size)
+        return Drop7.GameState(board, disks=[], score=score, turn=turn,
+                               current_nb_turns=current_nb_turns, turns_per_level=turns_per_level)
+
+    def replay_to(self, turn):
+        """
+            Return the state of the game after the given turn.
+            - The state is reconstructed from the last keyframe at or before the
+              given turn, by dropping the recorded disks of the turns after it
+              with Drop7.drop_disk_at and injecting the recorded wrapped disks.
+            - Scores are taken from the log.
+            ASSUMPTIONS
+            - The given turn is between 0 and the number of turns in this log.
+        """
+
+        index = min(turn // self.keyframe_interval, len(self.keyframe_offsets) - 1)
+        state = self.keyframe(index)
+        while state.turn > turn:
+            index -= 1
+            state = self.keyframe(index)
+
+        for next_turn in range(state.turn + 1, turn + 1):
+            state = replay_step(state, self.step(next_turn))
+
+        return state
+
+
+def replay_step(state, step):
+    """
+        Apply the given recorded step to the given game state, and return that
+        state.
+        - The recorded disk is dropped in the recorded column, and the recorded
+          wrapped disks are injected if the step reached the next level.
+        - Scores are taken from the given step.
+        ASSUMPTIONS
+        - The given state has no disks to drop left.
+    """
+
+    state.deal(Disk.get_disk_copy(step.disk))
+    state.step(step.column, step.wrapped_disks)
+    state.score += step.score + step.level_bonus - state.last_score - state.last_bonus
+    return state
+
+
+def play_logged_game(path, seed, choose_column=None, dimension=7, max_turns=500,
+                     keyframe_interval=DEFAULT_KEYFRAME_INTERVAL):
+    """
+        Play a game on an empty board with the given dimension following the
+        rules of Drop7.play, record it in a new game log at the given path,
+        and return its total score.
+        - All disks to drop and all wrapped disks to inject are drawn from a
+          random generator initialized with the given seed.
+        - The column of each drop is selected by the given function, called
+          with the board and the disk to drop. By default, the column with the
+          highest score for the drop is selected (see greedy_column).
+        - The game stops as soon as the board can no longer accept a disk, or
+          after the given number of turns.
+    """
+
+    if choose_column is None:
+        choose_column = greedy_column
+
+    state = Drop7.GameState(Board.init_board(dimension), rng=random.Random(seed))
+
+    with GameLogWriter(path, dimension, seed, keyframe_interval) as writer:
+        writer.record_keyframe(state.board, state.score, state.current_nb_turns, state.turns_per_level)
+
+        while state.turn < max_turns and not state.is_over():
+            disk = Disk.get_disk_copy(state.next_disk)
+            column = choose_column(state.board, disk)
+            state.step(column)
+            writer.record_turn(disk, column, state.last_score)
+            if state.last_wrapped_disks:
+                writer.record_level(state.last_bonus, state.last_wrapped_disks)
+            writer.end_turn(state.board, state.score, state.current_nb_turns, state.turns_per_level)
+
+    return state.score
+
+
+def greedy_column(board, disk):
+    """
+        Return the column in which dropping the given disk on the given board
+        yields the highest score. The leftmost of equally good columns is used.
+        ASSUMPTIONS
+        - The given board is a playable board that can accept the given disk.
+    """
+
+    best_column, best_score = None, None
+
+    for column in range(1, Board.dimension(board) + 1):
+        if not Board.is_full_column(board, column):
+            score = Drop7.unchecked_drop_disk_at(Board.get_board_copy(board), Disk.get_disk_copy(disk), column)
+            if best_score is None or score > best_score:
+                best_column, best_score = column, score
+
+    return best_column
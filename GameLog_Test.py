@@ -0,0 +1,84 @@
+import os
+import tempfile
+
+import Board
+import Disk
+import GameLog
+
+
+def test_Play_Logged_Game__Records_All_Turns(score, max_score):
+    """Function play_logged_game: header, turns, levels and keyframes are recorded."""
+    max_score.value += 3
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "game")
+            total_score = GameLog.play_logged_game(path, 11, dimension=5, max_turns=60,
+                                                   keyframe_interval=8)
+            log = GameLog.GameLog(path)
+            assert (log.dimension, log.keyframe_interval, log.seed) == (5, 8, 11)
+            assert 20 <= len(log) <= 60
+            assert len(log.keyframe_offsets) == 1 + len(log) // 8
+            assert 20 in log.level_offsets
+            step = log.step(20)
+            assert step.level_bonus == 1000 // 20
+            assert len(step.wrapped_disks) == 5
+            assert all(Disk.get_state(disk) == Disk.WRAPPED for disk in step.wrapped_disks)
+            assert log.replay_to(len(log)).score == total_score
+        score.value += 3
+    except:
+        pass
+
+def test_Replay_To__Matches_Replay_From_Start(score, max_score):
+    """Function replay_to: every turn matches a replay from the first turn."""
+    max_score.value += 4
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "game")
+            GameLog.play_logged_game(path, 3, dimension=5, max_turns=80, keyframe_interval=8)
+            log = GameLog.GameLog(path)
+            state = log.keyframe(0)
+            assert state.turn == 0 and state.board == Board.init_board(5)
+            for turn in range(1, len(log) + 1):
+                state = GameLog.replay_step(state, log.step(turn))
+                replayed = log.replay_to(turn)
+                assert replayed.turn == turn
+                assert replayed.board == state.board
+                assert replayed.score == state.score
+                assert replayed.current_nb_turns == state.current_nb_turns
+                assert replayed.turns_per_level == state.turns_per_level
+        score.value += 4
+    except:
+        pass
+
+def test_Replay_To__Starts_From_Nearest_Keyframe(score, max_score):
+    """Function replay_to: at most one keyframe interval of turns is replayed."""
+    max_score.value += 2
+    drop_disk_at = GameLog.Drop7.drop_disk_at
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "game")
+            GameLog.play_logged_game(path, 3, dimension=5, max_turns=80, keyframe_interval=8)
+            log = GameLog.GameLog(path)
+            drops = []
+            GameLog.Drop7.drop_disk_at = \
+                lambda board, disk=None, column=None, on_step=None: \
+                drops.append(column) or drop_disk_at(board, disk, column, on_step)
+            log.replay_to(len(log))
+            assert len(drops) == len(log) % 8
+            drops.clear()
+            log.replay_to(15)
+            assert len(drops) == 7
+        score.value += 2
+    except:
+        pass
+    finally:
+        GameLog.Drop7.drop_disk_at = drop_disk_at
+
+
+
+game_log_test_functions = \
+    {
+        test_Play_Logged_Game__Records_All_Turns,
+        test_Replay_To__Matches_Replay_From_Start,
+        test_Replay_To__Starts_From_Nearest_Keyframe
+    }
@@ -0,0 +1,370 @@
+import array
+import collections
+
+import Board
+import Disk
+
+# Heuristics give a static evaluation of boards that are not (yet) terminal.
+#  - Features are computed for a whole batch of boards at once. The boards of
+#    a batch are first encoded in flat arrays (see encode_boards), so that each
+#    feature is a single pass over contiguous memory instead of a walk through
+#    nested lists of disks.
+#  - The evaluation of a board is the sum of its features, each multiplied with
+#    the matching element of a weight vector. Higher evaluations are better.
+#  - Columns and rows in the flat arrays are numbered starting from 0.
+
+BoardBatch = collections.namedtuple("BoardBatch", [
+    "dimension",
+    "size",
+    "states",
+    "values",
+    "heights"
+])
+
+FEATURES = (
+    "total_height",
+    "max_height",
+    "bumpiness",
+    "wrapped",
+    "cracked",
+    "near_chain",
+    "overflow_risk",
+    "near_explosions"
+)
+
+DEFAULT_WEIGHTS = (-1.0, -2.0, -0.5, -1.5, -0.5, 1.0, -25.0, 3.0)
+
+
+def encode_boards(boards):
+    """
+        Return a batch storing the given boards in flat arrays.
+        - The cell at (zero-based) column C and row R of the board at index B
+          in the given sequence is stored at index (B*N + C)*(N+1) + R of the
+          arrays of states and values, with N the dimension of the boards.
+          Empty cells have state and value 0.
+        - The heights of the columns are stored at index B*N + C of the array
+          of heights. The height of a column is the number of disks stacked
+          from row 1 upwards, which is also the length of the vertical chain
+          of each disk in that column (see Board.get_length_vertical_chain).
+        ASSUMPTIONS
+        - The given sequence is not empty, and all boards in it are playable
+          boards with the same dimension.
+    """
+
+    boards = tuple(boards)
+    dimension = Board.dimension(boards[0])
+    column_length = dimension + 1
+    nb_cells = len(boards) * dimension * column_length
+
+    states = array.array("B", bytes(nb_cells))
+    values = array.array("B", bytes(nb_cells))
+    heights = array.array("B", bytes(len(boards) * dimension))
+
+    index = 0
+    for board_index, board in enumerate(boards):
+        for column_index, column in enumerate(board):
+            height = 0
+            for disk in column:
+                if disk is not None:
+                    states[index] = disk[0]
+                    values[index] = disk[1]
+                    height += 1
+                index += 1
+            heights[board_index * dimension + column_index] = height
+
+    return BoardBatch(dimension, len(boards), states, values, heights)
+
+
+def feature_total_height(batch):
+    """
+        Return an array with the total number of disks on each board of the
+        given batch.
+    """
+
+    dimension = batch.dimension
+    heights = batch.heights
+    return array.array("d", (sum(heights[start:start + dimension])
+                             for start in range(0, len(heights), dimension)))
+
+
+def feature_max_height(batch):
+    """
+        Return an array with the height of the highest column on each board
+        of the given batch.
+    """
+
+    dimension = batch.dimension
+    heights = batch.heights
+    return array.array("d", (max(heights[start:start + dimension])
+                             for start in range(0, len(heights), dimension)))
+
+
+def feature_bumpiness(batch):
+    """
+        Return an array with the sum of the height differences between
+        adjacent columns on each board of the given batch.
+    """
+
+    dimension = batch.dimension
+    heights = batch.heights
+    result = array.array("d", bytes(8 * batch.size))
+
+    for board_index in range(batch.size):
+        start = board_index * dimension
+        result[board_index] = sum(abs(heights[index] - heights[index + 1])
+                                  for index in range(start, start + dimension - 1))
+
+    return result
+
+
+def feature_wrapped(batch):
+    """
+        Return an array with the number of wrapped disks on each board of the
+        given batch, including the overflow row.
+    """
+
+    return _count_state(batch, Disk.WRAPPED)
+
+
+def feature_cracked(batch):
+    """
+        Return an array with the number of cracked disks on each board of the
+        given batch, including the overflow row.
+    """
+
+    return _count_state(batch, Disk.CRACKED)
+
+
+def feature_near_chain(batch):
+    """
+        Return an array with the number of visible disks on each board of the
+        given batch that are one step away from their chain value.
+        - A visible disk is one step away if its value is one more than the
+          length of its horizontal chain, or one more than the length of its
+          vertical chain.
+    """
+
+    dimension = batch.dimension
+    column_length = dimension + 1
+    board_length = dimension * column_length
+    states = batch.states
+    values = batch.values
+    heights = batch.heights
+    result = array.array("d", bytes(8 * batch.size))
+
+    for board_index in range(batch.size):
+        board_start = board_index * board_length
+        height_start = board_index * dimension
+        count = 0
+
+        for row in range(column_length):
+            horizontal = _horizontal_chains(states, board_start + row,
+                                            column_length, dimension)
+
+            for column in range(dimension):
+                index = board_start + column * column_length + row
+
+                if states[index] == Disk.VISIBLE:
+                    value = values[index]
+
+                    if value == horizontal[column] + 1 or \
+                            value == heights[height_start + column] + 1:
+                        count += 1
+
+        result[board_index] = count
+
+    return result
+
+
+def feature_overflow_risk(batch):
+    """
+        Return an array with the overflow risk of each board of the given batch.
+        - The risk is the number of full columns (see Board.is_full_column)
+          divided by the dimension, incremented with 1 as soon as the overflow
+          row stores a disk.
+        - The risk of a board is less than 1 if and only if the board can
+          accept a disk (see Board.can_accept_disk).
+    """
+
+    dimension = batch.dimension
+    heights = batch.heights
+    result = array.array("d", bytes(8 * batch.size))
+
+    for board_index in range(batch.size):
+        start = board_index * dimension
+        full = 0
+        overflow = 0
+
+        for height in heights[start:start + dimension]:
+            if height >= dimension:
+                full += 1
+            if height > dimension:
+                overflow = 1
+
+        result[board_index] = full / dimension + overflow
+
+    return result
+
+
+def feature_near_explosions(batch):
+    """
+        Return an array with the number of columns on each board of the given
+        batch in which dropping a disk, whatever its value, makes a disk
+        already on the board explode.
+        - Only columns that are not full are taken into account.
+        - The dropped disk extends the vertical chain of all disks in its
+          column, and it merges the horizontal chains to its left and to its
+          right.
+    """
+
+    dimension = batch.dimension
+    column_length = dimension + 1
+    board_length = dimension * column_length
+    states = batch.states
+    values = batch.values
+    heights = batch.heights
+    result = array.array("d", bytes(8 * batch.size))
+
+    for board_index in range(batch.size):
+        board_start = board_index * board_length
+        height_start = board_index * dimension
+        count = 0
+
+        for column in range(dimension):
+            height = heights[height_start + column]
+
+            if height >= dimension:
+                continue
+
+            column_start = board_start + column * column_length
+
+            if _has_visible_value(states, values,
+                                  range(column_start, column_start + height),
+                                  height + 1):
+                count += 1
+                continue
+
+            left = column
+            while left > 0 and states[column_start - (column - left + 1) * column_length + height]:
+                left -= 1
+            right = column
+            while right < dimension - 1 and states[column_start + (right - column + 1) * column_length + height]:
+                right += 1
+
+            chain = right - left + 1
+            row_start = board_start + height
+            neighbours = [row_start + other * column_length
+                          for other in range(left, right + 1) if other != column]
+
+            if _has_visible_value(states, values, neighbours, chain):
+                count += 1
+
+        result[board_index] = count
+
+    return result
+
+
+FEATURE_FUNCTIONS = (
+    feature_total_height,
+    feature_max_height,
+    feature_bumpiness,
+    feature_wrapped,
+    feature_cracked,
+    feature_near_chain,
+    feature_overflow_risk,
+    feature_near_explosions
+)
+
+
+def compute_features(batch):
+    """
+        Return a tuple of arrays, one for each feature in FEATURES and in the
+        same order, holding the value of that feature for each board of the
+        given batch.
+    """
+
+    return tuple(feature(batch) for feature in FEATURE_FUNCTIONS)
+
+
+def evaluate_boards(boards, weights=DEFAULT_WEIGHTS):
+    """
+        Return an array with the evaluation of each of the given boards.
+        - The evaluation of a board is the weighted sum of its features, using
+          the given weights in the order of FEATURES.
+        - The given boards may also be a batch obtained from encode_boards.
+        ASSUMPTIONS
+        - The given boards satisfy the assumptions of encode_boards.
+        - The number of given weights is equal to the number of features.
+    """
+
+    batch = boards if isinstance(boards, BoardBatch) else encode_boards(boards)
+    result = array.array("d", bytes(8 * batch.size))
+
+    for weight, feature_values in zip(weights, compute_features(batch)):
+        if weight:
+            for board_index, value in enumerate(feature_values):
+                result[board_index] += weight * value
+
+    return result
+
+
+def evaluate_board(board, weights=DEFAULT_WEIGHTS):
+    """
+        Return the evaluation of the given board using the given weights.
+        ASSUMPTIONS
+        - The given board is a playable board.
+    """
+
+    return evaluate_boards((board,), weights)[0]
+
+
+### HEURISTICS HELPER FUNCTIONS ###
+
+def _count_state(batch, state):
+    """
+        Return an array with the number of disks in the given state on each
+        board of the given batch.
+    """
+
+    board_length = batch.dimension * (batch.dimension + 1)
+    states = batch.states
+    return array.array("d", (states[start:start + board_length].count(state)
+                             for start in range(0, len(states), board_length)))
+
+
+def _horizontal_chains(states, row_start, column_length, dimension):
+    """
+        Return a list with the length of the horizontal chain through each
+        column of the row that starts at the given index, or 0 for empty cells.
+    """
+
+    chains = [0] * dimension
+    column = 0
+
+    while column < dimension:
+        if not states[row_start + column * column_length]:
+            column += 1
+            continue
+
+        end = column
+        while end < dimension and states[row_start + end * column_length]:
+            end += 1
+
+        for index in range(column, end):
+            chains[index] = end - column
+        column = end
+
+    return chains
+
+
+def _has_visible_value(states, values, indices, value):
+    """
+        Check whether a visible disk with the given value is stored at one
+        of the given indices.
+    """
+
+    for index in indices:
+        if states[index] == Disk.VISIBLE and values[index] == value:
+            return True
+
+    return False
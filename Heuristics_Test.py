@@ -0,0 +1,112 @@
+import Board
+import Disk
+import Heuristics
+
+test_board_4 = None
+full_board_2 = None
+overflow_board_2 = None
+
+
+def set_up():
+    """
+       This function initializes the boards that are used in the tests of
+       the heuristics.
+    """
+    global test_board_4, full_board_2, overflow_board_2
+
+    test_board_4 = Board.init_board \
+        (dimension=4, given_disks= \
+            ((Disk.init_disk(Disk.VISIBLE, 2),),
+             [],
+             (Disk.init_disk(Disk.WRAPPED, 3), Disk.init_disk(Disk.CRACKED, 1),
+              Disk.init_disk(Disk.VISIBLE, 4)),
+             (Disk.init_disk(Disk.VISIBLE, 3), Disk.init_disk(Disk.VISIBLE, 1))))
+
+    full_board_2 = Board.init_board \
+        (dimension=2, given_disks= \
+            ((Disk.init_disk(Disk.WRAPPED, 1), Disk.init_disk(Disk.WRAPPED, 2)),
+             (Disk.init_disk(Disk.WRAPPED, 2), Disk.init_disk(Disk.CRACKED, 1))))
+
+    overflow_board_2 = Board.init_board \
+        (dimension=2, given_disks= \
+            ((Disk.init_disk(Disk.WRAPPED, 1), Disk.init_disk(Disk.WRAPPED, 2),
+              Disk.init_disk(Disk.WRAPPED, 2)),))
+
+
+
+def test_Encode_Boards__Single_Case(score, max_score):
+    """Function encode_boards: single case."""
+    max_score.value += 2
+    try:
+        set_up()
+        batch = Heuristics.encode_boards((test_board_4, test_board_4))
+        assert batch.dimension == 4
+        assert batch.size == 2
+        assert list(batch.heights) == [1, 0, 3, 2, 1, 0, 3, 2]
+        # Column 3, row 3 of the second board.
+        assert batch.states[(1 * 4 + 2) * 5 + 2] == Disk.VISIBLE
+        assert batch.values[(1 * 4 + 2) * 5 + 2] == 4
+        assert batch.states[(1 * 4 + 1) * 5] == 0
+        score.value += 2
+    except:
+        pass
+
+def test_Compute_Features__Single_Case(score, max_score):
+    """Function compute_features: single case."""
+    max_score.value += 5
+    try:
+        set_up()
+        features = Heuristics.compute_features(Heuristics.encode_boards((test_board_4,)))
+        values = dict(zip(Heuristics.FEATURES, (feature[0] for feature in features)))
+        assert values["total_height"] == 6
+        assert values["max_height"] == 3
+        assert values["bumpiness"] == 5
+        assert values["wrapped"] == 1
+        assert values["cracked"] == 1
+        assert values["near_chain"] == 3
+        assert values["overflow_risk"] == 0
+        assert values["near_explosions"] == 3
+        score.value += 5
+    except:
+        pass
+
+def test_Feature_Overflow_Risk__Can_Accept_Disk(score, max_score):
+    """Function feature_overflow_risk: consistent with can_accept_disk."""
+    max_score.value += 2
+    try:
+        set_up()
+        boards = (test_board_4, full_board_2, overflow_board_2)
+        risks = Heuristics.feature_overflow_risk(Heuristics.encode_boards(boards[1:]))
+        assert risks[0] == 1.0
+        assert risks[1] == 1.5
+        for board in boards:
+            risk = Heuristics.feature_overflow_risk(Heuristics.encode_boards((board,)))[0]
+            assert (risk < 1) == Board.can_accept_disk(board)
+        score.value += 2
+    except:
+        pass
+
+def test_Evaluate_Boards__Weighted_Sum(score, max_score):
+    """Function evaluate_boards: weighted sum of features for each board in the batch."""
+    max_score.value += 3
+    try:
+        set_up()
+        weights = tuple(range(1, len(Heuristics.FEATURES) + 1))
+        evaluations = Heuristics.evaluate_boards((test_board_4, test_board_4), weights)
+        assert len(evaluations) == 2
+        assert evaluations[0] == evaluations[1] == \
+               6*1 + 3*2 + 5*3 + 1*4 + 1*5 + 3*6 + 0*7 + 3*8
+        assert Heuristics.evaluate_board(test_board_4, weights) == evaluations[0]
+        score.value += 3
+    except:
+        pass
+
+
+
+heuristics_test_functions = \
+    {
+        test_Encode_Boards__Single_Case,
+        test_Compute_Features__Single_Case,
+        test_Feature_Overflow_Risk__Can_Accept_Disk,
+        test_Evaluate_Boards__Weighted_Sum
+    }
@@ -0,0 +1,166 @@
+import queue
+import random
+import threading
+
+import Board
+import Disk
+import Drop7
+
+# The hint engine searches the best column for the next disk in a background
+# thread, such that an interactive front end stays responsive meanwhile.
+#  - The search deepens progressively. At depth 1, columns are ranked by the
+#    score of dropping the next disk. At depth D, the score of the drop is
+#    increased with the average highest score (see Drop7.highest_score) of
+#    dropping D-1 further random disks, over a number of sampled sequences
+#    of such disks. A hint is posted after each completed depth.
+#  - A search is cancelled as soon as a new one is started (e.g. because the
+#    player dropped a disk), or explicitly. A cancelled search stops at the
+#    next sampled sequence, and its hints are never returned.
+#  - The front end polls the hints from its own thread (see poll), e.g. from
+#    a Tk after callback.
+
+DEFAULT_MAX_DEPTH = 4
+DEFAULT_NB_SAMPLES = 8
+
+
+class HintEngine:
+    """
+        An engine computing hints in a background thread.
+    """
+
+    __slots__ = ("max_depth", "nb_samples", "hints", "generation",
+                 "cancelled", "thread")
+
+    def __init__(self, max_depth=DEFAULT_MAX_DEPTH, nb_samples=DEFAULT_NB_SAMPLES):
+        self.max_depth = max_depth
+        self.nb_samples = nb_samples
+        self.hints = queue.Queue()
+        self.generation = 0
+        self.cancelled = threading.Event()
+        self.thread = None
+
+    def start(self, board, disk, seed=None):
+        """
+            Cancel the running search, if any, and start searching the best
+            column for dropping the given disk on the given board.
+            - The search works on copies of the given board and disk.
+            - The random disks of the search are drawn from a random generator
+              initialized with the given seed.
+        """
+
+        self.cancel()
+        self.generation += 1
+        self.cancelled = threading.Event()
+        self.thread = threading.Thread(
+            target=self._search,
+            args=(self.generation, self.cancelled, Board.get_board_copy(board),
+                  Disk.get_disk_copy(disk), random.Random(seed)),
+            daemon=True)
+        self.thread.start()
+
+    def cancel(self):
+        """
+            Cancel the running search, if any. Hints it already posted are
+            discarded.
+        """
+
+        self.cancelled.set()
+
+    def poll(self):
+        """
+            Return a tuple of the depth and the column of the deepest hint
+            posted by the current search since the previous poll, or None if
+            there is no such hint.
+        """
+
+        result = None
+
+        while True:
+            try:
+                generation, depth, column = self.hints.get_nowait()
+            except queue.Empty:
+                return result
+            if generation == self.generation and not self.cancelled.is_set():
+                result = (depth, column)
+
+    def wait(self, timeout=None):
+        """
+            Wait until the current search, if any, has finished or stopped.
+        """
+
+        if self.thread is not None:
+            self.thread.join(timeout)
+
+    def _search(self, generation, cancelled, board, disk, rng):
+        """
+            Post a hint for each depth of the search, until the maximum depth
+            is reached or the search is cancelled.
+        """
+
+        for depth in range(1, self.max_depth + 1):
+            column = search_hint(board, disk, depth, self.nb_samples, rng, cancelled.is_set)
+            if column is None:
+                return
+            self.hints.put((generation, depth, column))
+
+
+def search_hint(board, disk, depth, nb_samples, rng, is_cancelled=None, stats=None):
+    """
+        Return the best column for dropping the given disk on the given board,
+        searched at the given depth (see HintEngine), or None if the given
+        board cannot accept the given disk or if the search is cancelled.
+        - The given function is_cancelled, if any, is called before each
+          sampled sequence of disks; the search is cancelled as soon as it
+          returns true.
+        - The random disks are drawn from the given random generator. The same
+          sequences of disks are used for all columns.
+        - If several columns are equally good, the leftmost of them is used.
+        - The given search statistics, if any, are updated with the drops of
+          the given disk at depth 0, and with the searches of the sampled
+          sequences of disks, whose nodes are counted from depth 0 as well.
+          (see SearchStats)
+        ASSUMPTIONS
+        - The given board is a playable board, and the given disk is a proper
+          disk for it that is not cracked.
+    """
+
+    dimension = Board.dimension(board)
+    samples = [[Disk.init_disk(rng.choice((Disk.VISIBLE, Disk.WRAPPED)), rng.randint(1, dimension))
+                for index in range(depth - 1)]
+               for sample in range(nb_samples if depth > 1 else 0)]
+    best_column, best_value = None, None
+    on_step = None if stats is None else stats.count_step
+
+    if stats is not None:
+        stats.start()
+        stats.expand(0)
+
+    try:
+        for column in range(1, dimension + 1):
+            if Board.is_full_column(board, column):
+                if stats is not None:
+                    stats.prunes += 1
+                continue
+
+            copy_board = Board.get_board_copy(board)
+            value = Drop7.unchecked_drop_disk_at(copy_board, Disk.get_disk_copy(disk), column, on_step)
+
+            if samples and Board.can_accept_disk(copy_board):
+                total = 0
+                for sample in samples:
+                    if is_cancelled is not None and is_cancelled():
+                        return None
+                    future_score = Drop7.highest_score(copy_board, [Disk.get_disk_copy(future_disk)
+                                                                    for future_disk in sample], stats)[0]
+                    total += future_score or 0
+                value += total / len(samples)
+
+            if best_value is None or value > best_value:
+                best_column, best_value = column, value
+                if stats is not None:
+                    stats.record_variation(value, (column,))
+    finally:
+        if stats is not None:
+            stats.finish()
+
+    return best_column
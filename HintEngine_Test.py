@@ -0,0 +1,84 @@
+import random
+
+import Board
+import Disk
+import HintEngine
+
+
+
+def test_Search_Hint__Exploding_Column(score, max_score):
+    """Function search_hint: the column in which the disk explodes is suggested."""
+    max_score.value += 2
+    try:
+        board = Board.init_board(4, ((), (), (Disk.init_disk(Disk.VISIBLE, 3), Disk.init_disk(Disk.VISIBLE, 3))))
+        for depth in (1, 2):
+            assert HintEngine.search_hint(board, Disk.init_disk(Disk.VISIBLE, 3), depth, 2, random.Random(0)) == 3
+        score.value += 2
+    except:
+        pass
+
+def test_Search_Hint__Full_Board(score, max_score):
+    """Function search_hint: a board that cannot accept the disk has no hint."""
+    max_score.value += 1
+    try:
+        disk = Disk.init_disk(Disk.WRAPPED, 1)
+        board = Board.init_board(2, ((disk, disk), (disk, disk)))
+        assert HintEngine.search_hint(board, Disk.init_disk(Disk.VISIBLE, 1), 1, 2, random.Random(0)) is None
+        score.value += 1
+    except:
+        pass
+
+def test_Search_Hint__Cancelled(score, max_score):
+    """Function search_hint: a cancelled search has no hint."""
+    max_score.value += 1
+    try:
+        board = Board.init_board(4)
+        assert HintEngine.search_hint(board, Disk.init_disk(Disk.VISIBLE, 2), 2, 2, random.Random(0),
+                                      lambda: True) is None
+        score.value += 1
+    except:
+        pass
+
+def test_Hint_Engine__Progressive_Hints(score, max_score):
+    """Class HintEngine: the deepest hint of the current search is polled."""
+    max_score.value += 2
+    try:
+        board = Board.init_board(4, ((), (), (Disk.init_disk(Disk.VISIBLE, 3), Disk.init_disk(Disk.VISIBLE, 3))))
+        engine = HintEngine.HintEngine(max_depth=3, nb_samples=2)
+        engine.start(board, Disk.init_disk(Disk.VISIBLE, 3), seed=0)
+        engine.wait(30)
+        depth, column = engine.poll()
+        assert depth == 3 and 1 <= column <= 4
+        assert engine.poll() is None
+        score.value += 2
+    except:
+        pass
+
+def test_Hint_Engine__Stale_Hints(score, max_score):
+    """Class HintEngine: hints of cancelled and previous searches are discarded."""
+    max_score.value += 2
+    try:
+        board = Board.init_board(4)
+        engine = HintEngine.HintEngine(max_depth=2, nb_samples=2)
+        engine.start(board, Disk.init_disk(Disk.VISIBLE, 2), seed=0)
+        engine.wait(30)
+        engine.cancel()
+        assert engine.poll() is None
+        engine.start(board, Disk.init_disk(Disk.VISIBLE, 2), seed=0)
+        engine.wait(30)
+        engine.hints.put((engine.generation - 1, 5, 1))
+        assert engine.poll()[0] == 2
+        score.value += 2
+    except:
+        pass
+
+
+
+hint_engine_test_functions = \
+    {
+        test_Search_Hint__Exploding_Column,
+        test_Search_Hint__Full_Board,
+        test_Search_Hint__Cancelled,
+        test_Hint_Engine__Progressive_Hints,
+        test_Hint_Engine__Stale_Hints
+    }
@@ -0,0 +1,221 @@
+import argparse
+import collections
+import functools
+import time
+
+import Board
+import Drop7
+import Heuristics
+import Tuner
+import Validation
+
+# Instrumentation counts the calls of the hot functions of Board and Drop7, and
+# accumulates the wall time spent in them.
+#  - Instrumentation is opt-in. While it is enabled, the instrumented functions
+#    are replaced in their modules by wrappers that record each call. Callers
+#    always look functions up in their module (e.g. Board.get_disk_at, or
+#    get_disk_at within Board), so calls from all modules are recorded. When
+#    instrumentation is disabled, the original functions are restored, and no
+#    overhead at all remains.
+#  - For each function, the profile stores the number of calls and the total
+#    time. The total time of a recursive function only counts its outermost
+#    calls, such that it never exceeds the elapsed time.
+#  - For each stack of instrumented functions, the profile stores the self
+#    time of the innermost function, i.e. its time minus the time of the
+#    instrumented functions it called. These stacks can be written in the
+#    collapsed format of flame graphs (see write_collapsed).
+#  - Instrumentation is not thread-safe: only one thread may call instrumented
+#    functions while it is enabled.
+
+DEFAULT_FUNCTIONS = (
+    (Board, "get_board_copy"),
+    (Board, "get_disk_at"),
+    (Board, "unchecked_get_disk_at"),
+    (Board, "unchecked_set_disk_at"),
+    (Board, "is_full_column"),
+    (Board, "get_length_vertical_chain"),
+    (Board, "get_length_horizontal_chain"),
+    (Board, "get_all_positions_to_explode"),
+    (Board, "remove_all_disks_at"),
+    (Board, "is_proper_board"),
+    (Board, "is_playable_board"),
+    (Drop7, "drop_disk_at"),
+    (Drop7, "do_explosions"),
+)
+
+
+class Profile:
+    """
+        The calls and times recorded while instrumentation was enabled.
+        - calls and times map the name of each instrumented function, e.g.
+          "Board.get_disk_at", to its number of calls and its total time in
+          seconds.
+        - self_times maps each stack of names of instrumented functions, a
+          tuple from the outermost to the innermost function, to the self
+          time in seconds of the innermost function in that stack.
+    """
+
+    __slots__ = ("calls", "times", "self_times", "path", "child_times")
+
+    def __init__(self):
+        self.calls = collections.Counter()
+        self.times = collections.Counter()
+        self.self_times = collections.Counter()
+        self.path = ()
+        self.child_times = []
+
+
+_profile = None
+_originals = {}
+
+
+def enable(functions=DEFAULT_FUNCTIONS):
+    """
+        Enable instrumentation of the given functions, each given as a tuple
+        of a module and the name of a function in it, and return the new
+        profile recording their calls.
+        ASSUMPTIONS
+        - Instrumentation is disabled.
+    """
+
+    global _profile
+
+    assert _profile is None
+    _profile = Profile()
+
+    for module, name in functions:
+        function = getattr(module, name)
+        _originals[(module, name)] = function
+        setattr(module, name, _instrument(_profile, module.__name__ + "." + name, function))
+
+    return _profile
+
+
+def disable():
+    """
+        Disable instrumentation, restore all instrumented functions, and return
+        the profile that recorded their calls, or None if instrumentation was
+        not enabled.
+    """
+
+    global _profile
+
+    for (module, name), function in _originals.items():
+        setattr(module, name, function)
+    _originals.clear()
+
+    profile, _profile = _profile, None
+    return profile
+
+
+def is_enabled():
+    """
+        Check whether instrumentation is enabled.
+    """
+
+    return _profile is not None
+
+
+class instrumented:
+    """
+        A context manager enabling instrumentation of the given functions on
+        entry (see enable), and disabling it on exit. Entering it returns the
+        profile.
+    """
+
+    __slots__ = ("functions",)
+
+    def __init__(self, functions=DEFAULT_FUNCTIONS):
+        self.functions = functions
+
+    def __enter__(self):
+        return enable(self.functions)
+
+    def __exit__(self, *exception):
+        disable()
+
+
+def format_table(profile):
+    """
+        Return the calls and times of the given profile as a flat table, one
+        line per function, sorted by decreasing total time.
+    """
+
+    lines = ["%-36s %12s %12s %12s %12s" % ("function", "calls", "total ms", "self ms", "us/call")]
+    self_times = collections.Counter()
+    for path, self_time in profile.self_times.items():
+        self_times[path[-1]] += self_time
+
+    for name, total in sorted(profile.times.items(), key=lambda item: -item[1]):
+        calls = profile.calls[name]
+        lines.append("%-36s %12d %12.3f %12.3f %12.3f" %
+                     (name, calls, total * 1e3, self_times[name] * 1e3, total * 1e6 / calls))
+
+    return "\n".join(lines) + "\n"
+
+
+def write_collapsed(profile, file):
+    """
+        Write the self times of the given profile to the given text file in
+        the collapsed stack format of flame graphs: one line per stack, with
+        the names of the functions separated by semicolons, followed by the
+        self time in microseconds.
+    """
+
+    for path, self_time in sorted(profile.self_times.items()):
+        file.write("%s %d\n" % (";".join(path), round(self_time * 1e6)))
+
+
+### INSTRUMENTATION HELPER FUNCTIONS ###
+
+def _instrument(profile, name, function):
+    """
+        Return a wrapper of the given function recording its calls under the
+        given name in the given profile.
+    """
+
+    perf_counter = time.perf_counter
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        path = profile.path
+        profile.path = path + (name,)
+        profile.child_times.append(0.0)
+        start = perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            elapsed = perf_counter() - start
+            child_time = profile.child_times.pop()
+            if profile.child_times:
+                profile.child_times[-1] += elapsed
+            profile.path = path
+            profile.calls[name] += 1
+            if name not in path:
+                profile.times[name] += elapsed
+            profile.self_times[path + (name,)] += elapsed - child_time
+
+    return wrapper
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Profile the hot functions of Board and Drop7 on self-play games.")
+    parser.add_argument("--games", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--dimension", type=int, default=Tuner.DEFAULT_DIMENSION)
+    parser.add_argument("--max-turns", type=int, default=Tuner.DEFAULT_MAX_TURNS)
+    parser.add_argument("--collapsed", default=None, help="write the stacks in collapsed format to this file")
+    parser.add_argument("--validation", choices=sorted(Validation.LEVELS), default="off",
+                        help="validation level of the game (see Validation)")
+    arguments = parser.parse_args()
+    Validation.set_level(arguments.validation)
+
+    with instrumented() as profile:
+        for game in range(arguments.games):
+            Tuner.play_self_game(Heuristics.DEFAULT_WEIGHTS, arguments.seed + game,
+                                 arguments.dimension, arguments.max_turns)
+
+    print(format_table(profile), end="")
+    if arguments.collapsed is not None:
+        with open(arguments.collapsed, "w") as file:
+            write_collapsed(profile, file)
@@ -0,0 +1,56 @@
+import io
+
+import Board
+import Disk
+import Drop7
+import Instrumentation
+
+
+
+def test_Instrumented__Calls_And_Restore(score, max_score):
+    """Function enable/disable: calls are counted while enabled, and the original functions are restored."""
+    max_score.value += 3
+    try:
+        original = Board.get_all_positions_to_explode
+        board = Board.init_board(4, ((Disk.init_disk(Disk.VISIBLE, 2),),))
+        with Instrumentation.instrumented() as profile:
+            assert Instrumentation.is_enabled()
+            assert Board.get_all_positions_to_explode is not original
+            Drop7.drop_disk_at(board, Disk.init_disk(Disk.VISIBLE, 2), 2)
+        assert not Instrumentation.is_enabled()
+        assert Board.get_all_positions_to_explode is original
+        assert profile.calls["Drop7.drop_disk_at"] == 1
+        assert profile.calls["Drop7.do_explosions"] == 2
+        assert profile.calls["Board.get_all_positions_to_explode"] == 2
+        assert profile.calls["Board.unchecked_get_disk_at"] > 0
+        assert profile.times["Drop7.do_explosions"] <= profile.times["Drop7.drop_disk_at"]
+        score.value += 3
+    except:
+        pass
+
+def test_Write_Collapsed__Stacks(score, max_score):
+    """Function write_collapsed: one line per stack of instrumented functions, with self times."""
+    max_score.value += 2
+    try:
+        board = Board.init_board(4)
+        with Instrumentation.instrumented(((Drop7, "drop_disk_at"), (Board, "get_all_positions_to_explode"))) \
+                as profile:
+            Drop7.drop_disk_at(board, Disk.init_disk(Disk.VISIBLE, 3), 1)
+        file = io.StringIO()
+        Instrumentation.write_collapsed(profile, file)
+        lines = file.getvalue().splitlines()
+        assert [line.split()[0] for line in lines] == \
+               ["Drop7.drop_disk_at", "Drop7.drop_disk_at;Board.get_all_positions_to_explode"]
+        assert all(int(line.split()[1]) >= 0 for line in lines)
+        assert "Drop7.drop_disk_at" in Instrumentation.format_table(profile)
+        score.value += 2
+    except:
+        pass
+
+
+
+instrumentation_test_functions = \
+    {
+        test_Instrumented__Calls_And_Restore,
+        test_Write_Collapsed__Stacks
+    }
@@ -142,26 +142,56 @@ def get_all_adjacent_positions(dimension, positions):
         in the given collection of positions and within the boundaries of any board
         with the given dimension.
         - If no positions are given, there are no adjacent positions.
+        - The result is the union of the entries of the given positions in the
+          adjacent positions table. (see get_adjacent_positions_table)
         ASSUMPTIONS
         - Each position in the given collection of positions is a proper position
           for any board with the given dimension.
     """
 
-    adjacent_positions = set()
-    positions = tuple(positions)
+    adjacent_positions = get_adjacent_positions_table(dimension)
 
-    if positions == ():
-        return adjacent_positions
+    return set().union(*(adjacent_positions[position] for position in positions))
 
-    for i in positions:
-        set.add(adjacent_positions, left(dimension, i))
-        set.add(adjacent_positions, right(dimension, i))
-        set.add(adjacent_positions, up(dimension, i))
-        set.add(adjacent_positions, down(dimension, i))
-        adjacent_positions = set.difference(adjacent_positions, {None})     # If one of the fucntions
-        # left,right,up or down returns None, this must be removed from the list.
 
-    return adjacent_positions
+def get_traversal(dimension):
+    """
+        Return a tuple of all positions on any board with the given dimension,
+        in the order in which the function next visits them starting from (1,1).
+        - The tuple is computed once per dimension and shared by all callers.
+        ASSUMPTIONS
+        - The given dimension is a natural number.
+    """
+
+    return _get_tables(dimension)[0]
+
+
+def get_flat_index_table(dimension):
+    """
+        Return a dictionary mapping each position on any board with the given
+        dimension to its zero-based index in the traversal of that board.
+        (see get_traversal)
+        - The dictionary is computed once per dimension and shared by all
+          callers. It must not be changed.
+        ASSUMPTIONS
+        - The given dimension is a natural number.
+    """
+
+    return _get_tables(dimension)[1]
+
+
+def get_adjacent_positions_table(dimension):
+    """
+        Return a dictionary mapping each position on any board with the given
+        dimension to a frozen set of all positions adjacent to it.
+        - The dictionary is computed once per dimension and shared by all
+          callers. It must not be changed.
+        ASSUMPTIONS
+        - The given dimension is a natural number.
+    """
+
+    return _get_tables(dimension)[2]
+
 
 ### POSITION HELPER FUNCTIONS ###
 
@@ -178,4 +208,34 @@ def is_natural_number(number):
     if isinstance(number, int) and number > 0:
         return True
 
-    return False
\ No newline at end of file
+    return False
+
+
+_tables = {}
+
+
+def _get_tables(dimension):
+    """
+        Return a tuple of the traversal, the flat index table and the adjacent
+        positions table for any board with the given dimension, computing them
+        on the first request for that dimension.
+    """
+
+    if dimension not in _tables:
+        traversal = []
+        position = (1, 1)
+        while position is not None:
+            traversal.append(position)
+            position = next(dimension, position)
+
+        flat_index = {position: index for index, position in enumerate(traversal)}
+        adjacent_positions = {
+            position: frozenset(neighbour for neighbour in
+                                (left(dimension, position), right(dimension, position),
+                                 up(dimension, position), down(dimension, position))
+                                if neighbour is not None)
+            for position in traversal}
+
+        _tables[dimension] = (tuple(traversal), flat_index, adjacent_positions)
+
+    return _tables[dimension]
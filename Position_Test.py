@@ -249,6 +249,24 @@ def test_Get_All_Adjacent_Positions__Collection_of_Positions(score, max_score):
     except:
         pass
 
+def test_Position_Tables__Match_Functions(score, max_score):
+    """Functions get_traversal, get_flat_index_table, get_adjacent_positions_table: match next, left, right, up and down."""
+    max_score.value += 3
+    try:
+        traversal = Position.get_traversal(3)
+        assert len(traversal) == 12
+        assert traversal[0] == (1, 1) and traversal[-1] == (3, 4)
+        assert all(Position.next(3, traversal[index]) == traversal[index + 1] for index in range(11))
+        assert all(Position.get_flat_index_table(3)[position] == index
+                   for index, position in enumerate(traversal))
+        assert Position.get_adjacent_positions_table(3)[(1, 4)] == frozenset(((2, 4), (1, 3)))
+        assert Position.get_adjacent_positions_table(3)[(2, 2)] == \
+               frozenset(((1, 2), (3, 2), (2, 3), (2, 1)))
+        assert Position.get_traversal(3) is traversal
+        score.value += 3
+    except:
+        pass
+
 
 
 position_test_functions = \
@@ -277,7 +295,8 @@ position_test_functions = \
         test_Get_All_Adjacent_Positions__Top_Left_Position,
         test_Get_All_Adjacent_Positions__Top_Right_Position,
         test_Get_All_Adjacent_Positions__Arbitrary_Position,
-        test_Get_All_Adjacent_Positions__Collection_of_Positions
+        test_Get_All_Adjacent_Positions__Collection_of_Positions,
+        test_Position_Tables__Match_Functions
     }
 
 
@@ -0,0 +1,142 @@
+import time
+import tracemalloc
+
+# Search statistics describe the work done by the solvers (Drop7.highest_score,
+# Drop7.highest_greedy_score, Drop7.best_drop_for_disk, SolutionStore.solve
+# and HintEngine.search_hint).
+#  - A solver updates the statistics given to it, if any, in place. The same
+#    statistics may be given to several searches, e.g. to all searches of a
+#    game, in which case they accumulate.
+#  - Nodes are the boards on which a solver tries to drop a disk. The depth of
+#    a node is the number of disks dropped before it in the search.
+#  - Cascade steps are the steps of explosions simulated by all drops of the
+#    search. (see Drop7.ExplosionStep)
+#  - Cache hits and misses are lookups of solutions in a cache or a store.
+#    Evictions are entries dropped from a cache to stay within its memory
+#    budget. (see Drop7.TranspositionCache)
+#  - Prunes are columns or subtrees that are not searched further, because a
+#    column is full or because the remaining disks cannot all be dropped.
+#  - Peak memory is only measured while tracemalloc is tracing, either
+#    because the caller started it or because the statistics were created
+#    with trace_memory. It is relative to the memory traced at the start of
+#    the search. The peak of a caller who is tracing is never reset, so if
+#    that peak was higher before the search, the peak memory of the search is
+#    an upper bound.
+#  - Without statistics, solvers do none of this bookkeeping.
+
+class SearchStats:
+    """
+        Statistics of one or more searches.
+        - The given function trace, if any, is called with the score and the
+          columns of each new principal variation, i.e. each new best solution
+          found at the root of a search, as it changes.
+    """
+
+    __slots__ = ("nodes_per_depth", "cascade_steps", "cache_hits", "cache_misses",
+                 "prunes", "evictions", "peak_memory", "elapsed", "principal_variation",
+                 "trace", "trace_memory", "_nesting", "_start", "_started_tracing",
+                 "_memory_baseline")
+
+    def __init__(self, trace=None, trace_memory=False):
+        self.nodes_per_depth = []
+        self.cascade_steps = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.prunes = 0
+        self.evictions = 0
+        self.peak_memory = None
+        self.elapsed = 0.0
+        self.principal_variation = None
+        self.trace = trace
+        self.trace_memory = trace_memory
+        self._nesting = 0
+        self._start = None
+        self._started_tracing = False
+        self._memory_baseline = None
+
+    def total_nodes(self):
+        """
+            Return the total number of nodes expanded at all depths.
+        """
+
+        return sum(self.nodes_per_depth)
+
+    def start(self):
+        """
+            Mark the start of a search. Searches started within a search (e.g.
+            the drops of a greedy search) are part of the outermost search, and
+            are not timed separately.
+        """
+
+        if self._nesting == 0:
+            if self.trace_memory and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            self._memory_baseline = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+            self._start = time.perf_counter()
+        self._nesting += 1
+
+    def finish(self):
+        """
+            Mark the end of a search, and add its time and its peak memory to
+            these statistics if it is the outermost search.
+        """
+
+        self._nesting -= 1
+        if self._nesting == 0:
+            self.elapsed += time.perf_counter() - self._start
+            if self._memory_baseline is not None and tracemalloc.is_tracing():
+                peak = max(0, tracemalloc.get_traced_memory()[1] - self._memory_baseline)
+                self.peak_memory = peak if self.peak_memory is None else max(self.peak_memory, peak)
+            if self._started_tracing:
+                tracemalloc.stop()
+                self._started_tracing = False
+
+    def expand(self, depth):
+        """
+            Count a node expanded at the given depth.
+        """
+
+        while len(self.nodes_per_depth) <= depth:
+            self.nodes_per_depth.append(0)
+        self.nodes_per_depth[depth] += 1
+
+    def count_step(self, step):
+        """
+            Count the given step of explosions. This method can be given as the
+            function on_step of a drop. (see Drop7.drop_disk_at)
+        """
+
+        self.cascade_steps += 1
+
+    def record_variation(self, score, columns):
+        """
+            Record the given score and columns as the new principal variation,
+            and pass them to the trace function, if any.
+            - Variations of searches started within a search (e.g. the searches
+              of a hint) are ignored.
+        """
+
+        if self._nesting > 1:
+            return
+        self.principal_variation = (score, tuple(columns))
+        if self.trace is not None:
+            self.trace(score, tuple(columns))
+
+    def as_dict(self):
+        """
+            Return a dictionary of these statistics, e.g. to be logged as JSON.
+        """
+
+        return {
+            "nodes": self.total_nodes(),
+            "nodes_per_depth": list(self.nodes_per_depth),
+            "cascade_steps": self.cascade_steps,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "prunes": self.prunes,
+            "evictions": self.evictions,
+            "peak_memory": self.peak_memory,
+            "elapsed": self.elapsed,
+            "principal_variation": self.principal_variation
+        }
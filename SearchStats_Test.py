@@ -0,0 +1,100 @@
+import os
+import tempfile
+import tracemalloc
+
+import Board
+import Disk
+import Drop7
+import SearchStats
+import SolutionStore
+
+
+
+def test_Highest_Score__Nodes_And_Variations(score, max_score):
+    """Function highest_score: nodes per depth, prunes and principal variations are recorded."""
+    max_score.value += 3
+    try:
+        wrapped = Disk.init_disk(Disk.WRAPPED, 1)
+        board = Board.init_board(3, ((wrapped, wrapped, wrapped),))
+        disks = [Disk.init_disk(Disk.VISIBLE, 1), Disk.init_disk(Disk.VISIBLE, 2)]
+        variations = []
+        stats = SearchStats.SearchStats(trace=lambda score, columns: variations.append((score, columns)))
+        assert Drop7.highest_score(board, disks, stats) == Drop7.highest_score(board, disks)
+        assert stats.nodes_per_depth == [1, 2]
+        assert stats.total_nodes() == 3
+        assert stats.prunes == 1 + 2
+        assert variations and variations[-1] == (Drop7.highest_score(board, disks)[0],
+                                                 tuple(Drop7.highest_score(board, disks)[1]))
+        assert stats.principal_variation == variations[-1]
+        assert stats.elapsed > 0
+        score.value += 3
+    except:
+        pass
+
+def test_Highest_Greedy_Score__Depths_And_Steps(score, max_score):
+    """Function highest_greedy_score: one node per disk, and the steps of all tried and actual drops."""
+    max_score.value += 2
+    try:
+        board = Board.init_board(4)
+        stats = SearchStats.SearchStats()
+        result = Drop7.highest_greedy_score(board, [Disk.init_disk(Disk.VISIBLE, 1),
+                                                    Disk.init_disk(Disk.VISIBLE, 4)], stats=stats)
+        assert result == (2, (4, 4))
+        assert stats.nodes_per_depth == [1, 1]
+        assert stats.cascade_steps == 4 + 1
+        score.value += 2
+    except:
+        pass
+
+def test_Solve__Cache_Hits_And_Memory(score, max_score):
+    """Function solve: lookups are counted as hits and misses, and the peak memory is traced."""
+    max_score.value += 2
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "store")
+            SolutionStore.create_store(path, 8)
+            with SolutionStore.SolutionStore(path, writable=True) as store:
+                stats = SearchStats.SearchStats(trace_memory=True)
+                board = Board.init_board(3)
+                disks = [Disk.init_disk(Disk.VISIBLE, 2), Disk.init_disk(Disk.VISIBLE, 2)]
+                first = SolutionStore.solve(store, board, disks, stats)
+                assert SolutionStore.solve(store, board, disks, stats) == first
+                assert (stats.cache_hits, stats.cache_misses) == (1, 1)
+                assert stats.nodes_per_depth == [1, 3]
+                assert stats.peak_memory > 0
+                assert stats.as_dict()["nodes"] == 4
+        score.value += 2
+    except:
+        pass
+
+def test_Start__Caller_Peak_Kept(score, max_score):
+    """Class SearchStats: the peak memory of a caller who is tracing is not reset by a search."""
+    max_score.value += 2
+    was_tracing = tracemalloc.is_tracing()
+    try:
+        if not was_tracing:
+            tracemalloc.start()
+        block = bytearray(10 ** 6)
+        del block
+        caller_peak = tracemalloc.get_traced_memory()[1]
+        stats = SearchStats.SearchStats(trace_memory=True)
+        Drop7.highest_score(Board.init_board(3), [Disk.init_disk(Disk.VISIBLE, 2)], stats)
+        assert tracemalloc.is_tracing()
+        assert tracemalloc.get_traced_memory()[1] >= caller_peak
+        assert 0 <= stats.peak_memory <= caller_peak
+        score.value += 2
+    except:
+        pass
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+
+
+
+search_stats_test_functions = \
+    {
+        test_Highest_Score__Nodes_And_Variations,
+        test_Highest_Greedy_Score__Depths_And_Steps,
+        test_Solve__Cache_Hits_And_Memory,
+        test_Start__Caller_Peak_Kept
+    }
@@ -0,0 +1,340 @@
+import argparse
+import hashlib
+import mmap
+import os
+import struct
+
+import Board
+import Drop7
+
+# A solution store keeps the results of Drop7.highest_score on disk, such
+# that the same problem is never solved twice, not even across restarts.
+#  - A store is a single file with a header, a fixed-size open-addressing
+#    table of slots, and a heap of records that only grows at its end.
+#  - Each slot stores the hash of a key and the offset of its record in the
+#    file. An offset of 0 marks a free slot.
+#  - Each record stores the length of its key, the length of its value, the
+#    key and the value.
+#  - Readers map the file in memory and compare keys and return values as
+#    views on that mapping, without copying them. Many processes can
+#    therefore share one file without loading it.
+#  - New records are appended at the end of the file before their slot is
+#    filled in, such that readers never see a slot referring to a record
+#    that is not completely written. There must be at most one writer.
+#  - Replaced records stay in the heap until the store is compacted.
+
+MAGIC = b"D7STORE\0"
+VERSION = 3
+HEADER = struct.Struct("<8sHHIQQ")      # magic, version, reserved, reserved, capacity, count
+SLOT = struct.Struct("<QQ")             # hash, offset
+RECORD = struct.Struct("<HH")           # key length, value length
+SOLUTION = struct.Struct("<i")          # score, followed by one byte per column
+DEFAULT_CAPACITY = 1 << 16
+MAX_LOAD = 0.75
+
+
+def create_store(path, capacity=DEFAULT_CAPACITY):
+    """
+        Create an empty solution store at the given path with the given
+        number of slots.
+        - The capacity is rounded up to a power of 2.
+        - An existing file at the given path is overwritten.
+    """
+
+    capacity = _round_capacity(capacity)
+
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, 0, 0, capacity, 0))
+        file.truncate(HEADER.size + capacity * SLOT.size)
+
+
+class SolutionStore:
+    """
+        An open solution store.
+        - Stores opened for writing can also be read. Stores opened for
+          reading only may be shared by any number of processes.
+    """
+
+    __slots__ = ("path", "writable", "capacity", "file", "mapping", "view")
+
+    def __init__(self, path, writable=False):
+        self.path = path
+        self.writable = writable
+        self.file = open(path, "r+b" if writable else "rb")
+        self.mapping = None
+        self.view = None
+        self._map()
+
+        magic, version, reserved, reserved_2, capacity, count = HEADER.unpack_from(self.mapping)
+        assert magic == MAGIC and version == VERSION
+        self.capacity = capacity
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+    def __len__(self):
+        return HEADER.unpack_from(self.mapping)[5]
+
+    def close(self):
+        """
+            Close this store.
+        """
+
+        self.view.release()
+        self.mapping.close()
+        self.file.close()
+
+    def lookup(self, key):
+        """
+            Return a memoryview on the value stored for the given key, or None
+            if the key is not in this store.
+            - The view refers to the mapped file. It must be released before
+              the store is closed.
+        """
+
+        hash_key = _hash(key)
+        slot = self._find_slot(key, hash_key)
+        offset = SLOT.unpack_from(self.mapping, slot)[1]
+
+        if offset == 0:
+            return None
+
+        start, key_length, value_length = self._record(offset)
+        start += key_length
+        return self.view[start:start + value_length]
+
+    def append(self, key, value):
+        """
+            Store the given value for the given key, and return whether that
+            succeeded.
+            - A value already stored for the given key is replaced.
+            - False is returned if the table of this store is too full to add
+              a new key. The store must then be compacted with a larger
+              capacity (see compact_store).
+            ASSUMPTIONS
+            - This store is opened for writing.
+            - The given key and value are bytes-like objects shorter than 64KiB.
+        """
+
+        hash_key = _hash(key)
+        slot = self._find_slot(key, hash_key)
+        is_new = SLOT.unpack_from(self.mapping, slot)[1] == 0
+
+        if is_new and len(self) + 1 > self.capacity * MAX_LOAD:
+            return False
+
+        self.file.seek(0, os.SEEK_END)
+        offset = self.file.tell()
+        self.file.write(RECORD.pack(len(key), len(value)) + bytes(key) + bytes(value))
+        self.file.flush()
+
+        self.file.seek(slot)
+        self.file.write(SLOT.pack(hash_key, offset))
+        if is_new:
+            self.file.seek(0)
+            self.file.write(HEADER.pack(MAGIC, VERSION, 0, 0, self.capacity, len(self) + 1))
+        self.file.flush()
+
+        return True
+
+    def items(self):
+        """
+            Return a generator of (key, value) tuples of bytes for all keys in
+            this store, in the order of their slots.
+        """
+
+        self._map()
+
+        for slot in range(self.capacity):
+            offset = SLOT.unpack_from(self.mapping, HEADER.size + slot * SLOT.size)[1]
+
+            if offset != 0:
+                start, key_length, value_length = self._record(offset)
+                yield (bytes(self.view[start:start + key_length]),
+                       bytes(self.view[start + key_length:start + key_length + value_length]))
+
+    def _find_slot(self, key, hash_key):
+        """
+            Return the offset of the slot storing the given key, or of the
+            free slot at which the given key must be stored.
+        """
+
+        mask = self.capacity - 1
+        index = hash_key & mask
+
+        while True:
+            slot = HEADER.size + index * SLOT.size
+            stored_hash, offset = SLOT.unpack_from(self.mapping, slot)
+
+            if offset == 0:
+                return slot
+
+            if stored_hash == hash_key:
+                start, key_length, value_length = self._record(offset)
+                if key_length == len(key) and self.view[start:start + key_length] == key:
+                    return slot
+
+            index = (index + 1) & mask
+
+    def _record(self, offset):
+        """
+            Return a tuple of the offset of the key, the length of the key
+            and the length of the value of the record at the given offset.
+            - The file is mapped again if the record has been appended after
+              the current mapping was made, possibly by another process.
+        """
+
+        if offset + RECORD.size > len(self.mapping):
+            self._map()
+        key_length, value_length = RECORD.unpack_from(self.mapping, offset)
+        start = offset + RECORD.size
+        if start + key_length + value_length > len(self.mapping):
+            self._map()
+        return start, key_length, value_length
+
+    def _map(self):
+        """
+            (Re)map the complete file of this store in memory.
+        """
+
+        # The previous mapping is not closed explicitly: values returned by
+        # lookup may still refer to it. It is closed once they are released.
+        self.mapping = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.mapping)
+
+
+def compact_store(path, capacity=None):
+    """
+        Rewrite the solution store at the given path without replaced records,
+        and return the number of keys in it.
+        - The new store gets the given capacity, or twice the capacity needed
+          for its keys if no capacity is given.
+        - The compacted store replaces the original in a single step.
+        ASSUMPTIONS
+        - No process is writing to the given store.
+    """
+
+    temporary_path = path + ".compact"
+
+    with SolutionStore(path) as store:
+        if capacity is None:
+            capacity = 2 * int(len(store) / MAX_LOAD + 1)
+        create_store(temporary_path, capacity)
+
+        with SolutionStore(temporary_path, writable=True) as compacted:
+            for key, value in store.items():
+                assert compacted.append(key, value)
+            count = len(compacted)
+
+    os.replace(temporary_path, path)
+    return count
+
+
+def solution_key(board, disks):
+    """
+        Return the key identifying the problem of dropping the given disks,
+        in the given order, on the given board.
+        - The key is the binary representation of the board (see Board.to_bytes)
+          followed by that of the disks. (see Board.disks_to_bytes)
+        ASSUMPTIONS
+        - The given board is a playable board, and each of the given disks is
+          a proper disk for it.
+    """
+
+    return Board.to_bytes(board) + Board.disks_to_bytes(disks, Board.dimension(board))
+
+
+def encode_solution(solution):
+    """
+        Return the bytes representing the given result of Drop7.highest_score.
+    """
+
+    score, columns = solution
+    if score is None:
+        return SOLUTION.pack(-1)
+    return SOLUTION.pack(score) + bytes(columns)
+
+
+def decode_solution(value):
+    """
+        Return the result of Drop7.highest_score represented by the given bytes.
+    """
+
+    score = SOLUTION.unpack_from(value)[0]
+    if score < 0:
+        return (None, None)
+    return (score, list(value[SOLUTION.size:]))
+
+
+def solve(store, board, disks, stats=None):
+    """
+        Return the result of Drop7.highest_score for the given board and disks,
+        taken from the given store if it has been solved before.
+        - Newly solved problems are appended to the given store if it is opened
+          for writing and not too full.
+        - As with highest_score, the given board and disks are not changed.
+        - The given search statistics, if any, count the lookup in the store
+          as a cache hit or miss, and are updated with the search on a miss.
+          (see SearchStats)
+    """
+
+    key = solution_key(board, disks)
+    value = store.lookup(key)
+
+    if value is not None:
+        if stats is not None:
+            stats.cache_hits += 1
+        solution = decode_solution(value)
+        value.release()
+        return solution
+
+    if stats is not None:
+        stats.cache_misses += 1
+    solution = Drop7.highest_score(board, disks, stats)
+    if store.writable:
+        store.append(key, encode_solution(solution))
+    return solution
+
+
+### SOLUTION STORE HELPER FUNCTIONS ###
+
+def _hash(key):
+    """
+        Return a 64-bit hash of the given key that is the same in all processes.
+    """
+
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little")
+
+
+def _round_capacity(capacity):
+    """
+        Return the smallest power of 2 that is not below the given capacity.
+    """
+
+    return 1 << max(int(capacity) - 1, 1).bit_length()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Maintain a solution store.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    create_parser = subparsers.add_parser("create", help="create an empty store")
+    create_parser.add_argument("path")
+    create_parser.add_argument("--capacity", type=int, default=DEFAULT_CAPACITY)
+    compact_parser = subparsers.add_parser("compact", help="drop replaced records and resize")
+    compact_parser.add_argument("path")
+    compact_parser.add_argument("--capacity", type=int, default=None)
+    stats_parser = subparsers.add_parser("stats", help="print the size of a store")
+    stats_parser.add_argument("path")
+    arguments = parser.parse_args()
+
+    if arguments.command == "create":
+        create_store(arguments.path, arguments.capacity)
+    elif arguments.command == "compact":
+        print("Keys:", compact_store(arguments.path, arguments.capacity))
+    else:
+        with SolutionStore(arguments.path) as store:
+            print("Keys:", len(store), "/", store.capacity)
+            print("File size:", os.path.getsize(arguments.path), "bytes")
@@ -0,0 +1,139 @@
+import os
+import tempfile
+
+import Board
+import Disk
+import SolutionStore
+
+
+def test_Append_Lookup__Single_Case(score, max_score):
+    """Function append/lookup: stored values are found, other keys are not."""
+    max_score.value += 3
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "store")
+            SolutionStore.create_store(path, 8)
+            with SolutionStore.SolutionStore(path, writable=True) as store:
+                assert store.capacity == 8
+                assert store.append(b"key", b"value")
+                assert store.append(b"other", b"")
+                assert len(store) == 2
+                value = store.lookup(b"key")
+                assert bytes(value) == b"value"
+                value.release()
+                assert store.lookup(b"missing") is None
+                # Replacing a value does not add a key.
+                assert store.append(b"key", b"new value")
+                assert len(store) == 2
+                value = store.lookup(b"key")
+                assert bytes(value) == b"new value"
+                value.release()
+        score.value += 3
+    except:
+        pass
+
+def test_Append__Table_Full(score, max_score):
+    """Function append: no new keys beyond the maximum load of the table."""
+    max_score.value += 1
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "store")
+            SolutionStore.create_store(path, 4)
+            with SolutionStore.SolutionStore(path, writable=True) as store:
+                assert all(store.append(bytes([key]), b"x") for key in range(3))
+                assert not store.append(b"\xff", b"x")
+                assert store.append(b"\x00", b"y")
+        score.value += 1
+    except:
+        pass
+
+def test_Lookup__Reader_Sees_Appended_Records(score, max_score):
+    """Function lookup: a reader opened before an append finds the new record."""
+    max_score.value += 2
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "store")
+            SolutionStore.create_store(path, 16)
+            with SolutionStore.SolutionStore(path) as reader, \
+                    SolutionStore.SolutionStore(path, writable=True) as writer:
+                assert reader.lookup(b"key") is None
+                writer.append(b"key", b"value" * 1000)
+                value = reader.lookup(b"key")
+                assert bytes(value) == b"value" * 1000
+                value.release()
+        score.value += 2
+    except:
+        pass
+
+def test_Compact_Store__Keeps_Latest_Values(score, max_score):
+    """Function compact_store: latest values are kept and the file shrinks."""
+    max_score.value += 3
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "store")
+            SolutionStore.create_store(path, 64)
+            with SolutionStore.SolutionStore(path, writable=True) as store:
+                for round in range(10):
+                    for key in range(10):
+                        store.append(bytes([key]), bytes([round]) * 100)
+            size = os.path.getsize(path)
+            assert SolutionStore.compact_store(path) == 10
+            assert os.path.getsize(path) < size
+            with SolutionStore.SolutionStore(path) as store:
+                assert dict(store.items()) == {bytes([key]): bytes([9]) * 100 for key in range(10)}
+        score.value += 3
+    except:
+        pass
+
+def test_Solve__Cached_Solution(score, max_score):
+    """Function solve: solutions are stored and found again."""
+    max_score.value += 3
+    try:
+        board = Board.init_board(4, ((Disk.init_disk(Disk.VISIBLE, 2),),
+                                     (Disk.init_disk(Disk.WRAPPED, 1),)))
+        disks = [Disk.init_disk(Disk.VISIBLE, 2), Disk.init_disk(Disk.VISIBLE, 1)]
+        expected = SolutionStore.Drop7.highest_score(board, disks)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "store")
+            SolutionStore.create_store(path, 16)
+            with SolutionStore.SolutionStore(path, writable=True) as store:
+                assert SolutionStore.solve(store, board, disks) == expected
+                assert len(store) == 1
+            with SolutionStore.SolutionStore(path) as store:
+                key = SolutionStore.solution_key(board, disks)
+                value = store.lookup(key)
+                assert SolutionStore.decode_solution(value) == expected
+                value.release()
+                assert SolutionStore.solve(store, board, disks) == expected
+            full_board = Board.init_board(2, ((Disk.init_disk(Disk.WRAPPED, 1),) * 2,
+                                              (Disk.init_disk(Disk.WRAPPED, 1),) * 2))
+            assert SolutionStore.decode_solution(SolutionStore.encode_solution(
+                SolutionStore.Drop7.highest_score(full_board, disks))) == (None, None)
+        score.value += 3
+    except:
+        pass
+
+def test_Solution_Key__Large_Disk_Values(score, max_score):
+    """Function solution_key: disks with values of 64 and more give distinct keys."""
+    max_score.value += 1
+    try:
+        board = Board.init_board(70)
+        keys = {SolutionStore.solution_key(board, disks) for disks in
+                ((Disk.init_disk(Disk.VISIBLE, 1),), (Disk.init_disk(Disk.VISIBLE, 65),),
+                 (Disk.init_disk(Disk.CRACKED, 1),), (Disk.init_disk(Disk.VISIBLE, 1),) * 2, ())}
+        assert len(keys) == 5
+        score.value += 1
+    except:
+        pass
+
+
+
+solution_store_test_functions = \
+    {
+        test_Append_Lookup__Single_Case,
+        test_Append__Table_Full,
+        test_Lookup__Reader_Sees_Appended_Records,
+        test_Compact_Store__Keeps_Latest_Values,
+        test_Solve__Cached_Solution,
+        test_Solution_Key__Large_Disk_Values
+    }
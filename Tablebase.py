@@ -0,0 +1,421 @@
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import struct
+
+import Board
+import Disk
+import Drop7
+import SolutionStore
+import Validation
+
+# A tablebase stores the optimal play for all boards of a small dimension
+# that can be reached within a given number of drops (the horizon).
+#  - Disks to drop are drawn from a given distribution of disks. The column
+#    of each drop is selected after the disk to drop is known.
+#  - For each reachable board and each number of remaining drops, the
+#    tablebase stores the expected score of optimal play and, for each disk
+#    of the distribution, the best column to drop that disk in. As with
+#    Drop7.highest_score, raises of level are not taken into account, and
+#    the leftmost of several equally good columns is used.
+#  - Boards that can no longer accept a disk have an expected score of 0.
+#  - A tablebase is a solution store (see SolutionStore) keyed by the binary
+#    representation of a board (see Board.to_bytes) followed by the number of
+#    remaining drops, with a small JSON file describing the dimension, the
+#    horizon and the distribution next to it. Queries take constant time.
+#  - The builder first enumerates the reachable boards layer by layer, forward
+#    from the empty board, and then computes the expected scores layer by
+#    layer, backward from the horizon. Each layer is split in chunks that are
+#    processed on a pool of processes. The results of all chunks are saved
+#    in a work directory, such that an interrupted build resumes with the
+#    chunks that were not yet processed.
+
+CHUNK_SIZE = 256
+EXPECTED = struct.Struct("<d")
+
+
+def default_distribution(dimension):
+    """
+        Return the distribution of disks used by the game: visible and wrapped
+        disks with all values from 1 up to the given dimension, all equally
+        likely.
+        - A distribution is a tuple of ((state, value), probability) pairs.
+    """
+
+    disks = [(state, value) for state in (Disk.VISIBLE, Disk.WRAPPED)
+             for value in range(1, dimension + 1)]
+    return tuple((disk, 1 / len(disks)) for disk in disks)
+
+
+def build_tablebase(path, dimension, horizon, distribution=None, processes=None,
+                    work_directory=None):
+    """
+        Build a tablebase at the given path for boards with the given dimension
+        and the given horizon, and return the number of stored entries.
+        - The default distribution of disks is the distribution of the game
+          (see default_distribution).
+        - The work is spread over the given number of processes. If that number
+          is 1, all work is done in the current process.
+        - Intermediate results are kept in the given work directory, which
+          defaults to the given path extended with ".work". An interrupted build
+          resumes from it when called again with the same arguments. The work
+          directory is removed once the tablebase is complete.
+        ASSUMPTIONS
+        - The given dimension is between 2 and 4, and the given horizon is a
+          natural number.
+    """
+
+    if distribution is None:
+        distribution = default_distribution(dimension)
+    distribution = tuple((tuple(disk), probability) for disk, probability in distribution)
+    if work_directory is None:
+        work_directory = path + ".work"
+    os.makedirs(work_directory, exist_ok=True)
+
+    _init_worker(path, distribution, Validation.level)
+    pool = None if processes == 1 else \
+        multiprocessing.Pool(processes, _init_worker, (path, distribution, Validation.level))
+
+    try:
+        empty_board = Board.to_bytes(Board.init_board(dimension))
+        layer_sizes = [_write_layer(work_directory, 0, [empty_board])]
+        for depth in range(horizon):
+            layer_sizes.append(_expand_layer(pool, work_directory, depth))
+
+        if not os.path.exists(os.path.join(work_directory, "created")):
+            SolutionStore.create_store(path, sum(layer_sizes[:-1]) / SolutionStore.MAX_LOAD + 1)
+            _write_marker(work_directory, "created")
+
+        for depth in range(horizon - 1, -1, -1):
+            _solve_layer(pool, work_directory, path, depth, horizon - depth)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    with open(path + ".json", "w") as file:
+        json.dump({"dimension": dimension, "horizon": horizon,
+                   "distribution": distribution}, file)
+    shutil.rmtree(work_directory)
+
+    return sum(layer_sizes[:-1])
+
+
+class Tablebase:
+    """
+        An open tablebase.
+    """
+
+    __slots__ = ("store", "dimension", "horizon", "distribution")
+
+    def __init__(self, path):
+        with open(path + ".json") as file:
+            description = json.load(file)
+        self.dimension = description["dimension"]
+        self.horizon = description["horizon"]
+        self.distribution = tuple((tuple(disk), probability)
+                                  for disk, probability in description["distribution"])
+        self.store = SolutionStore.SolutionStore(path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+    def close(self):
+        """
+            Close this tablebase.
+        """
+
+        self.store.close()
+
+    def lookup(self, board, remaining):
+        """
+            Return a tuple of (1) the expected score of optimal play for the
+            given number of remaining drops on the given board, followed by
+            (2) a tuple with the best column for each disk of the distribution,
+            in the order of the distribution.
+            - None is returned if the given board is not in this tablebase.
+            - The best columns are 0 if the board can no longer accept a disk.
+            ASSUMPTIONS
+            - The given number of remaining drops is between 1 and the horizon.
+        """
+
+        value = self.store.lookup(_key(Board.to_bytes(board), remaining))
+        if value is None:
+            return None
+
+        result = EXPECTED.unpack_from(value)[0], tuple(value[EXPECTED.size:])
+        value.release()
+        return result
+
+    def expected_score(self, board, remaining):
+        """
+            Return the expected score of optimal play for the given number of
+            remaining drops on the given board, or None if the given board is
+            not in this tablebase.
+        """
+
+        result = self.lookup(board, remaining)
+        return None if result is None else result[0]
+
+    def best_column(self, board, disk, remaining):
+        """
+            Return the best column to drop the given disk in on the given board
+            with the given number of remaining drops, including that disk.
+            - None is returned if the given board is not in this tablebase, or
+              if the given disk is not in the distribution of this tablebase.
+        """
+
+        result = self.lookup(board, remaining)
+        disks = [disk_in_distribution for disk_in_distribution, probability in self.distribution]
+        if result is None or tuple(disk) not in disks:
+            return None
+        return result[1][disks.index(tuple(disk))]
+
+
+### TABLEBASE HELPER FUNCTIONS ###
+
+_store = None
+_distribution = None
+
+
+def _init_worker(path, distribution, validation_level):
+    """
+        Initialize the global state of a process working on the tablebase at
+        the given path, including its validation level. (see Validation)
+    """
+
+    global _store, _distribution
+    _store = path
+    _distribution = distribution
+    Validation.set_level(validation_level)
+
+
+def _successors(board):
+    """
+        Return a list with, for each disk of the distribution, a list of
+        (column, score, encoded board) tuples for each column in which that
+        disk can be dropped on the given board.
+    """
+
+    result = []
+
+    for (state, value), probability in _distribution:
+        drops = []
+        for column in range(1, Board.dimension(board) + 1):
+            if not Board.is_full_column(board, column):
+                copy_board = Board.get_board_copy(board)
+                score = Drop7.unchecked_drop_disk_at(copy_board, Disk.init_disk(state, value), column)
+                drops.append((column, score, Board.to_bytes(copy_board)))
+        result.append(drops)
+
+    return result
+
+
+def _expand_chunk(task):
+    """
+        Return the set of encoded boards reachable with one drop from the
+        boards in the given chunk of encoded boards.
+    """
+
+    result = set()
+
+    for encoded in task:
+        board = Board.from_bytes(encoded)
+        if Board.can_accept_disk(board):
+            for drops in _successors(board):
+                result.update(encoded_successor for column, score, encoded_successor in drops)
+
+    return result
+
+
+def _solve_chunk(task):
+    """
+        Return the bytes of the records for the given chunk of encoded boards,
+        each with the given number of remaining drops.
+    """
+
+    chunk, remaining = task
+    records = bytearray()
+    store = None if remaining == 1 else SolutionStore.SolutionStore(_store)
+
+    try:
+        for encoded in chunk:
+            board = Board.from_bytes(encoded)
+            expected = 0.0
+            columns = bytearray(len(_distribution))
+
+            if Board.can_accept_disk(board):
+                for index, drops in enumerate(_successors(board)):
+                    best_column, best_score = 0, None
+                    for column, score, encoded_successor in drops:
+                        if store is not None:
+                            value = store.lookup(_key(encoded_successor, remaining - 1))
+                            score += EXPECTED.unpack_from(value)[0]
+                            value.release()
+                        if best_score is None or score > best_score:
+                            best_column, best_score = column, score
+                    columns[index] = best_column
+                    expected += _distribution[index][1] * best_score
+
+            records += _key(encoded, remaining) + EXPECTED.pack(expected) + columns
+    finally:
+        if store is not None:
+            store.close()
+
+    return bytes(records)
+
+
+def _run_chunks(pool, function, tasks, result_paths, write_result):
+    """
+        Run the given function on each task whose result path does not exist
+        yet, and write each result to its result path.
+    """
+
+    pending = [(task, result_path) for task, result_path in zip(tasks, result_paths)
+               if not os.path.exists(result_path)]
+    tasks = [task for task, result_path in pending]
+    results = map(function, tasks) if pool is None else pool.imap(function, tasks)
+
+    for (task, result_path), result in zip(pending, results):
+        temporary_path = result_path + ".tmp"
+        with open(temporary_path, "wb") as file:
+            write_result(file, result)
+        os.replace(temporary_path, result_path)
+
+
+def _expand_layer(pool, work_directory, depth):
+    """
+        Compute the layer of boards after the given depth from the layer at
+        the given depth, and return its number of boards.
+    """
+
+    layer_path = _layer_path(work_directory, depth + 1)
+    if os.path.exists(layer_path):
+        return len(_read_layer(work_directory, depth + 1))
+
+    chunks = _chunks(_read_layer(work_directory, depth))
+    result_paths = [os.path.join(work_directory, "expand_%d_%d" % (depth, index))
+                    for index in range(len(chunks))]
+    _run_chunks(pool, _expand_chunk, chunks, result_paths,
+                lambda file, boards: file.write(b"".join(sorted(boards))))
+
+    boards = set()
+    record_length = len(chunks[0][0])
+    for result_path in result_paths:
+        with open(result_path, "rb") as file:
+            data = file.read()
+        boards.update(data[start:start + record_length]
+                      for start in range(0, len(data), record_length))
+
+    size = _write_layer(work_directory, depth + 1, sorted(boards))
+    for result_path in result_paths:
+        os.remove(result_path)
+    return size
+
+
+def _solve_layer(pool, work_directory, path, depth, remaining):
+    """
+        Compute and store the records for the layer of boards at the given
+        depth, with the given number of remaining drops.
+    """
+
+    marker = "stored_%d" % depth
+    if os.path.exists(os.path.join(work_directory, marker)):
+        return
+
+    chunks = _chunks(_read_layer(work_directory, depth))
+    result_paths = [os.path.join(work_directory, "solve_%d_%d" % (depth, index))
+                    for index in range(len(chunks))]
+    _run_chunks(pool, _solve_chunk, [(chunk, remaining) for chunk in chunks],
+                result_paths, lambda file, records: file.write(records))
+
+    key_length = len(chunks[0][0]) + 1
+    record_length = key_length + EXPECTED.size + len(_distribution)
+    with SolutionStore.SolutionStore(path, writable=True) as store:
+        for result_path in result_paths:
+            with open(result_path, "rb") as file:
+                data = file.read()
+            for start in range(0, len(data), record_length):
+                assert store.append(data[start:start + key_length],
+                                    data[start + key_length:start + record_length])
+
+    _write_marker(work_directory, marker)
+    for result_path in result_paths:
+        os.remove(result_path)
+
+
+def _key(encoded_board, remaining):
+    """
+        Return the key of the given encoded board with the given number of
+        remaining drops.
+    """
+
+    return encoded_board + bytes([remaining])
+
+
+def _chunks(boards):
+    """
+        Return a list of chunks of the given list of encoded boards.
+    """
+
+    return [boards[start:start + CHUNK_SIZE] for start in range(0, len(boards), CHUNK_SIZE)]
+
+
+def _layer_path(work_directory, depth):
+    """
+        Return the path of the layer at the given depth.
+    """
+
+    return os.path.join(work_directory, "layer_%d" % depth)
+
+
+def _read_layer(work_directory, depth):
+    """
+        Return the list of encoded boards in the layer at the given depth.
+    """
+
+    with open(_layer_path(work_directory, depth), "rb") as file:
+        data = file.read()
+    record_length = Board.encoded_size(data[1])
+    return [data[start:start + record_length] for start in range(0, len(data), record_length)]
+
+
+def _write_layer(work_directory, depth, boards):
+    """
+        Save the given list of encoded boards as the layer at the given depth,
+        and return the number of boards in it.
+    """
+
+    path = _layer_path(work_directory, depth)
+    with open(path + ".tmp", "wb") as file:
+        file.write(b"".join(boards))
+    os.replace(path + ".tmp", path)
+    return len(boards)
+
+
+def _write_marker(work_directory, name):
+    """
+        Record that the step with the given name is complete.
+    """
+
+    open(os.path.join(work_directory, name), "w").close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Build a tablebase for small boards.")
+    parser.add_argument("path")
+    parser.add_argument("dimension", type=int, choices=(2, 3, 4))
+    parser.add_argument("horizon", type=int)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--validation", choices=sorted(Validation.LEVELS), default="off",
+                        help="validation level of the game (see Validation)")
+    arguments = parser.parse_args()
+    Validation.set_level(arguments.validation)
+
+    print("Entries:", build_tablebase(arguments.path, arguments.dimension,
+                                      arguments.horizon, processes=arguments.processes))
@@ -0,0 +1,113 @@
+import os
+import tempfile
+
+import Board
+import Disk
+import Drop7
+import Tablebase
+
+
+def expected_score(board, remaining, distribution):
+    """
+        Return the expected score of optimal play for the given number of
+        remaining drops on the given board, computed by a full search.
+    """
+    if remaining == 0 or not Board.can_accept_disk(board):
+        return 0.0
+    result = 0.0
+    for (state, value), probability in distribution:
+        best = None
+        for column in range(1, Board.dimension(board) + 1):
+            if not Board.is_full_column(board, column):
+                copy_board = Board.get_board_copy(board)
+                score = Drop7.drop_disk_at(copy_board, Disk.init_disk(state, value), column) + \
+                        expected_score(copy_board, remaining - 1, distribution)
+                if best is None or score > best:
+                    best = score
+        result += probability * best
+    return result
+
+
+
+def test_Build_Tablebase__Matches_Full_Search(score, max_score):
+    """Function build_tablebase: expected scores match a full search."""
+    max_score.value += 5
+    try:
+        distribution = Tablebase.default_distribution(2)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "tablebase")
+            assert Tablebase.build_tablebase(path, 2, 3, processes=1) > 1
+            assert not os.path.exists(path + ".work")
+            with Tablebase.Tablebase(path) as tablebase:
+                assert tablebase.dimension == 2 and tablebase.horizon == 3
+                empty_board = Board.init_board(2)
+                for remaining in (1, 2, 3):
+                    assert abs(tablebase.expected_score(empty_board, remaining) -
+                               expected_score(empty_board, remaining, distribution)) < 1e-9
+                board = Board.init_board(2, ((Disk.init_disk(Disk.VISIBLE, 2),),))
+                assert abs(tablebase.expected_score(board, 2) -
+                           expected_score(board, 2, distribution)) < 1e-9
+                # Both columns make the disks explode; the leftmost one is used.
+                assert tablebase.best_column(board, Disk.init_disk(Disk.VISIBLE, 2), 1) == 1
+                full_column_board = Board.init_board(
+                    2, ((Disk.init_disk(Disk.WRAPPED, 2), Disk.init_disk(Disk.WRAPPED, 2)),))
+                assert tablebase.best_column(full_column_board, Disk.init_disk(Disk.VISIBLE, 1), 1) == 2
+        score.value += 5
+    except:
+        pass
+
+def test_Build_Tablebase__Resume_After_Interruption(score, max_score):
+    """Function build_tablebase: an interrupted build resumes to the same tablebase."""
+    max_score.value += 3
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "complete")
+            Tablebase.build_tablebase(path, 2, 3, processes=1)
+            interrupted_path = os.path.join(directory, "interrupted")
+            solve_layer = Tablebase._solve_layer
+
+            def interrupt(pool, work_directory, path, depth, remaining):
+                if depth == 0:
+                    raise KeyboardInterrupt
+                solve_layer(pool, work_directory, path, depth, remaining)
+
+            Tablebase._solve_layer = interrupt
+            try:
+                Tablebase.build_tablebase(interrupted_path, 2, 3, processes=1)
+            except KeyboardInterrupt:
+                pass
+            finally:
+                Tablebase._solve_layer = solve_layer
+            assert os.path.exists(os.path.join(interrupted_path + ".work", "stored_1"))
+            Tablebase.build_tablebase(interrupted_path, 2, 3, processes=1)
+
+            with Tablebase.Tablebase(path) as complete, \
+                    Tablebase.Tablebase(interrupted_path) as interrupted:
+                assert dict(complete.store.items()) == dict(interrupted.store.items())
+        score.value += 3
+    except:
+        pass
+
+def test_Lookup__Unknown_Board(score, max_score):
+    """Function lookup: boards that are not reachable are not in the tablebase."""
+    max_score.value += 1
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "tablebase")
+            Tablebase.build_tablebase(path, 2, 1, processes=1)
+            with Tablebase.Tablebase(path) as tablebase:
+                board = Board.init_board(2, ((Disk.init_disk(Disk.WRAPPED, 2),),))
+                assert tablebase.lookup(board, 1) is None
+                assert tablebase.best_column(Board.init_board(2), Disk.init_disk(Disk.CRACKED, 1), 1) is None
+        score.value += 1
+    except:
+        pass
+
+
+
+tablebase_test_functions = \
+    {
+        test_Build_Tablebase__Matches_Full_Search,
+        test_Build_Tablebase__Resume_After_Interruption,
+        test_Lookup__Unknown_Board
+    }
@@ -0,0 +1,311 @@
+import argparse
+import collections
+import curses
+import random
+import threading
+import time
+
+import Board
+import Disk
+import Drop7
+import Heuristics
+import Position
+import Tuner
+import Validation
+
+# A terminal front end for playing and spectating games, built on curses.
+#  - The view remembers what it drew in each cell and in each line of text,
+#    and only writes the cells and lines that changed since the previous
+#    frame. All writes of a frame go to the curses screen buffer, which is
+#    flushed to the terminal with a single refresh.
+#  - In play mode, the next disk is dropped in the column under the cursor,
+#    moved with the arrow keys, or in the column typed as a digit. Each step
+#    of a cascade of explosions is shown for STEP_DELAY_MS.
+#  - In spectate mode, a self-play game (see Tuner.play_self_game) runs in a
+#    background thread at full speed. The game only publishes a copy of its
+#    state when a frame is due (see Spectator), and always publishes its final
+#    state. The view draws the last published state at most a given number of
+#    times per second.
+
+DEFAULT_FPS = 30
+STEP_DELAY_MS = 250
+
+CELL_WIDTH = 4
+
+Frame = collections.namedtuple("Frame", [
+    "board",
+    "score",
+    "turn",
+    "next_disk"
+])
+
+
+class TerminalView:
+    """
+        A view of a board and a status line on a curses screen.
+        - The given screen only needs the methods addstr and refresh, such
+          that any object providing them can stand in for a curses window.
+    """
+
+    __slots__ = ("screen", "dimension", "drawn_cells", "drawn_lines")
+
+    def __init__(self, screen, dimension):
+        self.screen = screen
+        self.dimension = dimension
+        self.drawn_cells = {}
+        self.drawn_lines = {}
+
+    def draw(self, board, status, cursor=None):
+        """
+            Draw the given board and the given status line, with a marker under
+            the given column, if any, and return the number of cells and lines
+            written.
+            - Cells and lines are only written if they differ from what was
+              drawn before. The screen is refreshed once, if anything changed.
+            ASSUMPTIONS
+            - The given board is a proper board with the dimension of this view.
+        """
+
+        dimension = self.dimension
+        nb_written = 0
+
+        if not self.drawn_lines:
+            nb_written += self._draw_grid()
+
+        for (column, row) in Position.get_traversal(dimension):
+            cell = format_cell(Board.unchecked_get_disk_at(board, column - 1, row - 1))
+            if self.drawn_cells.get((column, row)) != cell:
+                self.drawn_cells[(column, row)] = cell
+                self.screen.addstr(cell_line(dimension, row), cell_offset(column), cell[0], cell[1])
+                nb_written += 1
+
+        marker = "" if cursor is None else " " * cell_offset(cursor) + "^" * CELL_WIDTH
+        nb_written += self._draw_line(dimension + 2, marker)
+        nb_written += self._draw_line(dimension + 3, status)
+
+        if nb_written > 0:
+            self.screen.refresh()
+        return nb_written
+
+    def _draw_grid(self):
+        """
+            Draw the separators between the cells and under the overflow row.
+        """
+
+        line = "|" + (" " * CELL_WIDTH + "|") * self.dimension
+        nb_written = 0
+        for row in range(1, self.dimension + 2):
+            nb_written += self._draw_line(cell_line(self.dimension, row), line)
+        nb_written += self._draw_line(1, "|" + ("-" * CELL_WIDTH + "|") * self.dimension)
+        return nb_written
+
+    def _draw_line(self, y, text):
+        """
+            Write the given text on the line at the given y coordinate, if it
+            differs from the text drawn there before.
+        """
+
+        width = (CELL_WIDTH + 1) * self.dimension + 1
+        text = text[:width].ljust(max(width, len(self.drawn_lines.get(y, ""))))
+        if self.drawn_lines.get(y) == text:
+            return 0
+        self.drawn_lines[y] = text
+        self.screen.addstr(y, 0, text)
+        return 1
+
+
+class Spectator:
+    """
+        The last published state of a running game, for a view following it.
+        - A state is only published if at least 1/fps seconds passed since the
+          previous publication, such that the game only pays for copying its
+          board when a frame is due.
+    """
+
+    __slots__ = ("interval", "next_time", "frame", "finished")
+
+    def __init__(self, fps=DEFAULT_FPS):
+        self.interval = 1 / fps
+        self.next_time = 0
+        self.frame = None
+        self.finished = False
+
+    def publish(self, state, force=False):
+        """
+            Publish a copy of the given game state (see Drop7.GameState), if a
+            frame is due or if forced.
+        """
+
+        now = time.perf_counter()
+        if force or now >= self.next_time:
+            self.next_time = now + self.interval
+            self.frame = Frame(Board.get_board_copy(state.board), state.score, state.turn,
+                               Disk.get_disk_copy(state.next_disk))
+
+
+def format_cell(disk):
+    """
+        Return a tuple of the text and the curses attribute showing the given
+        disk, or an empty cell if the given disk is None.
+    """
+
+    state = Disk.get_state(disk)
+    if state is None:
+        return (" " * CELL_WIDTH, curses.A_NORMAL)
+    if state == Disk.WRAPPED:
+        return (" ## ", curses.A_REVERSE)
+    if state == Disk.CRACKED:
+        return (" () ", curses.A_DIM)
+    return ("%3d " % Disk.get_value(disk), curses.A_BOLD)
+
+
+def format_status(score, turn, next_disk, message=""):
+    """
+        Return the status line for the given score, turn and next disk.
+    """
+
+    if next_disk is None:
+        next_text = "-"
+    else:
+        next_text = format_cell(next_disk)[0].strip()
+    return "Score: %d  Turn: %d  Next: %s  %s" % (score, turn, next_text, message)
+
+
+def cell_line(dimension, row):
+    """
+        Return the y coordinate of the given row on a view of a board with
+        the given dimension. The overflow row is drawn at the top, above a
+        separator line.
+    """
+
+    return dimension + 1 - row + (1 if row <= dimension else 0)
+
+
+def cell_offset(column):
+    """
+        Return the x coordinate of the given column.
+    """
+
+    return 1 + (column - 1) * (CELL_WIDTH + 1)
+
+
+def play(screen, seed=None, dimension=7):
+    """
+        Play a game on an empty board with the given dimension on the given
+        curses screen, and return its total score.
+    """
+
+    state = Drop7.GameState(Board.init_board(dimension), rng=random.Random(seed))
+    view = TerminalView(screen, dimension)
+    cursor = (dimension + 1) // 2
+    message = "arrows/digits: column, enter: drop, q: quit"
+
+    def draw_step(step):
+        view.draw(state.board, format_status(state.score, state.turn, state.next_disk,
+                                             "step %d: +%d" % (step.step, step.score)))
+        curses.napms(STEP_DELAY_MS)
+
+    while not state.is_over():
+        view.draw(state.board, format_status(state.score, state.turn, state.next_disk, message), cursor)
+        key = screen.getch()
+        column = None
+
+        if key in (ord("q"), ord("Q")):
+            return state.score
+        elif key == curses.KEY_LEFT:
+            cursor = max(1, cursor - 1)
+        elif key == curses.KEY_RIGHT:
+            cursor = min(dimension, cursor + 1)
+        elif key in (curses.KEY_ENTER, ord("\n"), ord(" ")):
+            column = cursor
+        elif ord("1") <= key < ord("1") + min(dimension, 9):
+            column = cursor = key - ord("0")
+
+        if column is not None:
+            if Board.is_full_column(state.board, column):
+                message = "column %d is full" % column
+            else:
+                state.step(column, on_step=draw_step)
+                message = "+%d" % (state.last_score + state.last_bonus)
+
+    view.draw(state.board, format_status(state.score, state.turn, None, "game over, press any key"))
+    screen.getch()
+    return state.score
+
+
+def run_self_game(spectator, weights, seed, dimension=7, max_turns=Tuner.DEFAULT_MAX_TURNS):
+    """
+        Play a self-play game with the given weights (see Tuner.play_self_game),
+        publishing its states to the given spectator, and return its total
+        score.
+        - The final state is always published, even if no frame is due, before
+          the spectator is marked as finished.
+    """
+
+    states = []
+
+    def on_turn(state):
+        if not states:
+            states.append(state)
+        spectator.publish(state)
+
+    total_score = Tuner.play_self_game(weights, seed, dimension, max_turns, on_turn=on_turn)
+    if states:
+        spectator.publish(states[0], force=True)
+    spectator.finished = True
+    return total_score
+
+
+def spectate(screen, seed=None, dimension=7, max_turns=Tuner.DEFAULT_MAX_TURNS, fps=DEFAULT_FPS,
+             weights=Heuristics.DEFAULT_WEIGHTS):
+    """
+        Follow a self-play game with the given weights on the given curses
+        screen, drawing at most the given number of frames per second, and
+        return its total score.
+        - The game runs in a background thread and is never waited for by the
+          view. Pressing q stops following it.
+    """
+
+    spectator = Spectator(fps)
+    view = TerminalView(screen, dimension)
+    result = []
+
+    thread = threading.Thread(target=lambda: result.append(
+        run_self_game(spectator, weights, seed, dimension, max_turns)), daemon=True)
+    thread.start()
+    start = time.perf_counter()
+    screen.timeout(max(1, int(1000 / fps)))
+
+    while True:
+        finished = spectator.finished
+        frame = spectator.frame
+        if frame is not None:
+            elapsed = time.perf_counter() - start
+            message = "finished, press q" if finished else "%.0f turns/s" % (frame.turn / elapsed)
+            view.draw(frame.board, format_status(frame.score, frame.turn, frame.next_disk, message))
+        if screen.getch() in (ord("q"), ord("Q")):
+            break
+
+    return result[0] if result else None
+
+
+def _main(screen, arguments):
+    curses.curs_set(0)
+    if arguments.spectate:
+        return spectate(screen, arguments.seed, arguments.dimension, arguments.max_turns, arguments.fps)
+    return play(screen, arguments.seed, arguments.dimension)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Play or spectate Drop 7 in a terminal.")
+    parser.add_argument("--spectate", action="store_true", help="follow a self-play game")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--dimension", type=int, default=7)
+    parser.add_argument("--max-turns", type=int, default=Tuner.DEFAULT_MAX_TURNS)
+    parser.add_argument("--fps", type=int, default=DEFAULT_FPS)
+    parser.add_argument("--validation", choices=sorted(Validation.LEVELS), default="entry",
+                        help="validation level of the game (see Validation)")
+    arguments = parser.parse_args()
+    Validation.set_level(arguments.validation)
+
+    print("Score: %s" % curses.wrapper(_main, arguments))
@@ -0,0 +1,101 @@
+import random
+
+import Board
+import Disk
+import Drop7
+import Heuristics
+import TerminalGame
+import Tuner
+
+
+class RecordingScreen:
+    """
+        A screen recording the writes and refreshes of a view.
+    """
+
+    def __init__(self):
+        self.writes = []
+        self.nb_refreshes = 0
+
+    def addstr(self, y, x, text, attribute=0):
+        self.writes.append((y, x, text))
+
+    def refresh(self):
+        self.nb_refreshes += 1
+
+
+
+def test_Terminal_View__Changed_Cells_Only(score, max_score):
+    """Class TerminalView: only the cells that changed are written, with a single refresh per frame."""
+    max_score.value += 3
+    try:
+        board = Board.init_board(4)
+        screen = RecordingScreen()
+        view = TerminalGame.TerminalView(screen, 4)
+        assert view.draw(board, "status") > 4 * 5
+        assert view.draw(board, "status") == 0
+        assert screen.nb_refreshes == 1
+        Board.add_disk_on_column(board, Disk.init_disk(Disk.VISIBLE, 3), 2)
+        del screen.writes[:]
+        assert view.draw(board, "status") == 1
+        assert screen.writes == [(TerminalGame.cell_line(4, 1), TerminalGame.cell_offset(2), "  3 ")]
+        assert screen.nb_refreshes == 2
+        score.value += 3
+    except:
+        pass
+
+def test_Terminal_View__Status_And_Cursor(score, max_score):
+    """Class TerminalView: the status line and the cursor are only written when they change."""
+    max_score.value += 2
+    try:
+        board = Board.init_board(4)
+        screen = RecordingScreen()
+        view = TerminalGame.TerminalView(screen, 4)
+        view.draw(board, "status", 1)
+        assert view.draw(board, "other status", 1) == 1
+        assert view.draw(board, "other status", 2) == 1
+        assert screen.writes[-1][0] == 4 + 2
+        score.value += 2
+    except:
+        pass
+
+def test_Spectator__Capped_Publications(score, max_score):
+    """Class Spectator: states are only copied when a frame is due, or when forced."""
+    max_score.value += 2
+    try:
+        state = Drop7.GameState(Board.init_board(4), rng=random.Random(0))
+        spectator = TerminalGame.Spectator(fps=0.001)
+        spectator.publish(state)
+        frame = spectator.frame
+        assert frame.turn == 0 and frame.board is not state.board
+        state.step(1)
+        spectator.publish(state)
+        assert spectator.frame is frame
+        spectator.publish(state, force=True)
+        assert spectator.frame.turn == 1
+        score.value += 2
+    except:
+        pass
+
+def test_Run_Self_Game__Final_Frame(score, max_score):
+    """Function run_self_game: the last published frame is the final state, even when no frame is due."""
+    max_score.value += 2
+    try:
+        spectator = TerminalGame.Spectator(fps=0.001)
+        total_score = TerminalGame.run_self_game(spectator, Heuristics.DEFAULT_WEIGHTS, 3, dimension=4, max_turns=20)
+        assert spectator.finished
+        assert spectator.frame.turn == 20
+        assert spectator.frame.score == total_score == Tuner.play_self_game(Heuristics.DEFAULT_WEIGHTS, 3, 4, 20)
+        score.value += 2
+    except:
+        pass
+
+
+
+terminal_game_test_functions = \
+    {
+        test_Terminal_View__Changed_Cells_Only,
+        test_Terminal_View__Status_And_Cursor,
+        test_Spectator__Capped_Publications,
+        test_Run_Self_Game__Final_Frame
+    }
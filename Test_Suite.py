@@ -11,37 +11,150 @@ import Position_Test
 import Disk_Test
 import Board_Test
 import Drop7_Test
-
+import Heuristics_Test
+import Tuner_Test
+import SolutionStore_Test
+import Tablebase_Test
+import GameLog_Test
+import Verifier_Test
+import Validation_Test
+import HintEngine_Test
+import TerminalGame_Test
+import Benchmark_Test
+import Corpus_Test
+import Instrumentation_Test
+import SearchStats_Test
+import Fuzz_Test
+
+import argparse
 import multiprocessing
-
-
-
-def run_tests(test_functions):
+import multiprocessing.connection
+import os
+import time
+
+# Tests run concurrently on a pool of worker processes.
+# - Each worker runs one test at a time, and is reused for later tests. Its
+#   score and max_score are shared with the runner, and reset before each
+#   test, such that the runner can account for the points of a test even if
+#   it times out.
+# - A test that does not finish within the timeout is reported as timed out.
+# - The worker of a test that fails, times out or crashes is terminated and
+#   replaced by a new one, such that module globals a failing test patched
+#   and did not restore never leak into later tests. A test that passes must
+#   restore all module globals it patches, e.g. in a finally clause.
+# - The duration of each test is reported, such that slow tests stand out.
+
+DEFAULT_TIMEOUT = 600
+DEFAULT_NB_DURATIONS = 10
+
+
+class _Worker:
+    """
+        A worker process of the pool, together with its connection, its shared
+        score and max_score, and the test it is running, if any.
+    """
+
+    __slots__ = ("process", "connection", "score", "max_score", "test_function", "start")
+
+    def __init__(self):
+        self.connection, connection = multiprocessing.Pipe()
+        self.score = multiprocessing.Value("i", 0)
+        self.max_score = multiprocessing.Value("i", 0)
+        self.process = multiprocessing.Process \
+            (target=_run_worker, name="test worker", args=(connection, self.score, self.max_score))
+        self.process.start()
+        connection.close()
+        self.test_function = None
+        self.start = None
+
+    def run(self, test_function):
+        self.score.value = 0
+        self.max_score.value = 0
+        self.test_function = test_function
+        self.start = time.perf_counter()
+        self.connection.send(test_function)
+
+    def stop(self):
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join()
+        self.connection.close()
+
+
+def run_tests(test_functions, processes=None, timeout=DEFAULT_TIMEOUT):
     if __name__ == '__main__':
 
-        max_score = multiprocessing.Value("i", 0)
-        score = multiprocessing.Value("i", 0)
+        max_score = 0
+        score = 0
         failed_tests = []
-
-        for test_function in test_functions:
-
-            old_score = score.value
-            old_max_score = max_score.value
-
-            # Start test as a process
-            test = multiprocessing.Process \
-                (target=test_function, name=test_function.__name__, args=(score, max_score))
-            test.start()
-
-            # Terminate test
-            test.join(10000)
-
-            if test.is_alive():
-                failed_tests.append("Timed out --> " + test_function.__doc__)
-            elif score.value - old_score != max_score.value - old_max_score:
-                failed_tests.append("Failed --> " + test_function.__doc__)
-
-        return (score.value, max_score.value, failed_tests)
+        durations = {}
+
+        pending = sorted(test_functions, key=lambda test_function: test_function.__name__, reverse=True)
+        workers = [_Worker() for worker in range(min(processes or os.cpu_count() or 1, len(pending)))]
+        idle = list(workers)
+
+        while pending or len(idle) < len(workers):
+
+            # Start tests on idle workers
+            while pending and idle:
+                idle.pop().run(pending.pop())
+
+            # Wait for a test to finish, or for the first deadline
+            busy = {worker.connection: worker for worker in workers if worker not in idle}
+            first_deadline = min(worker.start for worker in busy.values()) + timeout
+            ready = multiprocessing.connection.wait(list(busy), max(0, first_deadline - time.perf_counter()))
+
+            for worker in list(busy.values()):
+                test_function = worker.test_function
+                if worker.connection in ready:
+                    try:
+                        durations[test_function] = worker.connection.recv()
+                        passed = worker.score.value == worker.max_score.value
+                    except EOFError:
+                        durations[test_function] = time.perf_counter() - worker.start
+                        passed = False
+                elif time.perf_counter() - worker.start >= timeout:
+                    durations[test_function] = time.perf_counter() - worker.start
+                    passed = None
+                else:
+                    continue
+
+                score += worker.score.value
+                max_score += worker.max_score.value
+                if passed is None:
+                    failed_tests.append("Timed out --> " + test_function.__doc__)
+                elif not passed:
+                    failed_tests.append("Failed --> " + test_function.__doc__)
+
+                if passed:
+                    worker.test_function = None
+                else:
+                    worker.stop()
+                    workers[workers.index(worker)] = worker = _Worker()
+                idle.append(worker)
+
+        for worker in workers:
+            worker.connection.send(None)
+            worker.process.join()
+            worker.connection.close()
+
+        return (score, max_score, failed_tests, durations)
+
+
+def _run_worker(connection, score, max_score):
+    """
+        Run the tests received over the given connection with the given score
+        and max_score, and send back the duration of each test, until None is
+        received.
+    """
+
+    while True:
+        test_function = connection.recv()
+        if test_function is None:
+            return
+        start = time.perf_counter()
+        test_function(score, max_score)
+        connection.send(time.perf_counter() - start)
 
 if __name__ == '__main__':
     test_functions =\
@@ -49,10 +162,32 @@ if __name__ == '__main__':
             Position_Test.position_test_functions,
             Disk_Test.disk_test_functions,
             Board_Test.board_test_functions,
-            Drop7_Test.Drop7_test_functions
+            Drop7_Test.Drop7_test_functions,
+            Heuristics_Test.heuristics_test_functions,
+            Tuner_Test.tuner_test_functions,
+            SolutionStore_Test.solution_store_test_functions,
+            Tablebase_Test.tablebase_test_functions,
+            GameLog_Test.game_log_test_functions,
+            Verifier_Test.verifier_test_functions,
+            Validation_Test.validation_test_functions,
+            HintEngine_Test.hint_engine_test_functions,
+            TerminalGame_Test.terminal_game_test_functions,
+            Benchmark_Test.benchmark_test_functions,
+            Corpus_Test.corpus_test_functions,
+            Instrumentation_Test.instrumentation_test_functions,
+            SearchStats_Test.search_stats_test_functions,
+            Fuzz_Test.fuzz_test_functions
         )
 
-    (score, max_score, failed_tests) = run_tests(test_functions)
+    parser = argparse.ArgumentParser(description="Run the tests on a pool of worker processes.")
+    parser.add_argument("--processes", type=int, default=None, help="number of workers (all cores by default)")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="timeout of each test in seconds")
+    parser.add_argument("--durations", type=int, default=DEFAULT_NB_DURATIONS,
+                        help="number of slowest tests to report")
+    arguments = parser.parse_args()
+
+    (score, max_score, failed_tests, durations) = \
+        run_tests(test_functions, arguments.processes, arguments.timeout)
 
     print("Score: ", score, "/", max_score, end="")
     print(" (", score * 100 // max_score, "%)")
@@ -61,3 +196,10 @@ if __name__ == '__main__':
         print("Details")
         for failed_test in failed_tests:
             print("   ", failed_test)
+
+    if arguments.durations > 0:
+        print()
+        print("Slowest tests")
+        for test_function, duration in \
+                sorted(durations.items(), key=lambda item: -item[1])[:arguments.durations]:
+            print("    %8.3f s  %s" % (duration, test_function.__name__))
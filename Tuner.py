@@ -0,0 +1,305 @@
+import argparse
+import json
+import multiprocessing
+import os
+import random
+
+import Board
+import Disk
+import Drop7
+import Heuristics
+import Validation
+
+# The tuner optimizes the weights of the heuristics (see Heuristics) against
+# the outcome of real games.
+#  - Each candidate vector of weights is scored by the average score of a
+#    number of seeded self-play games, in which every disk is dropped in the
+#    column that maximizes the score of the drop plus the evaluation of the
+#    resulting board. Games follow the rules of Drop7.play, including the
+#    raises of level and the injection of wrapped rows.
+#  - All candidates are scored on the same seeds (common random numbers),
+#    such that differences in score reflect differences in weights and not
+#    differences in luck.
+#  - The weights are optimized with SPSA (simultaneous perturbation stochastic
+#    approximation): each iteration scores two opposite random perturbations
+#    of the current weights and moves along the estimated gradient.
+
+DEFAULT_DIMENSION = 7
+DEFAULT_MAX_TURNS = 500
+
+# SPSA gain sequences: a_k = A / (k + 1 + STABILITY)^ALPHA, c_k = C / (k + 1)^GAMMA
+SPSA_A = 0.5
+SPSA_C = 0.5
+SPSA_ALPHA = 0.602
+SPSA_GAMMA = 0.101
+SPSA_STABILITY = 10
+
+
+def play_self_game(weights, seed, dimension=DEFAULT_DIMENSION, max_turns=DEFAULT_MAX_TURNS,
+                   on_turn=None):
+    """
+        Play a game on an empty board with the given dimension, using the
+        given weights to select columns, and return its total score.
+        - All disks to drop and all wrapped disks to inject are drawn from a
+          random generator initialized with the given seed. Two games with
+          the same seed therefore get the same disks, whatever the weights.
+        - The game stops as soon as the board can no longer accept a disk, or
+          after the given number of turns.
+        - The given function on_turn, if any, is called with the state of the
+          game (see Drop7.GameState) after each turn.
+        ASSUMPTIONS
+        - The number of given weights is equal to the number of features
+          in Heuristics.FEATURES.
+    """
+
+    state = Drop7.GameState(Board.init_board(dimension), rng=random.Random(seed))
+
+    while state.turn < max_turns and not state.is_over():
+        state.step(greedy_column(state.board, state.next_disk, weights))
+        if on_turn is not None:
+            on_turn(state)
+
+    return state.score
+
+
+def greedy_column(board, disk, weights):
+    """
+        Return the column in which dropping the given disk on the given board
+        maximizes the score of the drop plus the evaluation of the resulting
+        board.
+        - If several columns are equally good, the leftmost of them is used.
+        ASSUMPTIONS
+        - The given board is a playable board that can accept a disk, and the
+          given disk is a proper disk for it.
+    """
+
+    return _greedy_columns([board], [disk], weights)[0]
+
+
+def evaluate_weights(weights, seeds, pool=None, dimension=DEFAULT_DIMENSION,
+                     max_turns=DEFAULT_MAX_TURNS):
+    """
+        Return the average score of self-play games with the given weights,
+        one game for each of the given seeds.
+        - If a pool of processes is given, the games are spread over its
+          workers in chunks.
+    """
+
+    seeds = list(seeds)
+    tasks = [(tuple(weights), seeds[start:start + _CHUNK_SIZE], dimension, max_turns)
+             for start in range(0, len(seeds), _CHUNK_SIZE)]
+
+    if pool is None:
+        totals = map(_play_chunk, tasks)
+    else:
+        totals = pool.imap_unordered(_play_chunk, tasks)
+
+    return sum(totals) / len(seeds)
+
+
+def spsa_step(weights, iteration, seeds, pool=None, tuning_seed=0,
+              dimension=DEFAULT_DIMENSION, max_turns=DEFAULT_MAX_TURNS):
+    """
+        Return a tuple of (1) the weights obtained from a single SPSA iteration
+        starting from the given weights, and (2) the average score of both
+        perturbed candidates.
+        - The perturbation only depends on the given tuning seed and the given
+          iteration, such that an interrupted run resumes identically.
+        - Both perturbed candidates are scored on the given seeds.
+    """
+
+    rng = random.Random("%s/%s" % (tuning_seed, iteration))
+    delta = [rng.choice((-1, 1)) for weight in weights]
+    gain = SPSA_A / (iteration + 1 + SPSA_STABILITY) ** SPSA_ALPHA
+    perturbation = SPSA_C / (iteration + 1) ** SPSA_GAMMA
+
+    plus = [weight + perturbation * sign for weight, sign in zip(weights, delta)]
+    minus = [weight - perturbation * sign for weight, sign in zip(weights, delta)]
+    score_plus = evaluate_weights(plus, seeds, pool, dimension, max_turns)
+    score_minus = evaluate_weights(minus, seeds, pool, dimension, max_turns)
+
+    # Scores are normalized by their magnitude, such that the step size does
+    # not depend on the typical score of a game.
+    scale = max(abs(score_plus) + abs(score_minus), 1)
+    gradient = (score_plus - score_minus) / (2 * perturbation * scale)
+    new_weights = [weight + gain * gradient * sign for weight, sign in zip(weights, delta)]
+
+    return new_weights, (score_plus + score_minus) / 2
+
+
+def tune_weights(iterations, nb_games, checkpoint_path=None, processes=None,
+                 initial_weights=Heuristics.DEFAULT_WEIGHTS, tuning_seed=0,
+                 dimension=DEFAULT_DIMENSION, max_turns=DEFAULT_MAX_TURNS,
+                 log=None):
+    """
+        Tune the weights of the heuristics with the given number of SPSA
+        iterations, and return the resulting weights.
+        - Each candidate is scored on the given number of games. The seeds of
+          these games are the same for all candidates of all iterations.
+        - If a checkpoint path is given, the state of the run is saved to it
+          after each iteration. A run with an existing checkpoint resumes from
+          the saved state instead of starting from the initial weights. The
+          checkpoint stores the number of games, the tuning seed, the
+          dimension and the maximum number of turns of its run. A ValueError
+          is raised if they differ from those of the resumed run.
+        - A ValueError is raised if the given number of games is not positive,
+          or the given number of iterations is negative.
+        - Games are played on the given number of processes. If that number
+          is 1, all games are played in the current process.
+        - If a log function is given, it is called after each iteration with
+          the iteration number, the new weights and the average score.
+    """
+
+    if nb_games <= 0:
+        raise ValueError("number of games must be positive, not %d" % (nb_games,))
+    if iterations < 0:
+        raise ValueError("number of iterations must not be negative, not %d" % (iterations,))
+
+    parameters = {"nb_games": nb_games, "tuning_seed": tuning_seed, "dimension": dimension,
+                  "max_turns": max_turns}
+    state = load_checkpoint(checkpoint_path)
+    if state is None:
+        state = {"iteration": 0, "weights": list(initial_weights), "history": [], "parameters": parameters}
+    elif state.get("parameters") != parameters:
+        raise ValueError("checkpoint %s was saved by a run with parameters %s instead of %s" %
+                         (checkpoint_path, state.get("parameters"), parameters))
+
+    seeds = [tuning_seed * nb_games + index for index in range(nb_games)]
+    pool = None if processes == 1 else multiprocessing.Pool(processes, Validation.set_level, (Validation.level,))
+
+    try:
+        while state["iteration"] < iterations:
+            weights, average = spsa_step(state["weights"], state["iteration"], seeds, pool,
+                                         tuning_seed, dimension, max_turns)
+            state["iteration"] += 1
+            state["weights"] = weights
+            state["history"].append(average)
+            save_checkpoint(checkpoint_path, state)
+            if log is not None:
+                log(state["iteration"], weights, average)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    return state["weights"]
+
+
+def load_checkpoint(path):
+    """
+        Return the tuning state saved at the given path, or None if there is
+        no path or no checkpoint at the given path.
+    """
+
+    if path is None or not os.path.exists(path):
+        return None
+
+    with open(path) as file:
+        return json.load(file)
+
+
+def save_checkpoint(path, state):
+    """
+        Save the given tuning state at the given path.
+        - The checkpoint is first written to a temporary file that replaces
+          the checkpoint in a single step, such that an interruption never
+          leaves a partial checkpoint behind.
+        - Nothing happens if the given path is None.
+    """
+
+    if path is None:
+        return
+
+    temporary_path = path + ".tmp"
+    with open(temporary_path, "w") as file:
+        json.dump(state, file)
+    os.replace(temporary_path, path)
+
+
+### TUNER HELPER FUNCTIONS ###
+
+_CHUNK_SIZE = 16
+
+
+def _play_chunk(task):
+    """
+        Return the total score of the self-play games described by the given
+        task, a tuple of weights, seeds, dimension and maximum number of turns.
+        - All games of the chunk are played side by side, such that the boards
+          of all their candidate drops are evaluated in a single batch.
+    """
+
+    weights, seeds, dimension, max_turns = task
+    games = Drop7.BatchGameState([Board.init_board(dimension) for seed in seeds],
+                                 [random.Random(seed) for seed in seeds])
+
+    for turn in range(max_turns):
+        active = games.active()
+        if not active:
+            break
+        columns = [None] * len(games)
+        for index, column in zip(active, _greedy_columns([games.boards[index] for index in active],
+                                                         [games.next_disks[index] for index in active],
+                                                         weights)):
+            columns[index] = column
+        games.step(columns)
+
+    return sum(games.scores)
+
+
+def _greedy_columns(boards, disks, weights):
+    """
+        Return a list of the greedy column (see greedy_column) for dropping
+        each of the given disks on the corresponding given board.
+        - The boards resulting from all candidate drops on all given boards are
+          evaluated in a single batch.
+    """
+
+    owners = []
+    columns = []
+    candidates = []
+    scores = []
+
+    for index, (board, disk) in enumerate(zip(boards, disks)):
+        for column in range(1, Board.dimension(board) + 1):
+            if not Board.is_full_column(board, column):
+                copy_board = Board.get_board_copy(board)
+                scores.append(Drop7.unchecked_drop_disk_at(copy_board, Disk.get_disk_copy(disk), column))
+                owners.append(index)
+                columns.append(column)
+                candidates.append(copy_board)
+
+    evaluations = Heuristics.evaluate_boards(candidates, weights)
+    best_columns = [None] * len(boards)
+    best_values = [None] * len(boards)
+
+    for owner, column, score, evaluation in zip(owners, columns, scores, evaluations):
+        if best_values[owner] is None or score + evaluation > best_values[owner]:
+            best_columns[owner] = column
+            best_values[owner] = score + evaluation
+
+    return best_columns
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Tune the weights of the heuristics by self-play.")
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--games", type=int, default=2000, help="games per candidate")
+    parser.add_argument("--checkpoint", default="tuner_checkpoint.json")
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--dimension", type=int, default=DEFAULT_DIMENSION)
+    parser.add_argument("--max-turns", type=int, default=DEFAULT_MAX_TURNS)
+    parser.add_argument("--validation", choices=sorted(Validation.LEVELS), default="off",
+                        help="validation level of the game (see Validation)")
+    arguments = parser.parse_args()
+    Validation.set_level(arguments.validation)
+
+    def print_iteration(iteration, weights, average):
+        print("Iteration %d: average score %.1f" % (iteration, average))
+        print("    " + ", ".join("%s=%.3f" % item for item in zip(Heuristics.FEATURES, weights)))
+
+    tune_weights(arguments.iterations, arguments.games, arguments.checkpoint,
+                 arguments.processes, tuning_seed=arguments.seed,
+                 dimension=arguments.dimension, max_turns=arguments.max_turns,
+                 log=print_iteration)
@@ -0,0 +1,99 @@
+import os
+import tempfile
+
+import Heuristics
+import Tuner
+
+
+def test_Play_Self_Game__Same_Seed_Same_Score(score, max_score):
+    """Function play_self_game: same seed and weights give the same score."""
+    max_score.value += 2
+    try:
+        weights = Heuristics.DEFAULT_WEIGHTS
+        first = Tuner.play_self_game(weights, 3, dimension=4, max_turns=60)
+        assert first == Tuner.play_self_game(weights, 3, dimension=4, max_turns=60)
+        assert first > 0
+        score.value += 2
+    except:
+        pass
+
+def test_Evaluate_Weights__Pool_Matches_Serial(score, max_score):
+    """Function evaluate_weights: games on a pool give the same average as serial games."""
+    max_score.value += 2
+    try:
+        weights = Heuristics.DEFAULT_WEIGHTS
+        seeds = range(20)
+        serial = Tuner.evaluate_weights(weights, seeds, dimension=4, max_turns=30)
+        expected = sum(Tuner.play_self_game(weights, seed, 4, 30) for seed in seeds) / 20
+        assert serial == expected
+        pool = Tuner.multiprocessing.Pool(2)
+        try:
+            assert Tuner.evaluate_weights(weights, seeds, pool, 4, 30) == serial
+        finally:
+            pool.close()
+            pool.join()
+        score.value += 2
+    except:
+        pass
+
+def test_Tune_Weights__Resume_From_Checkpoint(score, max_score):
+    """Function tune_weights: a resumed run ends with the same weights as an uninterrupted run."""
+    max_score.value += 3
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "checkpoint.json")
+            Tuner.tune_weights(1, 4, path, processes=1, dimension=3, max_turns=25)
+            assert Tuner.load_checkpoint(path)["iteration"] == 1
+            resumed = Tuner.tune_weights(2, 4, path, processes=1, dimension=3, max_turns=25)
+            assert Tuner.load_checkpoint(path)["iteration"] == 2
+            uninterrupted = Tuner.tune_weights(2, 4, None, processes=1, dimension=3, max_turns=25)
+            assert resumed == uninterrupted
+            assert resumed != list(Heuristics.DEFAULT_WEIGHTS)
+        score.value += 3
+    except:
+        pass
+
+def test_Tune_Weights__Resume_With_Other_Parameters(score, max_score):
+    """Function tune_weights: resuming a checkpoint with other parameters raises a ValueError."""
+    max_score.value += 2
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "checkpoint.json")
+            Tuner.tune_weights(1, 4, path, processes=1, dimension=3, max_turns=25)
+            for nb_games, parameters in ((5, {}), (4, {"tuning_seed": 1}), (4, {"dimension": 4}),
+                                         (4, {"max_turns": 30})):
+                try:
+                    Tuner.tune_weights(2, nb_games, path, processes=1, **dict({"dimension": 3, "max_turns": 25},
+                                                                             **parameters))
+                    assert False
+                except ValueError:
+                    pass
+            assert Tuner.load_checkpoint(path)["iteration"] == 1
+        score.value += 2
+    except:
+        pass
+
+def test_Tune_Weights__Improper_Counts(score, max_score):
+    """Function tune_weights: no games or a negative number of iterations raise a ValueError."""
+    max_score.value += 1
+    try:
+        for iterations, nb_games in ((1, 0), (1, -1), (-1, 4)):
+            try:
+                Tuner.tune_weights(iterations, nb_games, processes=1, dimension=3, max_turns=25)
+                assert False
+            except ValueError:
+                pass
+        score.value += 1
+    except:
+        pass
+
+
+
+tuner_test_functions = \
+    {
+        test_Play_Self_Game__Same_Seed_Same_Score,
+        test_Evaluate_Weights__Pool_Matches_Serial,
+        test_Tune_Weights__Resume_From_Checkpoint,
+        test_Tune_Weights__Resume_With_Other_Parameters,
+        test_Tune_Weights__Improper_Counts
+    }
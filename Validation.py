@@ -0,0 +1,59 @@
+import contextlib
+
+# The validation level controls how much checking the entry points of the
+# modules Disk, Board and Drop7 do before and after changing disks and boards.
+#  - OFF: no checks at all. Intended for simulators and searches, in which
+#    all disks and boards are built by the game itself.
+#  - ENTRY: the arguments of the entry points are checked (proper disks,
+#    proper columns, columns that are not full, ...). This is the default.
+#    Searches and simulators check their arguments once, and not the drops
+#    they try (see Drop7.unchecked_drop_disk_at).
+#  - PARANOID: in addition, the board is checked to be playable before and
+#    after each drop, and after each step of a cascade of explosions.
+#    Intended for fuzzing and debugging.
+#  - Failed checks raise an AssertionError, as the assertions of the entry
+#    points always did.
+#  - The level is a global of each process. Pools of worker processes are
+#    started at the level of the process creating them, whatever the start
+#    method of the processes.
+
+OFF = 0
+ENTRY = 1
+PARANOID = 2
+
+LEVELS = {"off": OFF, "entry": ENTRY, "paranoid": PARANOID}
+
+level = ENTRY
+
+
+def set_level(new_level):
+    """
+        Set the validation level to the given level, and return the previous
+        level.
+        - The given level is either one of OFF, ENTRY or PARANOID, or one of
+          their names in LEVELS.
+    """
+
+    global level
+
+    if isinstance(new_level, str):
+        new_level = LEVELS[new_level.lower()]
+    assert new_level in (OFF, ENTRY, PARANOID)
+
+    previous_level = level
+    level = new_level
+    return previous_level
+
+
+@contextlib.contextmanager
+def validation_level(new_level):
+    """
+        Return a context manager that sets the validation level to the given
+        level, and restores the previous level on exit.
+    """
+
+    previous_level = set_level(new_level)
+    try:
+        yield
+    finally:
+        set_level(previous_level)
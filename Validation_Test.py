@@ -0,0 +1,105 @@
+import Board
+import Disk
+import Drop7
+import Instrumentation
+import Validation
+
+
+def raises_assertion(function, *args):
+    """
+        Check whether calling the given function with the given arguments
+        raises an AssertionError.
+    """
+    try:
+        function(*args)
+    except AssertionError:
+        return True
+    return False
+
+
+
+def test_Set_Level__Names_And_Restore(score, max_score):
+    """Function validation_level: levels are set by name and restored on exit."""
+    max_score.value += 2
+    try:
+        assert Validation.level == Validation.ENTRY
+        with Validation.validation_level("paranoid"):
+            assert Validation.level == Validation.PARANOID
+            assert Validation.set_level(Validation.OFF) == Validation.PARANOID
+        assert Validation.level == Validation.ENTRY
+        assert raises_assertion(Validation.set_level, 3)
+        score.value += 2
+    except:
+        pass
+
+def test_Drop_Disk_At__Entry_Checks(score, max_score):
+    """Function drop_disk_at: improper drops are rejected unless validation is off."""
+    max_score.value += 3
+    try:
+        board = Board.init_board(2, ((Disk.init_disk(Disk.WRAPPED, 1), Disk.init_disk(Disk.WRAPPED, 1)),))
+        assert raises_assertion(Drop7.drop_disk_at, board, Disk.init_disk(Disk.CRACKED, 1), 2)
+        assert raises_assertion(Drop7.drop_disk_at, board, Disk.init_disk(Disk.VISIBLE, 1), 1)
+        assert raises_assertion(Drop7.drop_disk_at, board, Disk.init_disk(Disk.VISIBLE, 3), 2)
+        with Validation.validation_level(Validation.OFF):
+            assert Drop7.drop_disk_at(board, Disk.init_disk(Disk.CRACKED, 1), 2) == 0
+            assert Board.get_disk_at(board, (2, 1)) == [Disk.CRACKED, 1]
+        score.value += 3
+    except:
+        pass
+
+def test_Drop_Disk_At__Paranoid_Checks(score, max_score):
+    """Function drop_disk_at: a board that is not playable is only rejected at the paranoid level."""
+    max_score.value += 3
+    try:
+        disk = Disk.init_disk(Disk.WRAPPED, 2)
+        board = Board.init_board(3, ((disk,), (disk,)))
+        assert Drop7.drop_disk_at(Board.get_board_copy(board), Disk.init_disk(Disk.VISIBLE, 2), 3) == 0
+        with Validation.validation_level("paranoid"):
+            assert raises_assertion(Drop7.drop_disk_at, board, Disk.init_disk(Disk.VISIBLE, 2), 3)
+            board[1][0] = Disk.init_disk(Disk.WRAPPED, 2)
+            assert Drop7.drop_disk_at(board, Disk.init_disk(Disk.VISIBLE, 1), 3) == 2
+        score.value += 3
+    except:
+        pass
+
+def test_Play__Validation_Off(score, max_score):
+    """Function play: the assumptions are not checked when validation is off."""
+    max_score.value += 2
+    try:
+        board = Board.init_board(2)
+        disks = [Disk.init_disk(Disk.VISIBLE, 1)]
+        assert raises_assertion(Drop7.play, board, list(disks), [1], (Disk.init_disk(Disk.WRAPPED, 1),))
+        with Validation.validation_level(Validation.OFF):
+            assert Drop7.play(board, disks, [1], (Disk.init_disk(Disk.WRAPPED, 1),)) == 2
+        score.value += 2
+    except:
+        pass
+
+def test_Highest_Score__Checked_Once(score, max_score):
+    """Function highest_score: the disks are checked at the entry of the search, not for each drop it tries."""
+    max_score.value += 3
+    try:
+        board = Board.init_board(3, ((Disk.init_disk(Disk.WRAPPED, 1),),))
+        disks = [Disk.init_disk(Disk.VISIBLE, 2), Disk.init_disk(Disk.VISIBLE, 1)]
+        assert raises_assertion(Drop7.highest_score, board, disks + [Disk.init_disk(Disk.CRACKED, 1)])
+        assert raises_assertion(Drop7.best_drop_for_disk, board, Disk.init_disk(Disk.VISIBLE, 4))
+        with Instrumentation.instrumented(((Drop7, "drop_disk_at"), (Drop7, "unchecked_drop_disk_at"),
+                                           (Board, "add_disk_on_column"))) as profile:
+            Drop7.highest_score(board, disks)
+            Drop7.highest_greedy_score(Board.get_board_copy(board), list(disks))
+        assert profile.calls["Drop7.drop_disk_at"] == profile.calls["Board.add_disk_on_column"] == 0
+        assert profile.calls["Drop7.unchecked_drop_disk_at"] > 0
+        score.value += 3
+    except:
+        pass
+
+
+
+validation_test_functions = \
+    {
+        test_Set_Level__Names_And_Restore,
+        test_Drop_Disk_At__Entry_Checks,
+        test_Drop_Disk_At__Paranoid_Checks,
+        test_Play__Validation_Off,
+        test_Highest_Score__Checked_Once
+    }
@@ -0,0 +1,271 @@
+import argparse
+import collections
+import itertools
+import multiprocessing
+import os
+import queue
+import sys
+import time
+
+import Disk
+import GameLog
+import Validation
+
+# The verifier replays archived game logs (see GameLog) with the current
+# engine and reports the games whose replay no longer matches the log.
+#  - Each game is replayed from its first keyframe as a Drop7.GameState,
+#    with the recorded disks and wrapped disks. The score of each drop and
+#    the raises of level are checked against the log, and the replayed state
+#    is compared with each recorded keyframe.
+#  - Logs are streamed: paths are listed lazily, and only a bounded window of
+#    games is in flight on the pool of processes at any time. Memory use does
+#    not grow with the number of logs.
+
+DEFAULT_WINDOW = 1024
+DEFAULT_CHUNK_SIZE = 16
+
+Divergence = collections.namedtuple("Divergence", [
+    "path",
+    "turn",
+    "reason",
+    "differences"
+])
+
+Summary = collections.namedtuple("Summary", [
+    "nb_games",
+    "nb_divergent",
+    "elapsed"
+])
+
+
+def verify_game(path):
+    """
+        Replay the game log at the given path, and return the first divergence
+        between the replay and the log, or None if there is none.
+        - The turn of a divergence is the first turn whose recomputed score or
+          raise of level differs from the log. If all scores and raises match,
+          it is the turn of the first keyframe that differs from the replay.
+        - The differences of a divergence are the differences between the
+          board of the first differing keyframe and the replayed board at that
+          turn (see board_differences), or an empty list if all keyframes match.
+        - A log that cannot be parsed or replayed, e.g. a truncated log or a
+          log that is still being written, diverges at the last turn reached,
+          with the exception in its reason, unless the replay diverged before.
+    """
+
+    turn = 0
+    first_turn = None
+    reason = None
+    try:
+        log = GameLog.GameLog(path)
+        state = log.keyframe(0)
+
+        for turn in range(1, len(log) + 1):
+            step = log.step(turn)
+            state.deal(Disk.get_disk_copy(step.disk))
+            state.step(step.column, step.wrapped_disks)
+
+            if first_turn is None and state.last_score != step.score:
+                first_turn = turn
+                reason = "score %d instead of %d" % (state.last_score, step.score)
+
+            levels_up = state.last_bonus > 0
+            if first_turn is None and levels_up != bool(step.wrapped_disks):
+                first_turn = turn
+                reason = "raise of level %s" % ("missing" if levels_up else "not expected")
+
+            if first_turn is None and levels_up and step.level_bonus != state.last_bonus:
+                first_turn = turn
+                reason = "level bonus %d instead of %d" % (state.last_bonus, step.level_bonus)
+
+            if turn % log.keyframe_interval == 0:
+                keyframe = log.keyframe(turn // log.keyframe_interval)
+                differences = board_differences(keyframe.board, state.board)
+                if differences or keyframe.score != state.score or \
+                        keyframe.current_nb_turns != state.current_nb_turns or \
+                        keyframe.turns_per_level != state.turns_per_level:
+                    if first_turn is None:
+                        first_turn = turn
+                        reason = "keyframe differs"
+                    return Divergence(path, first_turn, reason, differences)
+    except Exception as exception:
+        if first_turn is not None:
+            return Divergence(path, first_turn, reason, [])
+        return Divergence(path, turn, "replay failed: %r" % (exception,), [])
+
+    if first_turn is not None:
+        return Divergence(path, first_turn, reason, [])
+    return None
+
+
+def board_differences(expected, actual):
+    """
+        Return a list of (position, expected disk, actual disk) tuples for all
+        positions at which the given boards store different disks.
+        ASSUMPTIONS
+        - Both given boards are proper boards with the same dimension.
+    """
+
+    return [((column + 1, row + 1), expected_disk, actual_disk)
+            for column, (expected_column, actual_column) in enumerate(zip(expected, actual))
+            for row, (expected_disk, actual_disk) in enumerate(zip(expected_column, actual_column))
+            if expected_disk != actual_disk]
+
+
+def iter_log_paths(paths):
+    """
+        Return a generator of the paths of all game logs among the given paths.
+        - Directories are searched recursively, one entry at a time.
+    """
+
+    for path in paths:
+        if os.path.isdir(path):
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    yield from iter_log_paths((entry.path,))
+        else:
+            yield path
+
+
+def verify_logs(paths, processes=None, window=DEFAULT_WINDOW, chunk_size=DEFAULT_CHUNK_SIZE,
+                report=None, progress=None):
+    """
+        Verify all game logs among the given paths, and return a summary.
+        - The given report function is called with each divergence.
+        - The given progress function, if any, is called after each window of
+          games with the number of games verified so far and the elapsed time.
+        - Games are verified on the given number of processes, in chunks of
+          the given size. If that number is 1, all games are verified in the
+          current process.
+        - At most the given window of games is in flight at any time. A new
+          chunk is submitted as soon as any chunk is done, such that a slow
+          log never leaves the other processes idle.
+    """
+
+    pool = None if processes == 1 else multiprocessing.Pool(processes, Validation.set_level, (Validation.level,))
+    paths = iter_log_paths(paths)
+    nb_games = 0
+    nb_divergent = 0
+    nb_reported_games = 0
+    start = time.perf_counter()
+
+    try:
+        if pool is None:
+            results = ([verify_game(path)] for path in paths)
+        else:
+            results = _verify_chunks(pool, paths, max(1, window // chunk_size), chunk_size)
+
+        for divergences in results:
+            for divergence in divergences:
+                nb_games += 1
+                if divergence is not None:
+                    nb_divergent += 1
+                    if report is not None:
+                        report(divergence)
+
+            if progress is not None and nb_games - nb_reported_games >= window:
+                progress(nb_games, time.perf_counter() - start)
+                nb_reported_games = nb_games
+
+        if progress is not None and nb_games != nb_reported_games:
+            progress(nb_games, time.perf_counter() - start)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    return Summary(nb_games, nb_divergent, time.perf_counter() - start)
+
+
+def format_divergence(divergence):
+    """
+        Return a readable description of the given divergence.
+    """
+
+    lines = ["%s: turn %d: %s" % (divergence.path, divergence.turn, divergence.reason)]
+    for position, expected, actual in divergence.differences:
+        lines.append("    %s: logged %s, replayed %s" %
+                     (position, _format_disk(expected), _format_disk(actual)))
+    return "\n".join(lines)
+
+
+### VERIFIER HELPER FUNCTIONS ###
+
+def _verify_chunk(paths):
+    """
+        Return a list of the results of verify_game for the given paths.
+    """
+
+    return [verify_game(path) for path in paths]
+
+
+def _verify_chunks(pool, paths, max_pending, chunk_size):
+    """
+        Return a generator verifying the given paths on the given pool in
+        chunks of the given size, and yielding the results of each chunk
+        (see _verify_chunk) as soon as it is done.
+        - At most the given number of chunks is pending at any time.
+    """
+
+    finished = queue.SimpleQueue()
+    nb_pending = 0
+
+    for chunk in iter(lambda: list(itertools.islice(paths, chunk_size)), []):
+        if nb_pending == max_pending:
+            yield _next_finished(finished)
+            nb_pending -= 1
+        pool.apply_async(_verify_chunk, (chunk,), callback=finished.put, error_callback=finished.put)
+        nb_pending += 1
+
+    while nb_pending:
+        yield _next_finished(finished)
+        nb_pending -= 1
+
+
+def _next_finished(finished):
+    """
+        Return the next result in the given queue of finished chunks, or raise
+        the exception that made its chunk fail.
+    """
+
+    result = finished.get()
+    if isinstance(result, BaseException):
+        raise result
+    return result
+
+
+_STATE_NAMES = {Disk.VISIBLE: "visible", Disk.CRACKED: "cracked", Disk.WRAPPED: "wrapped"}
+
+
+def _format_disk(disk):
+    """
+        Return a short description of the given disk.
+    """
+
+    if disk is None:
+        return "empty"
+    return "%s %d" % (_STATE_NAMES.get(Disk.get_state(disk), Disk.get_state(disk)),
+                      Disk.get_value(disk))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Replay archived game logs with the current engine.")
+    parser.add_argument("paths", nargs="+", help="game logs or directories of game logs")
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--window", type=int, default=DEFAULT_WINDOW)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--validation", choices=sorted(Validation.LEVELS), default="off",
+                        help="validation level of the game (see Validation)")
+    arguments = parser.parse_args()
+    Validation.set_level(arguments.validation)
+
+    summary = verify_logs(
+        arguments.paths, arguments.processes, arguments.window, arguments.chunk_size,
+        report=lambda divergence: print(format_divergence(divergence)),
+        progress=lambda nb_games, elapsed: print(
+            "%d games, %.1f games/s" % (nb_games, nb_games / elapsed), file=sys.stderr))
+
+    print("Verified %d games in %.1f s (%.1f games/s), %d divergent" %
+          (summary.nb_games, summary.elapsed, summary.nb_games / max(summary.elapsed, 1e-9),
+           summary.nb_divergent))
+    sys.exit(1 if summary.nb_divergent else 0)
@@ -0,0 +1,154 @@
+import os
+import struct
+import tempfile
+
+import GameLog
+import Verifier
+
+
+def tamper(path, offset, data):
+    """
+        Overwrite the bytes at the given offset in the file at the given path.
+    """
+    with open(path, "r+b") as file:
+        file.seek(offset)
+        file.write(data)
+
+
+
+def test_Verify_Game__Matching_Log(score, max_score):
+    """Function verify_game: a log of the current engine has no divergence."""
+    max_score.value += 2
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "game")
+            GameLog.play_logged_game(path, 4, dimension=5, max_turns=60, keyframe_interval=8)
+            assert Verifier.verify_game(path) is None
+        score.value += 2
+    except:
+        pass
+
+def test_Verify_Game__Diverging_Score(score, max_score):
+    """Function verify_game: a wrong score is reported at its turn."""
+    max_score.value += 2
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "game")
+            GameLog.play_logged_game(path, 4, dimension=5, max_turns=60, keyframe_interval=8)
+            offset = GameLog.GameLog(path).turn_offsets[4]
+            tamper(path, offset + 3, struct.pack("<i", 12345))
+            divergence = Verifier.verify_game(path)
+            assert divergence.turn == 5
+            assert "12345" in divergence.reason
+            assert "turn 5" in Verifier.format_divergence(divergence)
+        score.value += 2
+    except:
+        pass
+
+def test_Verify_Game__Divergence_Before_Failed_Drop(score, max_score):
+    """Function verify_game: a divergence is reported at its own turn, even if a later drop fails."""
+    max_score.value += 2
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "game")
+            GameLog.play_logged_game(path, 4, dimension=5, max_turns=60, keyframe_interval=8)
+            log = GameLog.GameLog(path)
+            tamper(path, log.turn_offsets[4] + 3, struct.pack("<i", 12345))
+            tamper(path, log.turn_offsets[6] + 2, bytes((9,)))
+            divergence = Verifier.verify_game(path)
+            assert divergence.turn == 5
+            assert "12345" in divergence.reason
+        score.value += 2
+    except:
+        pass
+
+def test_Verify_Game__Diverging_Keyframe(score, max_score):
+    """Function verify_game: a keyframe with a different board is reported with a board diff."""
+    max_score.value += 3
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "game")
+            GameLog.play_logged_game(path, 4, dimension=5, max_turns=60, keyframe_interval=8)
+            log = GameLog.GameLog(path)
+            keyframe = log.keyframe(2)
+            board = keyframe.board
+            board[4][5] = [GameLog.Disk.VISIBLE, 1]
+            tamper(path, log.keyframe_offsets[2] + GameLog.KEYFRAME.size, GameLog.Board.to_bytes(board))
+            divergence = Verifier.verify_game(path)
+            assert divergence.turn == 16
+            assert divergence.differences == [((5, 6), [GameLog.Disk.VISIBLE, 1], None)]
+            assert "(5, 6): logged visible 1, replayed empty" in Verifier.format_divergence(divergence)
+        score.value += 3
+    except:
+        pass
+
+def test_Verify_Logs__Directory(score, max_score):
+    """Function verify_logs: all logs in a directory are verified on a pool."""
+    max_score.value += 2
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            os.mkdir(os.path.join(directory, "nested"))
+            for seed in range(6):
+                GameLog.play_logged_game(os.path.join(directory, "nested" if seed % 2 else "", str(seed)),
+                                         seed, dimension=4, max_turns=30)
+            tamper(os.path.join(directory, "nested", "3"),
+                   GameLog.GameLog(os.path.join(directory, "nested", "3")).turn_offsets[0] + 3,
+                   struct.pack("<i", -1))
+            divergences = []
+            summary = Verifier.verify_logs([directory], processes=2, window=4, chunk_size=1,
+                                           report=divergences.append)
+            assert summary.nb_games == 6
+            assert summary.nb_divergent == 1
+            assert divergences[0].path.endswith("3") and divergences[0].turn == 1
+        score.value += 2
+    except:
+        pass
+
+def test_Verify_Logs__Sliding_Window(score, max_score):
+    """Function verify_logs: chunks are verified in a sliding window, and progress is reported per window."""
+    max_score.value += 2
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            for seed in range(7):
+                GameLog.play_logged_game(os.path.join(directory, str(seed)), seed, dimension=4, max_turns=20)
+            tamper(os.path.join(directory, "5"), GameLog.GameLog(os.path.join(directory, "5")).turn_offsets[0] + 3,
+                   struct.pack("<i", -1))
+            calls = []
+            summary = Verifier.verify_logs([directory], processes=2, window=4, chunk_size=2,
+                                           progress=lambda nb_games, elapsed: calls.append(nb_games))
+            assert (summary.nb_games, summary.nb_divergent) == (7, 1)
+            assert calls[-1] == 7 and calls == sorted(calls) and len(calls) == 2
+        score.value += 2
+    except:
+        pass
+
+def test_Verify_Logs__Truncated_Log(score, max_score):
+    """Function verify_logs: a truncated log is reported as a divergent game instead of aborting the run."""
+    max_score.value += 2
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            for seed in range(3):
+                GameLog.play_logged_game(os.path.join(directory, str(seed)), seed, dimension=4, max_turns=30)
+            path = os.path.join(directory, "1")
+            os.truncate(path, os.path.getsize(path) - 3)
+            divergences = []
+            summary = Verifier.verify_logs([directory], processes=1, report=divergences.append)
+            assert (summary.nb_games, summary.nb_divergent) == (3, 1)
+            assert divergences[0].path == path
+            assert divergences[0].reason.startswith("replay failed: ")
+        score.value += 2
+    except:
+        pass
+
+
+
+verifier_test_functions = \
+    {
+        test_Verify_Game__Matching_Log,
+        test_Verify_Game__Diverging_Score,
+        test_Verify_Game__Divergence_Before_Failed_Drop,
+        test_Verify_Game__Diverging_Keyframe,
+        test_Verify_Logs__Directory,
+        test_Verify_Logs__Sliding_Window,
+        test_Verify_Logs__Truncated_Log
+    }
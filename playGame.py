@@ -1,4 +1,5 @@
 import collections
+import time
 import tkinter
 from tkinter import (Canvas,
                      Tk,
@@ -8,11 +9,14 @@ from tkinter import (Canvas,
 import Drop7
 import Disk
 import Board
+import HintEngine
 import Position
 
 DISK_SPACING = 20
 DISK_SIZE = 50
 GUI_UPDATE_DELAY_MS = 500
+HINT_POLL_DELAY_MS = 100
+HINT_COLOR = "yellow"
 
 DrawContext = collections.namedtuple("DrawContext", [
     "canvas",
@@ -23,44 +27,67 @@ DrawContext = collections.namedtuple("DrawContext", [
     "texts",
     "score",
     "turns",
-    "columns"
+    "columns",
+    "redraw",
+    "drawn_cells",
+    "hint"
 ])
 
-def all_positions(board):
+
+class Animation:
     """
-    :param board:
-    :return: generator for all positions on the board
+    The frames still to draw for the drop being animated, and the columns
+    clicked while it runs.
+    - Each frame is a tuple of a board and the score to show with it.
     """
-    position = (1, 1)
-    while position is not None:
-        yield position
-        position = Position.next(Board.dimension(board), position)
 
+    __slots__ = ("frames", "pending_columns", "running")
+
+    def __init__(self):
+        self.frames = collections.deque()
+        self.pending_columns = collections.deque()
+        self.running = False
 
-def draw_disk(c, position, disk):
-    (row, col) = position
-    # For some reason the example code flips this?
-    p = (col - 1, row - 1)
-    draw_disk_on_canvas(c.canvas, c.ovals[p], c.texts[p], disk)
+
+class Hint:
+    """
+    The engine searching hints for the next disk, and the column it currently
+    suggests, if any.
+    """
+
+    __slots__ = ("engine", "column")
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.column = None
+
+
+def all_positions(board):
+    """
+    :param board:
+    :return: tuple of all positions on the board
+    """
+    return Position.get_traversal(Board.dimension(board))
 
 
 def draw_disk_on_canvas(canvas, oval, text, disk):
+    """
+    Draw the given disk, or an empty cell if the disk is None, with a single
+    configuration of the given oval and of the given text.
+    """
     state = Disk.get_state(disk)
-    value = Disk.get_value(disk)
 
     state_colors = {
+        None: "white",
         Disk.VISIBLE: "green",
         Disk.CRACKED: "gray",
         Disk.WRAPPED: "black",
     }
 
-    canvas.itemconfig(oval, fill=state_colors[state])
-
-    if state == Disk.VISIBLE:
-        canvas.itemconfig(text, text=value, fill="white")
-
-    if state == Disk.CRACKED:
-        canvas.itemconfig(oval, dash=(5, 3))
+    canvas.itemconfig(oval, fill=state_colors[state],
+                      dash=(5, 3) if state == Disk.CRACKED else ())
+    canvas.itemconfig(text, text=Disk.get_value(disk) if state == Disk.VISIBLE else "",
+                      fill="white")
 
 
 def draw_next_disk(c, disk):
@@ -68,10 +95,28 @@ def draw_next_disk(c, disk):
 
 
 def draw_disks(c, board):
-    for p in all_positions(board):
-        disk = Board.get_disk_at(board, p)
-        if disk is not None:
-            draw_disk(c, p, disk)
+    """
+    Redraw the cells of the given board whose disk differs from the disk drawn
+    before, and report the number of redrawn cells and the time it took.
+    - Cells are compared by the state and value of their disk, such that only
+      cells whose appearance changed are configured again.
+    - The overflow row is not drawn.
+    """
+    start = time.perf_counter()
+    nb_redrawn = 0
+
+    for (column, row) in all_positions(board):
+        p = (row - 1, column - 1)
+        if p not in c.ovals:
+            continue
+        disk = Board.get_disk_at(board, (column, row))
+        cell = None if disk is None else (Disk.get_state(disk), Disk.get_value(disk))
+        if p not in c.drawn_cells or c.drawn_cells[p] != cell:
+            c.drawn_cells[p] = cell
+            draw_disk_on_canvas(c.canvas, c.ovals[p], c.texts[p], disk)
+            nb_redrawn += 1
+
+    c.redraw.set("%d cells in %.1f ms" % (nb_redrawn, (time.perf_counter() - start) * 1000))
 
 
 def draw_score(c, score):
@@ -83,27 +128,69 @@ def draw_turns(c, turns, turns_per_level):
 
 
 def draw_game_state(draw_context, game_state):
-    reset_ovals_and_texts(draw_context)
-    draw_disks(draw_context, game_state["board"])
-    draw_score(draw_context, game_state["score"])
-    draw_turns(draw_context, game_state["current_nb_turns"],
-               game_state["turns_per_level"])
-    draw_next_disk(draw_context, game_state["next_disk"])
+    draw_disks(draw_context, game_state.board)
+    draw_score(draw_context, game_state.score)
+    draw_turns(draw_context, game_state.current_nb_turns,
+               game_state.turns_per_level)
+    draw_next_disk(draw_context, game_state.next_disk)
+    start_hint(draw_context, game_state)
     update_gui()
 
 
-def reset_ovals_and_texts(c):
-    c.next_oval_canvas.itemconfig(c.next_oval, fill="white", dash=())
-    c.next_oval_canvas.itemconfig(c.next_text, text="", fill="white")
-    for oval in c.ovals.values():
-        c.canvas.itemconfig(oval, fill="white", dash=())
-    for text in c.texts.values():
-        c.canvas.itemconfig(text, text="", fill="white")
+def start_hint(c, game_state):
+    """
+    Start searching a hint for the next disk of the given game, unless the
+    game is over.
+    """
+    draw_hint(c, None)
+    if Board.can_accept_disk(game_state.board):
+        c.hint.engine.start(game_state.board, game_state.next_disk)
 
 
-def add_disk(draw_context, game_state, column):
-    gs = game_state
-    board = gs["board"]
+def poll_hint(c):
+    """
+    Draw the deepest hint found since the previous poll, if any, and schedule
+    the next poll.
+    """
+    hint = c.hint.engine.poll()
+    if hint is not None:
+        draw_hint(c, hint[1])
+    root.after(HINT_POLL_DELAY_MS, poll_hint, c)
+
+
+def draw_hint(c, column):
+    """
+    Highlight the rectangle of the given column as the suggested column, or
+    remove the highlight if the given column is None.
+    """
+    if c.hint.column is not None:
+        c.canvas.itemconfig(c.columns[c.hint.column - 1], fill="white")
+    c.hint.column = column
+    if column is not None:
+        c.canvas.itemconfig(c.columns[column - 1], fill=HINT_COLOR)
+
+
+def column_fill(c, column):
+    """
+    Return the fill color of the rectangle of the given column when the mouse
+    is not over it.
+    """
+    return HINT_COLOR if column == c.hint.column else "white"
+
+
+def on_column_click(draw_context, game_state, animation, column):
+    """
+    Drop the next disk in the given column, or queue the column if a drop is
+    still being animated.
+    """
+    if animation.running:
+        animation.pending_columns.append(column)
+    else:
+        add_disk(draw_context, game_state, animation, column)
+
+
+def add_disk(draw_context, game_state, animation, column):
+    board = game_state.board
 
     if not Board.can_accept_disk(board):
         messagebox.showerror("Finished", "Board can no longer accept this disk!")
@@ -112,19 +199,44 @@ def add_disk(draw_context, game_state, column):
     elif Board.is_full_column(board,column):
         messagebox.showerror("Finished", "Column is full.")
     else:
-        disk_to_drop = gs["next_disk"]
-        gs["score"] += Drop7.drop_disk_at(board,disk_to_drop,column)
-        gs["current_nb_turns"] += 1
-
-        if gs["current_nb_turns"] == gs["turns_per_level"]:
-            gs["score"] += 1000 // gs["turns_per_level"]
-            Board.inject_bottom_row_wrapped_disks(board)
-            gs["current_nb_turns"] = 0
-            gs["turns_per_level"] = max(gs["turns_per_level"] - 1, 10)
-
-        gs["next_disk"] = Disk.get_random_disk(Board.dimension(board),
-                                               {Disk.VISIBLE, Disk.WRAPPED})
+        # The frames of the animation: the disk landing on the board, followed
+        # by the board after each step of explosions.
+        landing_board = Board.get_board_copy(board)
+        Board.add_disk_on_column(landing_board, Disk.get_disk_copy(game_state.next_disk), column)
+        frames = [(landing_board, game_state.score)]
+        draw_context.hint.engine.cancel()
+        draw_hint(draw_context, None)
+
+        def add_frame(step):
+            frames.append((Board.get_board_copy(board), frames[-1][1] + step.score))
+
+        game_state.step(column, on_step=add_frame)
+
+        if len(frames) > 1:
+            animation.frames.extend(frames)
+            animation.running = True
+            draw_next_frame(draw_context, game_state, animation)
+        else:
+            draw_game_state(draw_context, game_state)
+
+
+def draw_next_frame(draw_context, game_state, animation):
+    """
+    Draw the next frame of the running animation, and schedule the frame after
+    it. The final state of the game is drawn once all frames have been drawn,
+    after which the queued columns are played.
+    """
+    if animation.frames:
+        board, score = animation.frames.popleft()
+        draw_disks(draw_context, board)
+        draw_score(draw_context, score)
+        update_gui()
+        root.after(GUI_UPDATE_DELAY_MS, draw_next_frame, draw_context, game_state, animation)
+    else:
+        animation.running = False
         draw_game_state(draw_context, game_state)
+        while animation.pending_columns and not animation.running:
+            add_disk(draw_context, game_state, animation, animation.pending_columns.popleft())
 
 
 def draw_board(root):
@@ -133,14 +245,7 @@ def draw_board(root):
     """
     # board = Board.init_board(7, ((Disk.init_disk(Disk.VISIBLE, 4),),))
     board = Board.init_board(7, ())
-    game_state = {
-        "score": 0,
-        "turns_per_level": 20,
-        "current_nb_turns": 0,
-        "board": board,
-        "next_disk": Disk.get_random_disk(Board.dimension(board),
-                                          {Disk.VISIBLE, Disk.WRAPPED})
-    }
+    game_state = Drop7.GameState(board)
     dimension = Board.dimension(board)
 
     # provide the title that will be shown in the header
@@ -148,6 +253,7 @@ def draw_board(root):
 
     score_variable = create_variable_frame(root, "Score:")
     turn_variable = create_variable_frame(root, "Turns to next level:")
+    redraw_variable = create_variable_frame(root, "Redraw:")
 
     next_oval_canvas, next_oval, next_text = create_next_oval(root)
 
@@ -160,14 +266,17 @@ def draw_board(root):
     ovals, texts = create_ovals(canvas, dimension, dimension)
     draw_context = DrawContext(canvas, ovals, next_oval_canvas, next_oval,
                                next_text, texts, score_variable, turn_variable,
-                               columns)
+                               columns, redraw_variable, {},
+                               Hint(HintEngine.HintEngine()))
 
+    animation = Animation()
     bind_interface(draw_context,
-                   lambda column: add_disk(draw_context, game_state, column))
+                   lambda column: on_column_click(draw_context, game_state, animation, column))
 
     canvas.pack()
 
     draw_game_state(draw_context, game_state)
+    poll_hint(draw_context)
 
 
 def create_next_oval(root):
@@ -242,18 +351,19 @@ def bind_interface(draw_context, on_column_click):
         c = draw_context.columns[col]
         t = draw_context.texts[(row, col)]
 
-        bind_for_column(canvas, t, c, col, on_column_click)
-        bind_for_column(canvas, o, c, col, on_column_click)
-        bind_for_column(canvas, c, c, col, on_column_click)
+        bind_for_column(canvas, t, c, col, on_column_click, draw_context)
+        bind_for_column(canvas, o, c, col, on_column_click, draw_context)
+        bind_for_column(canvas, c, c, col, on_column_click, draw_context)
 
 
-def bind_for_column(canvas, element, column, columnNr, on_column_click):
+def bind_for_column(canvas, element, column, columnNr, on_column_click, draw_context):
     o = element
     c = column
     canvas.tag_bind(o, "<Button-1>",
                     lambda event, column=columnNr: on_column_click(column + 1))
     canvas.tag_bind(o, "<Leave>",
-                    lambda event, c=c: canvas.itemconfig(c, fill="white"))
+                    lambda event, c=c, column=columnNr:
+                    canvas.itemconfig(c, fill=column_fill(draw_context, column + 1)))
     canvas.tag_bind(o, "<Enter>",
                     lambda event, c=c: canvas.itemconfig(c, fill="red"))
 
@@ -290,7 +400,6 @@ def create_ovals(canvas, board_width, board_height):
 
 def update_gui():
     root.update_idletasks()
-    root.after(GUI_UPDATE_DELAY_MS)
 
 
 root = Tk()